@@ -56,7 +56,7 @@ class Command(BaseCommand):
             client.next_handler(tg_user=tg_user, msg=msg, **client.data)
 
     def handle_goals_command(self, tg_user: TgUser, msg: Message):
-        goals = Goal.objects.exclude(status=Goal.Status.archived).filter(user=tg_user.user)
+        goals = Goal.objects.exclude(status=Goal.Status.archived).filter(user=tg_user.user, category__is_deleted=False)
         if goals:
             text = 'Ваши цели:\n' + '\n'.join([f'{goal.id}) {goal.title}' for goal in goals])
         else:
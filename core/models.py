@@ -1,5 +1,9 @@
 from django.contrib.auth.models import AbstractUser
+from django.db import models
 
 
 class User(AbstractUser):
     REQUIRED_FIELDS = []
+
+    # время изменения профиля: данные пользователя вложены в ответы целей, категорий и комментариев (их ETag)
+    updated = models.DateTimeField(auto_now=True, verbose_name="Дата последнего обновления")
@@ -0,0 +1,98 @@
+""" Индекс доступа пользователя к доскам
+
+Таблица участников (BoardParticipant) хранит пары пользователь -> доска (с ролью) и служит индексом доступа:
+составной индекс (user, board, role) позволяет получить доски пользователя сканированием только индекса.
+Запросы списков фильтруют сущности через подзапрос по этому индексу, вместо цепочки соединений
+Goal -> GoalCategory -> Board -> BoardParticipant.
+
+Проверки прав (permissions) и валидация сериализаторов получают роль пользователя в доске через board_role:
+все роли пользователя загружаются одним запросом и запоминаются на время обработки запроса.
+Между запросами роли хранятся в кэше Django (CACHES['default']) под версией пользователя.
+Любое изменение участников (сигналы BoardParticipant в goals/signals.py, явный вызов invalidate_board_roles
+после bulk_create/update) записывает новую версию - сразу и повторно после фиксации транзакции,
+поэтому роли, прочитанные из БД до фиксации отзыва доступа, попадают под устаревшую версию и не используются.
+
+"""
+
+import time
+from collections import Counter
+from typing import Iterable, Optional, Union
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import QuerySet
+from django.http import HttpRequest
+from rest_framework.request import Request
+
+from core.models import User
+from goals.models import BoardParticipant
+
+EDITOR_ROLES: list[int] = [BoardParticipant.Role.owner, BoardParticipant.Role.writer]
+
+ROLES_CACHE_TIMEOUT = 60 * 60
+
+# счетчики обращений к кэшу ролей в текущем процессе: hits / misses
+roles_cache_stats: Counter = Counter()
+
+
+def participant_boards(user: User, roles: Optional[Iterable[int]] = None) -> QuerySet:
+    """ Возвращает подзапрос идентификаторов досок, в которых участвует пользователь (с указанными ролями) """
+
+    queryset = BoardParticipant.objects.filter(user=user)
+    if roles is not None:
+        queryset = queryset.filter(role__in=roles)
+    return queryset.values('board_id')
+
+
+def board_roles(request: Union[Request, HttpRequest]) -> dict[int, int]:
+    """ Возвращает роли пользователя запроса по доскам {board_id: role}, загружая их один раз за запрос """
+
+    # роли хранятся на исходном HttpRequest, общем для всех оберток Request (представление, сериализаторы)
+    http_request = getattr(request, '_request', request)
+    if not hasattr(http_request, '_board_roles'):
+        http_request._board_roles = user_board_roles(request.user.id)
+    return http_request._board_roles
+
+
+def board_role(request: Union[Request, HttpRequest], board_id: int) -> Optional[int]:
+    """ Возвращает роль пользователя запроса в доске (None - пользователь не участник доски) """
+
+    return board_roles(request).get(board_id)
+
+
+def user_board_roles(user_id: int) -> dict[int, int]:
+    """ Возвращает роли пользователя по доскам {board_id: role} из кэша, при промахе - из БД """
+
+    key = f'goals:board_roles:{user_id}:{_roles_version(user_id)}'
+    roles = cache.get(key)
+    if roles is not None:
+        roles_cache_stats['hits'] += 1
+        return roles
+
+    roles_cache_stats['misses'] += 1
+    roles = dict(BoardParticipant.objects.filter(user_id=user_id).values_list('board_id', 'role'))
+    cache.set(key, roles, ROLES_CACHE_TIMEOUT)
+    return roles
+
+
+def invalidate_board_roles(*user_ids: int) -> None:
+    """ Сбрасывает кэш ролей пользователей сейчас и после фиксации текущей транзакции """
+
+    _bump_roles_versions(user_ids)
+    transaction.on_commit(lambda: _bump_roles_versions(user_ids))
+
+
+def _roles_version(user_id: int) -> int:
+    key = f'goals:board_roles:{user_id}:version'
+    version = cache.get(key)
+    if version is None:
+        # версия, вытесненная из кэша, заменяется новой - роли под прежними версиями больше не читаются
+        version = time.time_ns()
+        if not cache.add(key, version, None):
+            version = cache.get(key)
+    return version
+
+
+def _bump_roles_versions(user_ids: Iterable[int]) -> None:
+    version = time.time_ns()
+    cache.set_many({f'goals:board_roles:{user_id}:version': version for user_id in set(user_ids)}, None)
@@ -1,10 +1,27 @@
 from django.contrib import admin
+from django.contrib.admin.views.main import SEARCH_VAR
+from django.contrib.postgres.search import TrigramSimilarity
+from django.db import connections
+from django.db.models.functions import Upper
 from django.urls import reverse
 from django.utils.html import format_html
 
 from goals.models import GoalCategory, GoalComment, Goal, BoardParticipant, Board
 
 
+class TrigramSimilarityOrderingMixin:
+    """ При поиске в админке выводит первыми записи с наиболее похожим названием (pg_trgm)
+
+    Сам поиск по title (icontains, т.е. UPPER(title) LIKE ...) использует триграммный индекс по UPPER(title).
+    """
+
+    def get_ordering(self, request):
+        search_term = request.GET.get(SEARCH_VAR, '').strip()
+        if search_term and connections[self.model.objects.db].vendor == 'postgresql':
+            return [TrigramSimilarity(Upper('title'), search_term.upper()).desc()]
+        return super().get_ordering(request)
+
+
 class ParticipantsInLine(admin.TabularInline):
     model = BoardParticipant
     extra = 0
@@ -14,23 +31,20 @@ class ParticipantsInLine(admin.TabularInline):
 
 
 @admin.register(Board)
-class BoardAdmin(admin.ModelAdmin):
+class BoardAdmin(TrigramSimilarityOrderingMixin, admin.ModelAdmin):
     list_display = ('id', 'title', 'participants_count', 'is_deleted')
     list_display_links = ['title']
     list_filter = ['is_deleted']
     search_fields = ['title']
     inlines = [ParticipantsInLine]
 
-    def participants_count(self, obj: Board) -> int:
-        return obj.participants.exclude(role=BoardParticipant.Role.owner).count()
-
 
 @admin.register(GoalCategory)
-class GoalCategoryAdmin(admin.ModelAdmin):
-    list_display = ("id", "title", "user")
-    readonly_fields = ("created", "updated")
+class GoalCategoryAdmin(TrigramSimilarityOrderingMixin, admin.ModelAdmin):
+    list_display = ("id", "title", "user", "goals_to_do", "goals_in_progress", "goals_done")
+    readonly_fields = ("created", "updated", "goals_to_do", "goals_in_progress", "goals_done")
     list_filter = ["is_deleted"]
-    search_fields = ("title", "user")
+    search_fields = ("title", "user__username")
 
 
 class CommentsInLine(admin.StackedInline):
@@ -40,8 +54,8 @@ class CommentsInLine(admin.StackedInline):
 
 @admin.register(Goal)
 class GoalAdmin(admin.ModelAdmin):
-    list_display = ("id", "title", "author_link")
-    readonly_fields = ("created", "updated")
+    list_display = ("id", "title", "author_link", "comments_count")
+    readonly_fields = ("created", "updated", "comments_count")
     search_fields = ("title", "description")
     list_filter = ("status", "priority")
     inlines = [CommentsInLine]
@@ -0,0 +1,75 @@
+""" Асинхронные (ASGI) представления для чтения
+
+async_view(view_class, handler) - асинхронное представление по правилам синхронного представления DRF:
+запрос GET/HEAD обрабатывается асинхронным методом представления (alist - списки, aretrieve - детальная
+информация; их реализуют те же примеси, что и list/retrieve), остальные методы передаются синхронному
+представлению. Запросы страницы, количества, версии (ETag) и объекта выполняются через асинхронный
+интерфейс ORM; аутентификация, права доступа, фильтры (django-filter проверяет значения запросами к БД)
+и кэш ролей остаются синхронными и выполняются в потоке (sync_to_async). Ответы совпадают с ответами
+синхронных представлений.
+
+Асинхронные представления подключаются только в ASGI-приложении (todolist/asgi.py, ASGI_URLCONF),
+WSGI-приложение и тесты по умолчанию используют синхронные представления.
+
+"""
+
+from typing import Any, Callable
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError
+from django.db.models import Model, QuerySet
+from django.http import Http404, HttpRequest
+from django.http.response import HttpResponseBase
+from rest_framework.generics import GenericAPIView
+
+READ_METHODS = ('GET', 'HEAD')
+
+
+async def afiltered_queryset(view: GenericAPIView) -> QuerySet:
+    """ Возвращает отфильтрованный queryset представления (фильтры выполняются в потоке) """
+
+    return await sync_to_async(lambda: view.filter_queryset(view.get_queryset()))()
+
+
+async def aget_object(view: GenericAPIView) -> Model:
+    """ Асинхронная версия GenericAPIView.get_object: объект - через aget, права - в потоке """
+
+    queryset = await afiltered_queryset(view)
+    lookup_url_kwarg = view.lookup_url_kwarg or view.lookup_field
+    try:
+        instance = await queryset.aget(**{view.lookup_field: view.kwargs[lookup_url_kwarg]})
+    except (queryset.model.DoesNotExist, TypeError, ValueError, ValidationError):
+        raise Http404
+
+    await sync_to_async(view.check_object_permissions)(view.request, instance)
+    return instance
+
+
+def async_view(view_class: type[GenericAPIView], handler: str) -> Callable:
+    """ Возвращает асинхронное представление: GET/HEAD - метод handler представления, остальное - синхронно """
+
+    sync_view = view_class.as_view()
+
+    async def view(request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponseBase:
+        if request.method not in READ_METHODS:
+            return await sync_to_async(sync_view)(request, *args, **kwargs)
+
+        # повторяет APIView.dispatch, обработчик - асинхронный
+        self = view_class()
+        self.setup(request, *args, **kwargs)
+        drf_request = self.initialize_request(request, *args, **kwargs)
+        self.request = drf_request
+        self.headers = self.default_response_headers
+        try:
+            # аутентификация загружает сессию и пользователя из БД
+            await sync_to_async(self.initial)(drf_request, *args, **kwargs)
+            response = await getattr(self, handler)(drf_request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+        self.response = self.finalize_response(drf_request, response, *args, **kwargs)
+        return self.response
+
+    # CSRF для сессий проверяет DRF (как у APIView.as_view)
+    view.csrf_exempt = True
+    view.view_class = view_class
+    return view
@@ -0,0 +1,903 @@
+""" Сценарии нагрузочного тестирования запросов приложения
+
+Запуск сценария: python manage.py benchmark <сценарий> [--repeat N]
+Предварительно база наполняется командой python manage.py seed_benchmark_data.
+
+Сценарии:
+- access - список целей через соединение с участниками доски, через индекс доступа и по доске цели
+- pagination - первая и глубокая (до 10 000-й) страница списка целей: limit/offset и выдача по ключу
+- search - поиск целей через ILIKE и полнотекстовый поиск по GIN-индексу
+- trigram - поиск категорий по подстроке и похожести без индекса и по триграммному индексу
+- roles - роли пользователя по доскам из БД и из кэша (goals.access)
+- conditional - списки с полным ответом и с ответом 304 Not Modified по ETag
+- response-cache - списки досок и категорий без кэша ответов (версии досок сброшены) и из кэша
+- batch - создание и изменение 1000 целей пакетом и отдельными запросами (изменения откатываются)
+- transition - смена статуса целей категории одним запросом UPDATE и отдельными запросами (изменения откатываются)
+- cascade - удаление самой большой доски с архивированием целей в запросе и в фоне частями (изменения откатываются)
+- participants - изменение доски с 5000 участников: только название, добавление читателя (изменения откатываются)
+- stats - статистика самой большой доски без кэша, из кэша и подсчет по всем целям доски
+  (доски по 100 000 целей: seed_benchmark_data --boards 10 --goals 1000000 --comments 300000)
+- counters - счетчики целей категорий и комментариев целей: COUNT в каждом запросе списка и хранимые счетчики,
+  запись цели и комментария со счетчиками, исправление счетчиков частями (изменения откатываются)
+- export - потоковая выгрузка всех целей в NDJSON / CSV (с комментариями) и чтение тех же целей
+  страницами limit/offset и целиком в память: скорость и пиковая память
+- bulk-import - загрузка 100 000 целей с комментариями через COPY, проверка без записи и bulk_create
+  (изменения откатываются)
+- json-rendering - отрисовка страниц по 1 000 и 10 000 целей и разбор пакета целей: JSONRenderer / JSONParser DRF
+  и orjson (todolist/renderers.py) - время, скорость и пиковое выделение памяти
+- projection - страница 10 000 целей, категорий и комментариев: ModelSerializer и строки values()
+  (goals/projections.py) - время запроса с сериализацией и отдельно сериализации
+- sparse-fields - страница 1 000 целей и категорий со всеми полями и с ?fields= (goals/fieldsets.py):
+  время и размер ответа
+- asgi - запросы чтения (списки целей, категорий, комментариев и цель) под параллельной нагрузкой:
+  WSGI (manage.py runserver), ASGI (uvicorn) с синхронными и с асинхронными представлениями - запросов в секунду
+  и задержки p50 / p99
+- pool - те же запросы (ASGI - асинхронными представлениями) с новым соединением с БД на каждый запрос,
+  с постоянными соединениями (DB_CONN_MAX_AGE) и с пулом соединений (DB_POOL_MAX_SIZE, todolist/db):
+  запросов в секунду, задержки и число открытых соединений с БД
+- plans - планы и время запросов списков (LIST_REQUESTS) с проверкой на последовательное сканирование больших таблиц
+
+"""
+
+import http.client
+import io
+import json
+import os
+import resource
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Callable, Any, Iterable, Iterator
+
+from django.contrib.postgres.search import SearchVector, SearchQuery, SearchRank
+from django.db import connection, transaction
+from django.db.models import Count, Q, QuerySet
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory, force_authenticate
+from rest_framework.views import APIView
+
+from core.models import User
+from goals.access import EDITOR_ROLES, participant_boards, roles_cache_stats, user_board_roles, invalidate_board_roles
+from goals.cascade import archive_chunk
+from goals.caching import bump_board_versions, response_cache_stats
+from goals.counters import RECOUNTS
+from goals.export import csv_lines, goal_chunks, ndjson_lines
+from goals.importing import import_goals
+from goals.filters import SEARCH_CONFIG, trigram_search
+from goals.models import Board, Goal, GoalCategory, GoalComment, BoardParticipant
+from goals.pagination import keyset_queryset
+from goals.projections import projection as values_projection
+from goals.serializers import BoardWithParticipantSerializer, GoalWithUserSerializer, GoalCategoryWithUserSerializer, \
+    GoalCommentWithUserSerializer
+from goals.views.board import BoardListView, BoardDetailView, BoardStatsView
+from goals.views.goal_category import GoalCategoryListView
+from goals.views.goal_comment import GoalCommentListView, GoalCommentCreateView
+from goals.views.goals import GoalListView, GoalCreateView, GoalDetailView, GoalBatchView, \
+    GoalTransitionView
+from todolist.renderers import ORJSONParser, ORJSONRenderer
+
+PAGE_SIZE = 50
+DEEP_PAGE = 10_000
+
+# таблицы, последовательное сканирование которых в запросах списков недопустимо
+LARGE_TABLES = ('goals_board', 'goals_boardparticipant', 'goals_goalcategory', 'goals_goal', 'goals_goalcomment')
+
+# запросы списков в том виде, в котором их присылает клиент: представление и параметры запроса
+# ({category} и {goal} подставляются из данных пользователя, cursor - ключ первой записи списка)
+LIST_REQUESTS: list[tuple[str, type[APIView], dict[str, str]]] = [
+    ('goals', GoalListView, {}),
+    ('goals by created', GoalListView, {'ordering': '-created'}),
+    ('goals cursor', GoalListView, {'cursor': ''}),
+    ('goals cursor by created', GoalListView, {'ordering': '-created', 'cursor': ''}),
+    ('goals by due date', GoalListView, {'due_date__gte': '2023-01-01', 'due_date__lte': '2023-12-31'}),
+    ('goals by status', GoalListView, {'status__in': '1,2'}),
+    ('goals by priority', GoalListView, {'priority__in': '3,4'}),
+    ('goals by category', GoalListView, {'category__in': '{category}'}),
+    ('goals search', GoalListView, {'search': 'отчет'}),
+    ('categories', GoalCategoryListView, {}),
+    ('categories cursor by created', GoalCategoryListView, {'ordering': '-created', 'cursor': ''}),
+    ('categories search', GoalCategoryListView, {'search': 'отчет'}),
+    ('comments', GoalCommentListView, {}),
+    ('goal comments', GoalCommentListView, {'goal': '{goal}'}),
+    ('boards', BoardListView, {}),
+    ('boards search', BoardListView, {'search': 'отчет'}),
+]
+
+
+@dataclass
+class Timing:
+    median: float
+    p95: float
+    best: float
+
+    def __str__(self) -> str:
+        return f'median {self.median:.2f} ms, p95 {self.p95:.2f} ms, best {self.best:.2f} ms'
+
+
+@dataclass
+class Benchmark:
+    user: User
+    repeat: int
+    write: Callable[[str], Any]
+
+    def measure(self, label: str, func: Callable[[], Any]) -> Timing:
+        """ Замеряет время выполнения функции (после одного прогревочного запуска) """
+
+        func()
+        samples = []
+        for _ in range(self.repeat):
+            start = time.perf_counter()
+            func()
+            samples.append((time.perf_counter() - start) * 1000)
+        samples.sort()
+
+        timing = Timing(
+            median=statistics.median(samples),
+            p95=samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+            best=samples[0],
+        )
+        self.write(f'{label}: {timing}')
+        return timing
+
+    def profile(self, label: str, func: Callable[[], Any]) -> None:
+        """ Замеряет процессорное время приложения и время запросов к БД (в среднем на один вызов) """
+
+        func()
+        start = time.process_time()
+        with CaptureQueriesContext(connection) as context:
+            for _ in range(self.repeat):
+                func()
+        cpu = (time.process_time() - start) * 1000 / self.repeat
+        db = sum(float(query['time']) for query in context.captured_queries) * 1000 / self.repeat
+        self.write(f'{label}: cpu {cpu:.2f} ms, db {db:.2f} ms, {len(context) / self.repeat:.0f} queries')
+
+    def stream(self, label: str, func: Callable[[], Iterable[bytes]], rows: int) -> None:
+        """ Замеряет скорость потоковой выдачи и пиковую память: Python (tracemalloc) и процесса (max RSS) """
+
+        start = time.perf_counter()
+        size = sum(len(chunk) for chunk in func())
+        seconds = time.perf_counter() - start
+        tracemalloc.start()
+        for _ in func():
+            pass
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        self.write(
+            f'{label}: {seconds:.2f} s, {rows / seconds:.0f} rows/s, {size / 2 ** 20 / seconds:.1f} MB/s, '
+            f'peak python memory {peak / 2 ** 20:.1f} MB, max rss {rss:.0f} MB'
+        )
+
+    def explain(self, label: str, queryset: QuerySet) -> None:
+        self.write(f'--- {label}\n{queryset.explain(analyze=True)}')
+
+
+SCENARIOS: dict[str, Callable[[Benchmark], None]] = {}
+
+
+def scenario(func: Callable[[Benchmark], None]) -> Callable[[Benchmark], None]:
+    SCENARIOS[func.__name__.replace('_', '-')] = func
+    return func
+
+
+def busiest_user() -> User:
+    """ Возвращает пользователя с наибольшим числом досок """
+
+    return User.objects.annotate(boards=Count('participants')).order_by('-boards').first()
+
+
+def _page(queryset: QuerySet) -> Callable[[], Any]:
+    return lambda: (queryset.count(), list(queryset[:PAGE_SIZE]))
+
+
+def list_queryset(view_class: type[APIView], user: User, params: dict[str, str]) -> QuerySet:
+    """ Возвращает запрос страницы списка, который выполняет представление для пользователя с параметрами params """
+
+    params = {
+        key: value.format(
+            category=GoalCategory.objects.filter(board__in=participant_boards(user)).values_list('id', flat=True).first(),
+            goal=Goal.objects.filter(board__in=participant_boards(user)).values_list('id', flat=True).first(),
+        )
+        for key, value in params.items()
+    }
+    request = APIRequestFactory().get('/', params)
+    force_authenticate(request, user)
+
+    view = view_class()
+    view.setup(request)
+    view.request = view.initialize_request(request)
+    view.format_kwarg = None
+    queryset = view.filter_queryset(view.get_queryset())
+
+    if 'cursor' not in params:
+        return queryset[:PAGE_SIZE]
+
+    ordering = queryset.query.order_by[0]
+    after = queryset.values_list(ordering.lstrip('-'), 'id').first()
+    return keyset_queryset(queryset, ordering, after)[:PAGE_SIZE + 1]
+
+
+def seq_scans(queryset: QuerySet) -> list[str]:
+    """ Возвращает большие таблицы, которые читаются в плане запроса последовательным сканированием """
+
+    def _walk(plan: dict) -> Iterator[dict]:
+        yield plan
+        for child in plan.get('Plans', []):
+            yield from _walk(child)
+
+    plan = json.loads(queryset.explain(format='json'))[0]['Plan']
+    return [
+        node['Relation Name'] for node in _walk(plan)
+        if node['Node Type'] == 'Seq Scan' and node['Relation Name'] in LARGE_TABLES
+    ]
+
+
+@contextmanager
+def without_seq_scans():
+    """ Запрещает планировщику последовательные сканирования, если есть подходящий индекс
+
+    На небольших таблицах (в тестах) последовательное сканирование дешевле индекса,
+    поэтому без этого по плану нельзя понять, есть ли у запроса индекс.
+    """
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute('SET LOCAL enable_seqscan = off')
+        yield
+
+
+@contextmanager
+def without_index_scans():
+    """ Запрещает планировщику индексные сканирования - план «до» появления индекса """
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute('SET LOCAL enable_indexscan = off; SET LOCAL enable_bitmapscan = off')
+        yield
+
+
+def _write(user: User, view: Callable, method: str, data: Any, **kwargs: Any) -> None:
+    """ Выполняет изменяющий запрос к представлению и откатывает его изменения """
+
+    request = getattr(APIRequestFactory(), method)('/', data, format='json')
+    force_authenticate(request, user)
+    with transaction.atomic():
+        response = view(request, **kwargs)
+        assert response.status_code < 400, response.data
+        transaction.set_rollback(True)
+
+
+@scenario
+def access(bench: Benchmark) -> None:
+    joined = Goal.objects.filter(
+        category__board__participants__user=bench.user,
+    ).exclude(status=Goal.Status.archived).order_by('title')
+    indexed = Goal.objects.filter(
+        category__board__in=participant_boards(bench.user),
+    ).exclude(status=Goal.Status.archived).order_by('title')
+    denormalized = Goal.objects.filter(
+        board__in=participant_boards(bench.user),
+    ).exclude(status=Goal.Status.archived).order_by('title')
+
+    bench.explain('join through participants', joined[:PAGE_SIZE])
+    bench.explain('access index', indexed[:PAGE_SIZE])
+    bench.explain('denormalized board', denormalized[:PAGE_SIZE])
+    bench.measure('join through participants', _page(joined))
+    bench.measure('access index', _page(indexed))
+    bench.measure('denormalized board', _page(denormalized))
+
+
+@scenario
+def pagination(bench: Benchmark) -> None:
+    queryset = Goal.objects.filter(
+        board__in=participant_boards(bench.user),
+    ).exclude(status=Goal.Status.archived)
+    deep_page = min(DEEP_PAGE, queryset.count() // PAGE_SIZE)
+    offset = (deep_page - 1) * PAGE_SIZE
+
+    for ordering in ('title', '-created'):
+        ordered = queryset.order_by(ordering)
+        after = queryset.order_by(ordering, '-id' if ordering[0] == '-' else 'id').values_list(
+            ordering.lstrip('-'), 'id',
+        )[offset - 1]
+        first_page = keyset_queryset(queryset, ordering, None)[:PAGE_SIZE + 1]
+        deep = keyset_queryset(queryset, ordering, after)[:PAGE_SIZE + 1]
+
+        bench.explain(f'{ordering}: offset page {deep_page}', ordered[offset:offset + PAGE_SIZE])
+        bench.explain(f'{ordering}: keyset page {deep_page}', deep)
+        bench.measure(f'{ordering}: offset page 1', _page(ordered))
+        bench.measure(f'{ordering}: offset page {deep_page}', lambda: (
+            ordered.count(), list(ordered[offset:offset + PAGE_SIZE])
+        ))
+        bench.measure(f'{ordering}: keyset page 1', lambda: list(first_page.all()))
+        bench.measure(f'{ordering}: keyset page {deep_page}', lambda: list(deep.all()))
+
+
+@scenario
+def search(bench: Benchmark) -> None:
+    queryset = Goal.objects.filter(
+        board__in=participant_boards(bench.user),
+    ).exclude(status=Goal.Status.archived)
+
+    for term in ('отчет', 'release'):
+        ilike = queryset.filter(Q(title__icontains=term) | Q(description__icontains=term)).order_by('title')
+        vector = SearchVector('title', 'description', config=SEARCH_CONFIG)
+        query = SearchQuery(term, config=SEARCH_CONFIG, search_type='websearch')
+        full_text = queryset.alias(search=vector).filter(search=query).annotate(
+            search_rank=SearchRank(vector, query),
+        ).order_by('-search_rank', 'title')
+
+        bench.explain(f'{term}: ilike', ilike[:PAGE_SIZE])
+        bench.explain(f'{term}: full text', full_text[:PAGE_SIZE])
+        bench.measure(f'{term}: ilike', _page(ilike))
+        bench.measure(f'{term}: full text', _page(full_text))
+
+
+@scenario
+def trigram(bench: Benchmark) -> None:
+    name = GoalCategory.objects.order_by('id').values_list('title', flat=True).first().split()[-1]
+    typo = name[:2] + name[3:]
+
+    for label, queryset in (
+        ('all categories', GoalCategory.objects.all()),
+        ('user categories', GoalCategory.objects.filter(board__in=participant_boards(bench.user))),
+    ):
+        substring = queryset.filter(title__icontains=name).order_by('title')
+        similar = trigram_search(queryset, ['title'], typo).order_by('-search_rank')
+
+        with without_index_scans():
+            bench.explain(f'{label}: substring "{name}" without index', substring[:PAGE_SIZE])
+            bench.measure(f'{label}: substring "{name}" without index', _page(substring))
+            bench.measure(f'{label}: similar to "{typo}" without index', _page(similar))
+        bench.explain(f'{label}: substring "{name}"', substring[:PAGE_SIZE])
+        bench.explain(f'{label}: similar to "{typo}"', similar[:PAGE_SIZE])
+        bench.measure(f'{label}: substring "{name}"', _page(substring))
+        bench.measure(f'{label}: similar to "{typo}"', _page(similar))
+
+
+@scenario
+def plans(bench: Benchmark) -> None:
+    for label, view_class, params in LIST_REQUESTS:
+        queryset = list_queryset(view_class, bench.user, params)
+        scans = seq_scans(queryset)
+
+        bench.explain(label, queryset)
+        bench.measure(label, lambda: list(queryset.all()))
+        if scans:
+            bench.write(f'{label}: sequential scan on {", ".join(scans)}')
+
+
+@scenario
+def roles(bench: Benchmark) -> None:
+    def _from_db() -> dict[int, int]:
+        invalidate_board_roles(bench.user.id)
+        return user_board_roles(bench.user.id)
+
+    bench.measure('roles from database', lambda: dict(
+        BoardParticipant.objects.filter(user=bench.user).values_list('board_id', 'role')
+    ))
+    bench.measure('roles cache miss', _from_db)
+    bench.measure('roles cache hit', lambda: user_board_roles(bench.user.id))
+    bench.write(f'cache stats: {dict(roles_cache_stats)}')
+
+
+@scenario
+def conditional(bench: Benchmark) -> None:
+    def _get(view: Callable, params: dict, **headers: str) -> Any:
+        request = APIRequestFactory().get('/', params, **headers)
+        force_authenticate(request, bench.user)
+        response = view(request)
+        # ответ 304 формируется Django без отрисовки тела
+        return response.render() if hasattr(response, 'render') else response
+
+    for label, view_class in (('goals', GoalListView), ('categories', GoalCategoryListView), ('boards', BoardListView)):
+        view = view_class.as_view()
+        params = {'limit': PAGE_SIZE}
+        etag = _get(view, params)['ETag']
+
+        for status, func in (
+            ('200', lambda: _get(view, params)),
+            ('304', lambda: _get(view, params, HTTP_IF_NONE_MATCH=etag)),
+        ):
+            bench.measure(f'{label} {status}', func)
+            bench.profile(f'{label} {status}', func)
+
+
+@scenario
+def response_cache(bench: Benchmark) -> None:
+    boards = list(user_board_roles(bench.user.id))
+
+    def _get(view: Callable, bump: bool) -> Any:
+        if bump:
+            bump_board_versions(*boards)
+        request = APIRequestFactory().get('/', {'limit': PAGE_SIZE})
+        force_authenticate(request, bench.user)
+        return view(request).render()
+
+    for label, view_class in (('categories', GoalCategoryListView), ('boards', BoardListView)):
+        view = view_class.as_view()
+        bench.measure(f'{label} miss', lambda: _get(view, bump=True))
+        bench.profile(f'{label} miss', lambda: _get(view, bump=True))
+        bench.measure(f'{label} hit', lambda: _get(view, bump=False))
+        bench.profile(f'{label} hit', lambda: _get(view, bump=False))
+    bench.write(f'cache stats: {dict(response_cache_stats)}')
+
+
+@scenario
+def batch(bench: Benchmark) -> None:
+    count = 1000
+    category = GoalCategory.objects.filter(
+        board__in=participant_boards(bench.user, EDITOR_ROLES), is_deleted=False,
+    ).first()
+    goals = list(Goal.objects.filter(category=category).exclude(status=Goal.Status.archived)[:count])
+    creates = [{'title': f'Цель {i}', 'category': category.id} for i in range(count)]
+    updates = [{'id': goal.id, 'priority': Goal.Priority.high} for goal in goals]
+
+    batch_view = GoalBatchView.as_view()
+    create_view = GoalCreateView.as_view()
+    detail_view = GoalDetailView.as_view()
+
+    bench.measure(f'batch: create {count}', lambda: _write(bench.user, batch_view, 'post', creates))
+    bench.measure(f'batch: update {len(updates)}', lambda: _write(bench.user, batch_view, 'post', updates))
+    bench.measure(f'single requests: create {count}', lambda: [_write(bench.user, create_view, 'post', item) for item in creates])
+    bench.measure(f'single requests: update {len(updates)}', lambda: [
+        _write(bench.user, detail_view, 'patch', {'priority': item['priority']}, pk=item['id']) for item in updates
+    ])
+
+
+@scenario
+def transition(bench: Benchmark) -> None:
+    category = GoalCategory.objects.filter(
+        board__in=participant_boards(bench.user, EDITOR_ROLES), is_deleted=False,
+    ).annotate(goals=Count('goal')).order_by('-goals').first()
+    ids = list(Goal.objects.filter(category=category).exclude(status=Goal.Status.archived).values_list('id', flat=True))
+    transition_view = GoalTransitionView.as_view()
+    detail_view = GoalDetailView.as_view()
+
+    bench.measure(f'transition: filter, {len(ids)} goals', lambda: _write(
+        bench.user, transition_view, 'post', {'filter': {'category__in': str(category.id)}, 'status': Goal.Status.done},
+    ))
+    bench.measure(f'transition: ids, {len(ids)} goals', lambda: _write(
+        bench.user, transition_view, 'post', {'ids': ids, 'status': Goal.Status.done},
+    ))
+    bench.measure(f'single requests: {len(ids)} goals', lambda: [
+        _write(bench.user, detail_view, 'patch', {'status': Goal.Status.done}, pk=pk) for pk in ids
+    ])
+
+
+@scenario
+def cascade(bench: Benchmark) -> None:
+    board_id, goals = Goal.objects.values_list('board_id').annotate(goals=Count('id')).order_by('-goals').first()
+    board = Board.objects.get(id=board_id)
+    owner = User.objects.filter(participants__board=board, participants__role=BoardParticipant.Role.owner).first()
+    detail_view = BoardDetailView.as_view()
+
+    def _delete_in_request() -> None:
+        # прежнее удаление: доска, категории и все цели одной транзакцией
+        with transaction.atomic():
+            now = timezone.now()
+            Board.objects.filter(id=board.id).update(is_deleted=True, updated=now)
+            board.categories.update(is_deleted=True, updated=now)
+            Goal.objects.filter(board=board).update(status=Goal.Status.archived, updated=now)
+            transaction.set_rollback(True)
+
+    def _archive_chunk() -> None:
+        with transaction.atomic():
+            board.categories.update(is_deleted=True)
+            archive_chunk(1000)
+            transaction.set_rollback(True)
+
+    bench.measure(f'delete with goals in request: {goals} goals', _delete_in_request)
+    bench.measure('delete request', lambda: _write(owner, detail_view, 'delete', None, pk=board.id))
+    bench.measure('background: chunk of 1000 goals', _archive_chunk)
+
+
+@scenario
+def participants(bench: Benchmark) -> None:
+    count = 5000
+    detail_view = BoardDetailView.as_view()
+
+    with transaction.atomic():
+        users = User.objects.bulk_create(
+            User(username=f'bench_participant_{i}', password='!') for i in range(count + 1)
+        )
+        owner, reader, members = users[0], users[1], users[2:]
+        board = Board.objects.create(title='Большая доска')
+        BoardParticipant.objects.bulk_create([
+            BoardParticipant(board=board, user=owner, role=BoardParticipant.Role.owner),
+            *(BoardParticipant(board=board, user=member, role=BoardParticipant.Role.reader) for member in members),
+        ])
+        roles = [{'user': member, 'role': BoardParticipant.Role.reader} for member in [*members, reader]]
+
+        def _replace_all() -> None:
+            # прежнее обновление: удаление всех участников, кроме владельца, и повторная вставка списка
+            with transaction.atomic():
+                BoardParticipant.objects.filter(board=board).exclude(user=owner).delete()
+                BoardParticipant.objects.bulk_create(
+                    [BoardParticipant(board=board, user=item['user'], role=item['role']) for item in roles],
+                    ignore_conflicts=True,
+                )
+                transaction.set_rollback(True)
+
+        def _sync() -> None:
+            serializer = BoardWithParticipantSerializer(context={'request': SimpleNamespace(user=owner)})
+            with transaction.atomic():
+                serializer.update(Board.objects.prefetch_related('participants').get(id=board.id), {'participants': roles})
+                transaction.set_rollback(True)
+
+        bench.measure(f'title-only PATCH: {count} participants', lambda: _write(
+            owner, detail_view, 'patch', {'title': 'Новое название'}, pk=board.id,
+        ))
+        put = {'title': 'Большая доска', 'participants': [
+            {'user': item['user'].username, 'role': item['role']} for item in roles
+        ]}
+        bench.measure(f'PUT, add reader: {count} participants', lambda: _write(owner, detail_view, 'put', put, pk=board.id))
+        bench.profile(f'PUT, add reader: {count} participants', lambda: _write(owner, detail_view, 'put', put, pk=board.id))
+        bench.measure('add reader: delete and insert all participants', _replace_all)
+        bench.profile('add reader: delete and insert all participants', _replace_all)
+        bench.measure('add reader: diff', _sync)
+        bench.profile('add reader: diff', _sync)
+        transaction.set_rollback(True)
+
+
+@scenario
+def stats(bench: Benchmark) -> None:
+    board_id, goals = Goal.objects.values_list('board_id').annotate(goals=Count('id')).order_by('-goals').first()
+    owner = User.objects.filter(participants__board_id=board_id, participants__role=BoardParticipant.Role.owner).first()
+    stats_view = BoardStatsView.as_view()
+
+    def _request() -> None:
+        request = APIRequestFactory().get('/')
+        force_authenticate(request, owner)
+        assert stats_view(request, pk=board_id).status_code == 200
+
+    with override_settings(BOARD_STATS_CACHE_TIMEOUT=0):
+        bench.measure(f'stats: {goals} goals, no cache', _request)
+        bench.profile(f'stats: {goals} goals, no cache', _request)
+    with override_settings(BOARD_STATS_CACHE_TIMEOUT=30):
+        bench.measure(f'stats: {goals} goals, cached', _request)
+
+    board_goals = Goal.objects.select_related('user').filter(board_id=board_id).exclude(status=Goal.Status.archived)
+    bench.measure(f'all goals serialized for counting on the client: {goals} goals', lambda: GoalWithUserSerializer(
+        board_goals, many=True,
+    ).data)
+
+
+@scenario
+def counters(bench: Benchmark) -> None:
+    categories = GoalCategory.objects.filter(
+        board__in=participant_boards(bench.user), is_deleted=False,
+    ).select_related('user').order_by('title')
+    goals = Goal.objects.filter(
+        board__in=participant_boards(bench.user), category__is_deleted=False,
+    ).exclude(status=Goal.Status.archived).select_related('user').order_by('title')
+    # прежний подсчет: COUNT по целям и комментариям в запросе каждой страницы
+    counted_categories = categories.annotate(**{
+        f'{field}_count': Count('goal', filter=Q(goal__status=status))
+        for status in Goal.Status if (field := GoalCategory.goals_counter(status))
+    })
+    counted_goals = goals.annotate(comments=Count('goalcomment'))
+
+    bench.measure('categories page: COUNT in query', _page(counted_categories))
+    bench.measure('categories page: stored counters', _page(categories))
+    bench.measure('goals page: COUNT in query', _page(counted_goals))
+    bench.measure('goals page: stored counters', _page(goals))
+
+    goal = goals.first()
+    bench.measure('create goal with category counter', lambda: _write(
+        bench.user, GoalCreateView.as_view(), 'post', {'title': 'Цель', 'category': goal.category_id},
+    ))
+    bench.measure('create comment with goal counter', lambda: _write(
+        bench.user, GoalCommentCreateView.as_view(), 'post', {'text': 'Комментарий', 'goal': goal.id},
+    ))
+
+    def _repair_chunk(model: type, chunk_size: int = 10_000) -> Callable[[], None]:
+        def _repair() -> None:
+            with transaction.atomic():
+                RECOUNTS[model](list(model.objects.order_by('id').values_list('id', flat=True)[:chunk_size]))
+                transaction.set_rollback(True)
+        return _repair
+
+    for model in RECOUNTS:
+        bench.measure(f'repair: chunk of 10000 {model._meta.model_name}', _repair_chunk(model))
+
+
+@scenario
+def export(bench: Benchmark) -> None:
+    queryset = Goal.objects.order_by('id')
+    rows = queryset.count()
+
+    bench.stream(f'ndjson: {rows} goals', lambda: ndjson_lines(goal_chunks(queryset)), rows)
+    bench.stream(f'csv: {rows} goals', lambda: csv_lines(goal_chunks(queryset)), rows)
+    bench.stream(f'ndjson with comments: {rows} goals', lambda: ndjson_lines(goal_chunks(queryset, True)), rows)
+
+    def _offset_pages(limit: int = 1000, pages: int = 100) -> Iterator[bytes]:
+        # прежняя выгрузка: последовательные страницы списка целей limit/offset
+        for page in range(pages):
+            yield json.dumps(GoalWithUserSerializer(
+                queryset.select_related('user')[page * limit:(page + 1) * limit], many=True,
+            ).data, ensure_ascii=False).encode()
+
+    bench.stream('limit/offset pages of 1000: first 100000 goals', _offset_pages, 100_000)
+    # в памяти целиком: пиковая память растет с числом целей (на 1 000 000 целей - около 3 ГБ),
+    # поэтому только первые 100 000; max rss - после всех потоковых выгрузок
+    first = queryset[:100_000]
+    bench.stream('in memory: first 100000 goals', lambda: [b''.join(ndjson_lines([
+        [goal for chunk in goal_chunks(first, chunk_size=100_000) for goal in chunk],
+    ]))], 100_000)
+
+
+@scenario
+def bulk_import(bench: Benchmark) -> None:
+    count = 100_000
+    category = GoalCategory.objects.filter(
+        board__in=participant_boards(bench.user, EDITOR_ROLES), is_deleted=False,
+    ).first()
+    rows = [
+        {
+            'title': f'Цель {i}', 'description': 'Описание ' * 20, 'category': str(category.id),
+            'due_date': '2024-05-01', 'status': str(1 + i % 3), 'priority': str(1 + i % 4),
+            'comments': '["Комментарий"]' if i % 10 == 0 else '',
+        }
+        for i in range(count)
+    ]
+
+    def _import(dry_run: bool) -> Callable[[], None]:
+        def _run() -> None:
+            with transaction.atomic():
+                result = import_goals(rows, category.board_id, bench.user, dry_run=dry_run)
+                assert not result.errors, result.errors[:3]
+                transaction.set_rollback(True)
+        return _run
+
+    def _bulk_create() -> None:
+        with transaction.atomic():
+            Goal.objects.bulk_create((
+                Goal(title=row['title'], description=row['description'], category_id=category.id,
+                     board_id=category.board_id, user=bench.user, status=int(row['status']),
+                     priority=int(row['priority']))
+                for row in rows
+            ), batch_size=10_000)
+            transaction.set_rollback(True)
+
+    copy = bench.measure(f'import via COPY: {count} goals', _import(dry_run=False))
+    dry_run = bench.measure(f'dry run: {count} goals', _import(dry_run=True))
+    bulk = bench.measure(f'bulk_create without validation: {count} goals', _bulk_create)
+    for label, timing in (('COPY', copy), ('dry run', dry_run), ('bulk_create', bulk)):
+        bench.write(f'{label}: {count / timing.median * 1000:.0f} goals/s')
+
+
+@scenario
+def json_rendering(bench: Benchmark) -> None:
+    goals = Goal.objects.select_related('user').filter(
+        board__in=participant_boards(bench.user),
+    ).exclude(status=Goal.Status.archived).order_by('title')
+
+    def _peak(func: Callable[[], Any]) -> float:
+        tracemalloc.start()
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return peak / 2 ** 20
+
+    for count in (1000, 10_000):
+        data = GoalWithUserSerializer(goals[:count], many=True).data
+        size = len(JSONRenderer().render(data)) / 2 ** 20
+        for renderer in (JSONRenderer(), ORJSONRenderer()):
+            label = f'render {count} goals: {type(renderer).__name__}'
+            timing = bench.measure(label, lambda: renderer.render(data))
+            bench.write(f'{label}: {size / timing.median * 1000:.0f} MB/s, '
+                        f'peak allocation {_peak(lambda: renderer.render(data)):.1f} MB')
+
+    body = JSONRenderer().render([
+        {'title': f'Цель {i}', 'description': 'Описание ' * 20, 'category': 1, 'due_date': '2024-05-01'}
+        for i in range(1000)
+    ])
+    for parser in (JSONParser(), ORJSONParser()):
+        label = f'parse batch of 1000 goals: {type(parser).__name__}'
+        bench.measure(label, lambda: parser.parse(io.BytesIO(body)))
+        bench.write(f'{label}: peak allocation {_peak(lambda: parser.parse(io.BytesIO(body))):.1f} MB')
+
+
+@scenario
+def projection(bench: Benchmark) -> None:
+    count = 10_000
+    boards = participant_boards(bench.user)
+    querysets = (
+        (GoalWithUserSerializer, Goal.objects.select_related('user').filter(
+            board__in=boards, category__is_deleted=False,
+        ).exclude(status=Goal.Status.archived).order_by('title', 'id')),
+        (GoalCategoryWithUserSerializer, GoalCategory.objects.select_related('user').filter(
+            board__in=boards, is_deleted=False,
+        ).order_by('title', 'id')),
+        (GoalCommentWithUserSerializer, GoalComment.objects.select_related('user').filter(
+            board__in=boards,
+        ).order_by('-created', 'id')),
+    )
+
+    for serializer_class, queryset in querysets:
+        name = f'{count} {queryset.model._meta.model_name} rows'
+        fields = values_projection(serializer_class)
+        page, rows = list(queryset[:count]), list(queryset.values(*fields.columns)[:count])
+        assert JSONRenderer().render(serializer_class(page, many=True).data) == JSONRenderer().render(
+            fields.represent(rows),
+        )
+
+        serializer = bench.measure(
+            f'{name}: ModelSerializer with query', lambda: serializer_class(queryset[:count], many=True).data,
+        )
+        values = bench.measure(
+            f'{name}: values() with query', lambda: fields.represent(queryset.values(*fields.columns)[:count]),
+        )
+        bench.measure(f'{name}: ModelSerializer only', lambda: serializer_class(page, many=True).data)
+        bench.measure(f'{name}: values() representation only', lambda: fields.represent(rows))
+        bench.write(f'{name}: {serializer.median / values.median:.1f}x faster with values()')
+
+
+@scenario
+def sparse_fields(bench: Benchmark) -> None:
+    boards = list(user_board_roles(bench.user.id))
+
+    def _get(view: Callable, params: dict) -> Any:
+        # кэш ответов списка категорий сбрасывается перед каждым запросом
+        bump_board_versions(*boards)
+        request = APIRequestFactory().get('/', params)
+        force_authenticate(request, bench.user)
+        return view(request).render()
+
+    for label, view_class, fields in (
+        ('goals', GoalListView, 'id,title,status,due_date'),
+        ('categories', GoalCategoryListView, 'id,title'),
+    ):
+        view = view_class.as_view()
+        for name, params in (
+            ('all fields', {'limit': 1000}),
+            (f'fields={fields}', {'limit': 1000, 'fields': fields}),
+        ):
+            bench.measure(f'{label} page of 1000: {name}', lambda: _get(view, params))
+            bench.write(f'{label} page of 1000: {name}: {len(_get(view, params).content) / 1024:.0f} KB')
+
+
+@contextmanager
+def _server(command: list[str], port: int, **env: str) -> Iterator[None]:
+    """ Запускает сервер приложения в отдельном процессе и ждет, пока он начнет принимать соединения """
+
+    process = subprocess.Popen(
+        command, env={**os.environ, **env}, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        for _ in range(300):
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=1).close()
+                break
+            except OSError:
+                time.sleep(0.1)
+        yield
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def _load(port: int, paths: list[str], cookie: str, concurrency: int, seconds: float) -> tuple[int, int, list[float]]:
+    """ Выполняет запросы GET по кругу в concurrency соединениях, возвращает число запросов, ошибок и задержки """
+
+    deadline = time.perf_counter() + seconds
+
+    def _client(number: int) -> tuple[list[float], int]:
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+        latencies, errors = [], 0
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                connection.request('GET', paths[number % len(paths)], headers={'Cookie': cookie})
+                response = connection.getresponse()
+                response.read()
+                errors += response.status != 200
+            except (OSError, http.client.HTTPException):
+                errors += 1
+                connection.close()
+            latencies.append(time.perf_counter() - start)
+            number += 1
+        connection.close()
+        return latencies, errors
+
+    with ThreadPoolExecutor(concurrency) as pool:
+        results = list(pool.map(_client, range(concurrency)))
+    latencies = sorted(latency for client_latencies, _ in results for latency in client_latencies)
+    return len(latencies), sum(errors for _, errors in results), latencies
+
+
+def _read_load(bench: Benchmark) -> tuple[str, list[str]]:
+    """ Возвращает cookie сессии пользователя и адреса запросов чтения (списки и цели) для нагрузки """
+
+    client = Client()
+    client.force_login(bench.user)
+    goal_ids = Goal.objects.filter(
+        board__in=participant_boards(bench.user), category__is_deleted=False,
+    ).exclude(status=Goal.Status.archived).values_list('id', flat=True)[:20]
+    paths = [
+        '/goals/goal/list?limit=50', '/goals/goal_category/list?limit=50', '/goals/goal_comment/list?limit=50',
+        *(f'/goals/goal/{goal_id}' for goal_id in goal_ids),
+    ]
+    return f'sessionid={client.cookies["sessionid"].value}', paths
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _write_load(bench: Benchmark, label: str, count: int, errors: int, latencies: list[float], seconds: float) -> None:
+    bench.write(
+        f'{label}: {count / seconds:.0f} requests/s, '
+        f'p50 {statistics.median(latencies) * 1000:.1f} ms, '
+        f'p99 {latencies[int(len(latencies) * 0.99)] * 1000:.1f} ms, errors {errors}'
+    )
+
+
+RUNSERVER = [sys.executable, 'manage.py', 'runserver', '--noreload', '{port}']
+UVICORN = ['uvicorn', 'todolist.asgi:application', '--port', '{port}', '--no-access-log', '--log-level', 'warning']
+
+
+@scenario
+def asgi(bench: Benchmark) -> None:
+    seconds = 10
+    cookie, paths = _read_load(bench)
+
+    for label, command, env in (
+        ('WSGI runserver', RUNSERVER, {}),
+        ('ASGI uvicorn, sync views', UVICORN, {'ASGI_URLCONF': 'todolist.urls'}),
+        ('ASGI uvicorn, async views', UVICORN, {}),
+    ):
+        port = _free_port()
+        with _server([part.format(port=port) for part in command], port, **env):
+            _load(port, paths, cookie, 4, 1)
+            for concurrency in (1, 16, 64):
+                _write_load(
+                    bench, f'{label}, {concurrency} clients', *_load(port, paths, cookie, concurrency, seconds), seconds,
+                )
+
+
+def _sessions() -> int:
+    """ Возвращает число открытых с начала сбора статистики сеансов с базой данных """
+
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_stat_clear_snapshot()')
+        cursor.execute('SELECT sessions FROM pg_stat_database WHERE datname = current_database()')
+        return cursor.fetchone()[0]
+
+
+@scenario
+def pool(bench: Benchmark) -> None:
+    seconds = 10
+    cookie, paths = _read_load(bench)
+
+    for label, command, env in (
+        ('WSGI runserver, new connection per request', RUNSERVER, {'DB_POOL_MAX_SIZE': '0'}),
+        ('WSGI runserver, persistent connections', RUNSERVER, {'DB_POOL_MAX_SIZE': '0', 'DB_CONN_MAX_AGE': '60'}),
+        ('WSGI runserver, pool of 16', RUNSERVER, {'DB_POOL_MAX_SIZE': '16'}),
+        ('ASGI uvicorn, new connection per request', UVICORN, {'DB_POOL_MAX_SIZE': '0'}),
+        ('ASGI uvicorn, persistent connections', UVICORN, {'DB_POOL_MAX_SIZE': '0', 'DB_CONN_MAX_AGE': '60'}),
+        ('ASGI uvicorn, pool of 16', UVICORN, {'DB_POOL_MAX_SIZE': '16'}),
+    ):
+        port = _free_port()
+        sessions = _sessions()
+        with _server([part.format(port=port) for part in command], port, **env):
+            _load(port, paths, cookie, 4, 1)
+            for concurrency in (1, 16, 64):
+                _write_load(
+                    bench, f'{label}, {concurrency} clients', *_load(port, paths, cookie, concurrency, seconds), seconds,
+                )
+        # сеансы учитываются в статистике при отключении - после остановки сервера
+        time.sleep(1)
+        bench.write(f'{label}: {_sessions() - sessions} database connections opened')
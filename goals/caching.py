@@ -0,0 +1,101 @@
+""" Кэш ответов списков досок и категорий
+
+Ответ списка хранится в кэше Django под ключом из пользователя, адреса запроса (фильтры, сортировка, страница)
+и версий всех досок пользователя. Версия доски меняется (bump_board_versions) при любом изменении доски,
+ее категорий и участников: сигналы моделей (goals/signals.py) и явные вызовы после массовых update()/bulk_create.
+Состав досок пользователя берется из кэша ролей (goals.access), поэтому новая доска тоже меняет ключ.
+Как и роли, версии записываются сразу и повторно после фиксации транзакции.
+
+"""
+
+import hashlib
+import time
+from collections import Counter
+from typing import Iterable, Optional
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import transaction
+from django.http.response import HttpResponseBase
+from django.utils.cache import get_conditional_response
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from goals.access import board_roles
+
+RESPONSE_CACHE_TIMEOUT = 5 * 60
+
+# счетчики обращений к кэшу ответов в текущем процессе: hits / misses
+response_cache_stats: Counter = Counter()
+
+
+def board_versions(board_ids: Iterable[int]) -> dict[int, int]:
+    """ Возвращает текущие версии досок, назначая новые доскам без версии в кэше """
+
+    keys = {f'goals:board_version:{board_id}': board_id for board_id in board_ids}
+    versions = cache.get_many(keys)
+    for key in keys.keys() - versions.keys():
+        cache.add(key, time.time_ns(), None)
+        versions[key] = cache.get(key)
+    return {keys[key]: version for key, version in versions.items()}
+
+
+def bump_board_versions(*board_ids: int) -> None:
+    """ Меняет версии досок сейчас и после фиксации текущей транзакции """
+
+    _bump(board_ids)
+    transaction.on_commit(lambda: _bump(board_ids))
+
+
+def _bump(board_ids: Iterable[int]) -> None:
+    version = time.time_ns()
+    cache.set_many({f'goals:board_version:{board_id}': version for board_id in set(board_ids)}, None)
+
+
+class CachedListMixin:
+    """ Выдает список из кэша ответов, пока не изменилась ни одна из досок пользователя """
+
+    def list(self, request: Request, *args, **kwargs) -> HttpResponseBase:
+        key, cached = self._cached_list(request)
+        if cached is None:
+            response_cache_stats['misses'] += 1
+            response = super().list(request, *args, **kwargs)
+            if response.status_code == 200:
+                cache.set(key, (response.data, response.get('ETag')), RESPONSE_CACHE_TIMEOUT)
+            return response
+
+        response_cache_stats['hits'] += 1
+        return self._cached_response(request, cached)
+
+    async def alist(self, request: Request, *args, **kwargs) -> HttpResponseBase:
+        # роли и версии досок - из кэша или БД, в потоке
+        key, cached = await sync_to_async(self._cached_list)(request)
+        if cached is None:
+            response_cache_stats['misses'] += 1
+            response = await super().alist(request, *args, **kwargs)
+            if response.status_code == 200:
+                await cache.aset(key, (response.data, response.get('ETag')), RESPONSE_CACHE_TIMEOUT)
+            return response
+
+        response_cache_stats['hits'] += 1
+        return self._cached_response(request, cached)
+
+    @staticmethod
+    def _cached_list(request: Request) -> tuple[str, Optional[tuple]]:
+        """ Возвращает ключ ответа в кэше (по версиям досок пользователя) и ответ из кэша """
+
+        versions = sorted(board_versions(board_roles(request)).items())
+        key = 'goals:list:{}:{}'.format(
+            request.user.id, hashlib.md5(f'{request.get_full_path()}:{versions}'.encode()).hexdigest(),
+        )
+        return key, cache.get(key)
+
+    @staticmethod
+    def _cached_response(request: Request, cached: tuple) -> HttpResponseBase:
+        data, etag = cached
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = Response(data)
+        if etag:
+            response['ETag'] = etag
+        return response
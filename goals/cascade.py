@@ -0,0 +1,63 @@
+""" Архивирование целей удаленных досок и категорий
+
+При удалении доски (вместе с ее категориями) или категории запрос только помечает их удаленными,
+а цели архивируются в фоне командой python manage.py archive_deleted_goals - частями по chunk_size целей,
+каждая часть в отдельной короткой транзакции, чтобы не держать блокировки на всех целях доски.
+Пока цели не архивированы, они скрыты из списков и детальной информации (категория цели удалена).
+
+Очередь не хранится отдельно: ожидающие цели - неархивные цели удаленных категорий (pending_goals),
+поэтому перезапуск команды продолжает работу с того же места, а повторный запуск ничего не меняет.
+Несколько экземпляров команды могут работать одновременно: заблокированные цели пропускаются (SKIP LOCKED).
+
+"""
+
+from collections import Counter
+from typing import Callable, Optional
+
+from django.db import transaction
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from goals.models import Goal, GoalCategory
+
+DEFAULT_CHUNK_SIZE = 1000
+
+
+def pending_goals() -> QuerySet[Goal]:
+    """ Возвращает цели удаленных категорий, которые еще не архивированы """
+
+    return Goal.objects.filter(category__is_deleted=True).exclude(status=Goal.Status.archived)
+
+
+def archive_chunk(chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """ Архивирует очередную часть ожидающих целей, возвращает число архивированных целей """
+
+    with transaction.atomic():
+        goals = list(
+            pending_goals().order_by('id').select_for_update(of=('self',), skip_locked=True)
+            .values_list('id', 'board_id', 'category_id', 'status')[:chunk_size]
+        )
+        if not goals:
+            return 0
+        archived = Goal.objects.filter(id__in=[goal[0] for goal in goals]).update(
+            status=Goal.Status.archived, updated=timezone.now(),
+        )
+        # архивные цели не учитываются в счетчиках категорий
+        changes = Counter()
+        for _, _, category_id, goal_status in goals:
+            changes[category_id, goal_status] -= 1
+        GoalCategory.count_goals(changes, {board_id for _, board_id, _, _ in goals})
+        return archived
+
+
+def archive_pending_goals(chunk_size: int = DEFAULT_CHUNK_SIZE,
+                          progress: Optional[Callable[[int, int], None]] = None) -> int:
+    """ Архивирует все ожидающие цели частями, после каждой части вызывает progress(архивировано, всего) """
+
+    total = pending_goals().count()
+    done = 0
+    while archived := archive_chunk(chunk_size):
+        done += archived
+        if progress is not None:
+            progress(done, max(total, done))
+    return done
@@ -0,0 +1,114 @@
+""" Условные GET-запросы (ETag / Last-Modified) для списков и детальной информации
+
+ConditionalListMixin - версия списка вычисляется одним агрегатным запросом (количество, max(updated) записей
+и max(updated) их пользователей - etag_user_field) по отфильтрованному queryset представления, без выборки
+страницы и сериализации. У списков только ETag: записи, которые ушли из списка (удаление, архивирование,
+отзыв доступа), не сдвигают max(updated), поэтому Last-Modified не отражал бы их, а ETag меняется вместе
+с количеством записей.
+ConditionalRetrieveMixin - версия объекта берется из его поля updated и поля updated его пользователя
+(get_object_version), ETag дополняют данные get_object_etag_parts (например, число выдаваемых участников доски).
+Данные пользователя (имя, email) вложены в ответы, поэтому изменение профиля тоже меняет версию.
+Асинхронные версии (alist / aretrieve) выполняют те же запросы через асинхронный интерфейс ORM (goals/asynchronous.py).
+Если клиент передал совпадающий If-None-Match (или If-Modified-Since не раньше версии), возвращается
+304 Not Modified без тела ответа.
+
+Массовые изменения (update()) в приложении обновляют поле updated, поэтому версия меняется и для них.
+
+"""
+
+import hashlib
+from datetime import datetime
+from typing import Any, Optional
+
+from django.db.models import Aggregate, Count, Max, Model
+from django.http.response import HttpResponseBase
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from goals.asynchronous import afiltered_queryset, aget_object
+
+
+def _etag(*parts: Any) -> str:
+    return hashlib.md5(':'.join(map(str, parts)).encode()).hexdigest()
+
+
+def _conditional_response(request: Request, etag: str, last_modified: Optional[datetime]) -> Optional[HttpResponseBase]:
+    """ Возвращает ответ 304 (412 для If-Match), если версия данных у клиента актуальна """
+
+    return get_conditional_response(
+        request, etag=quote_etag(etag), last_modified=int(last_modified.timestamp()) if last_modified else None,
+    )
+
+
+def _set_headers(response: HttpResponseBase, etag: str, last_modified: Optional[datetime]) -> HttpResponseBase:
+    if response.status_code in (200, 304):
+        response['ETag'] = quote_etag(etag)
+        if last_modified:
+            response['Last-Modified'] = http_date(last_modified.timestamp())
+    return response
+
+
+class ConditionalListMixin:
+    # связь с пользователем, данные которого выдаются вместе с записью (None - не выдаются)
+    etag_user_field: Optional[str] = 'user'
+
+    def list(self, request: Request, *args, **kwargs) -> HttpResponseBase:
+        stats = self.filter_queryset(self.get_queryset()).order_by().aggregate(**self._list_version())
+        # выдача зависит от пользователя и параметров запроса (фильтры, сортировка, страница)
+        etag = _etag(request.user.id, request.get_full_path(), *stats.values())
+
+        response = _conditional_response(request, etag, None)
+        if response is None:
+            response = super().list(request, *args, **kwargs)
+        return _set_headers(response, etag, None)
+
+    async def alist(self, request: Request, *args, **kwargs) -> HttpResponseBase:
+        stats = await (await afiltered_queryset(self)).order_by().aaggregate(**self._list_version())
+        etag = _etag(request.user.id, request.get_full_path(), *stats.values())
+
+        response = _conditional_response(request, etag, None)
+        if response is None:
+            response = await super().alist(request, *args, **kwargs)
+        return _set_headers(response, etag, None)
+
+    def _list_version(self) -> dict[str, Aggregate]:
+        version = {'count': Count('id'), 'last_modified': Max('updated')}
+        if self.etag_user_field:
+            version['users_modified'] = Max(f'{self.etag_user_field}__updated')
+        return version
+
+
+class ConditionalRetrieveMixin:
+    # связь с пользователем, данные которого выдаются вместе с объектом (None - не выдаются)
+    etag_user_field: Optional[str] = 'user'
+
+    def retrieve(self, request: Request, *args, **kwargs) -> HttpResponseBase:
+        return self._retrieve_response(request, self.get_object())
+
+    async def aretrieve(self, request: Request, *args, **kwargs) -> HttpResponseBase:
+        return self._retrieve_response(request, await aget_object(self))
+
+    def _retrieve_response(self, request: Request, instance: Model) -> HttpResponseBase:
+        last_modified = self.get_object_version(instance)
+        # выдача зависит от выбранных полей (goals/fieldsets.py)
+        etag = _etag(instance.pk, last_modified, request.get_full_path(), *self.get_object_etag_parts(instance))
+
+        response = _conditional_response(request, etag, last_modified)
+        if response is None:
+            response = Response(self.get_serializer(instance).data)
+        return _set_headers(response, etag, last_modified)
+
+    def get_object_version(self, instance: Model) -> datetime:
+        """ Возвращает время последнего изменения данных объекта и его пользователя (если он выдается) """
+
+        # пользователь загружается вместе с объектом, только если выдается (goals/fieldsets.py)
+        if not self.etag_user_field or not instance._meta.get_field(self.etag_user_field).is_cached(instance):
+            return instance.updated
+        return max(instance.updated, getattr(instance, self.etag_user_field).updated)
+
+    def get_object_etag_parts(self, instance: Model) -> tuple:
+        """ Возвращает данные объекта, от которых зависит ETag, кроме времени изменения """
+
+        return ()
@@ -0,0 +1,44 @@
+""" Исправление счетчиков (участники досок, цели категорий по статусам, комментарии целей)
+
+Счетчики поддерживаются приложением в тех же транзакциях, что и изменения данных: методы моделей
+(save/delete) и явные вызовы count_goals / count_comments / recount_participants после массовых операций
+(bulk_create, bulk_update, update). Изменения в обход приложения (SQL, queryset.delete() целей и комментариев)
+исправляет команда python manage.py repair_counters: она пересчитывает счетчики частями по chunk_size записей,
+каждая часть - один запрос UPDATE с подзапросом в отдельной транзакции.
+
+"""
+
+from typing import Callable, Optional
+
+from django.db import transaction
+from django.db.models import Model
+
+from goals.models import Board, Goal, GoalCategory
+
+DEFAULT_CHUNK_SIZE = 10_000
+
+# модель -> метод пересчета счетчиков для списка идентификаторов
+RECOUNTS: dict[type[Model], Callable] = {
+    Board: Board.recount_participants,
+    GoalCategory: GoalCategory.recount_goals,
+    Goal: Goal.recount_comments,
+}
+
+
+def repair_counters(chunk_size: int = DEFAULT_CHUNK_SIZE,
+                    progress: Optional[Callable[[type[Model], int, int], None]] = None) -> None:
+    """ Пересчитывает счетчики всех моделей частями, после каждой части вызывает progress(модель, готово, всего) """
+
+    for model, recount in RECOUNTS.items():
+        total = model.objects.count()
+        done = 0
+        last_id = 0
+        while ids := list(
+            model.objects.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:chunk_size]
+        ):
+            with transaction.atomic():
+                recount(ids)
+            done += len(ids)
+            last_id = ids[-1]
+            if progress is not None:
+                progress(model, done, max(total, done))
@@ -0,0 +1,147 @@
+""" Потоковая выгрузка целей (NDJSON / CSV)
+
+Цели читаются серверным курсором PostgreSQL (QuerySet.iterator) частями по chunk_size строк
+и сразу отдаются клиенту через StreamingHttpResponse - ни запрос, ни ответ не хранятся в памяти целиком,
+поэтому память процесса не зависит от числа выгружаемых целей (в отличие от постраничного списка,
+глубокие страницы которого с ростом смещения выполняются все дольше).
+Комментарии (with_comments) загружаются одним запросом на каждую часть целей.
+
+Под ASGI (asynchronous) ответ получает асинхронный итератор: каждая порция байт готовится в потоке запроса
+(sync_to_async), иначе Django собрал бы весь синхронный итератор в список до отправки первого байта.
+
+Поля выгружаются в том же представлении, что и в ответах API (даты - ISO 8601), автор - имя пользователя.
+Серверные курсоры требуют DISABLE_SERVER_SIDE_CURSORS = False (не работают через pgbouncer в режиме транзакций).
+
+"""
+
+import csv
+import io
+import json
+from collections import defaultdict
+from itertools import islice
+from typing import AsyncIterator, Callable, Iterable, Iterator
+
+from asgiref.sync import sync_to_async
+from django.db.models import QuerySet
+from django.http import StreamingHttpResponse
+from rest_framework import serializers
+
+from goals.models import Goal, GoalComment
+from goals.projections import datetime_representation
+
+EXPORT_CHUNK_SIZE = 2000
+
+# выгружаемое поле -> поле запроса values_list
+GOAL_FIELDS = {
+    'id': 'id',
+    'title': 'title',
+    'description': 'description',
+    'category': 'category_id',
+    'board': 'board_id',
+    'due_date': 'due_date',
+    'status': 'status',
+    'priority': 'priority',
+    'comments_count': 'comments_count',
+    'user': 'user__username',
+    'created': 'created',
+    'updated': 'updated',
+}
+COMMENT_FIELDS = {
+    'id': 'id',
+    'text': 'text',
+    'user': 'user__username',
+    'created': 'created',
+    'updated': 'updated',
+}
+
+# формат -> (тип содержимого, расширение файла)
+EXPORT_FORMATS = {
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'csv': ('text/csv; charset=utf-8', 'csv'),
+}
+
+
+def export_response(queryset: QuerySet[Goal], export_format: str, with_comments: bool = False,
+                    chunk_size: int = EXPORT_CHUNK_SIZE, asynchronous: bool = False) -> StreamingHttpResponse:
+    """ Возвращает потоковый ответ с выгрузкой целей queryset в формате export_format """
+
+    content_type, extension = EXPORT_FORMATS[export_format]
+    chunks = goal_chunks(queryset, with_comments, chunk_size)
+    content = ndjson_lines(chunks) if export_format == 'ndjson' else csv_lines(chunks, with_comments)
+    response = StreamingHttpResponse(aiterate(content) if asynchronous else content, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="goals.{extension}"'
+    return response
+
+
+async def aiterate(iterator: Iterator[bytes]) -> AsyncIterator[bytes]:
+    """ Отдает порции синхронного итератора асинхронно, каждая порция читается в потоке запроса """
+
+    # thread_sensitive: все порции читаются в одном потоке - в его соединении с БД открыт серверный курсор
+    next_part = sync_to_async(next, thread_sensitive=True)
+    try:
+        while (part := await next_part(iterator, None)) is not None:
+            yield part
+    finally:
+        # клиент отключился - генератор закрывается в том же потоке, серверный курсор закрывается
+        await sync_to_async(iterator.close, thread_sensitive=True)()
+
+
+def goal_chunks(queryset: QuerySet[Goal], with_comments: bool = False,
+                chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[list[dict]]:
+    """ Отдает цели частями по chunk_size (словари выгружаемых полей, с комментариями, если with_comments) """
+
+    represent_datetime = datetime_representation()
+    goal_dates = {'due_date': serializers.DateField().to_representation, 'created': represent_datetime,
+                  'updated': represent_datetime}
+    comment_dates = {'created': represent_datetime, 'updated': represent_datetime}
+
+    rows = queryset.values_list(*GOAL_FIELDS.values()).iterator(chunk_size=chunk_size)
+    while chunk := list(islice(rows, chunk_size)):
+        goals = [_represent(dict(zip(GOAL_FIELDS, row)), goal_dates) for row in chunk]
+        if with_comments:
+            comments = defaultdict(list)
+            for goal_id, *values in GoalComment.objects.filter(
+                goal_id__in=[goal['id'] for goal in goals],
+            ).order_by('goal_id', 'id').values_list('goal_id', *COMMENT_FIELDS.values()):
+                comments[goal_id].append(_represent(dict(zip(COMMENT_FIELDS, values)), comment_dates))
+            for goal in goals:
+                goal['comments'] = comments[goal['id']]
+        yield goals
+
+
+def ndjson_lines(chunks: Iterable[list[dict]]) -> Iterator[bytes]:
+    """ Отдает цели в формате NDJSON - по одному объекту JSON в строке, одна порция байт на часть целей """
+
+    for goals in chunks:
+        yield ''.join(json.dumps(goal, ensure_ascii=False) + '\n' for goal in goals).encode()
+
+
+def csv_lines(chunks: Iterable[list[dict]], with_comments: bool = False) -> Iterator[bytes]:
+    """ Отдает цели в формате CSV с заголовком, комментарии - в колонке comments массивом JSON """
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([*GOAL_FIELDS, *(['comments'] if with_comments else [])])
+    for goals in chunks:
+        for goal in goals:
+            row = [goal[field] for field in GOAL_FIELDS]
+            if with_comments:
+                row.append(json.dumps(goal['comments'], ensure_ascii=False))
+            writer.writerow(row)
+        yield _flush(buffer)
+    if buffer.tell():
+        yield _flush(buffer)
+
+
+def _flush(buffer: io.StringIO) -> bytes:
+    data = buffer.getvalue().encode()
+    buffer.seek(0)
+    buffer.truncate()
+    return data
+
+
+def _represent(values: dict, dates: dict[str, Callable]) -> dict:
+    for field, represent in dates.items():
+        if values[field] is not None:
+            values[field] = represent(values[field])
+    return values
@@ -0,0 +1,109 @@
+""" Выборочные поля ответа: ?fields=id,title,status / ?exclude=description,user
+
+Параметры задают поля ответа списков и детальной информации (только GET/HEAD) через запятую: fields - какие
+поля выдать, exclude - какие убрать (можно вместе, неизвестное поле - ответ 400). Лишние поля убираются
+из сериализатора, а выборка переносится в запрос: queryset ограничивается колонками выдаваемых полей (only()),
+соединение с пользователем (select_related) и загрузка участников (prefetch_related) выполняются,
+только если выдаются соответствующие поля. Списки из строк values() (goals/projections.py) выбирают
+только колонки выдаваемых полей.
+
+SparseFieldsMixin - поддержка параметров в представлении; sparse_required_fields - поля модели,
+которые нужны представлению независимо от выдачи (проверка прав по доске, версия объекта для ETag).
+
+"""
+
+from typing import Iterable, Optional
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import QuerySet
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+from rest_framework.request import Request
+
+FIELDS_PARAM = 'fields'
+EXCLUDE_PARAM = 'exclude'
+
+
+def requested_fields(request: Request, names: Iterable[str]) -> Optional[tuple[str, ...]]:
+    """ Возвращает выдаваемые поля в порядке names (None - параметры не переданы, выдаются все поля) """
+
+    names = tuple(names)
+    selected, given = set(names), False
+    for param in (FIELDS_PARAM, EXCLUDE_PARAM):
+        values = {value.strip() for value in request.query_params.get(param, '').split(',') if value.strip()}
+        if not values:
+            continue
+        if unknown := values - set(names):
+            raise ValidationError({param: [f'Unknown fields: {", ".join(sorted(unknown))}']})
+        selected = selected & values if param == FIELDS_PARAM else selected - values
+        given = True
+
+    return tuple(name for name in names if name in selected) if given else None
+
+
+def sparse_queryset(queryset: QuerySet, serializer: serializers.Serializer, fields: Iterable[str],
+                    required: Iterable[str] = ('id',)) -> QuerySet:
+    """ Ограничивает queryset колонками и связями, нужными полям fields сериализатора """
+
+    model = queryset.model
+    columns = set(required)
+    related, prefetch = [], False
+    for name in fields:
+        field = serializer.fields[name]
+        if isinstance(field, serializers.ListSerializer):
+            prefetch = True
+            continue
+        if isinstance(field, serializers.ModelSerializer):
+            related.append(field.source)
+            columns.add(field.source)
+            columns.update(f'{field.source}__{child.source}' for child in field.fields.values())
+            # время изменения связанной записи входит в версию ответа (goals/conditional.py)
+            related_model = model._meta.get_field(field.source).related_model
+            if any(column.name == 'updated' for column in related_model._meta.concrete_fields):
+                columns.add(f'{field.source}__updated')
+            continue
+        try:
+            if model._meta.get_field(field.source).concrete:
+                columns.add(field.source)
+        except FieldDoesNotExist:
+            # вычисляемое поле: колонки не известны, запрос не ограничивается
+            return queryset
+
+    queryset = queryset.select_related(None).only(*columns)
+    if related:
+        queryset = queryset.select_related(*related)
+    if not prefetch:
+        queryset = queryset.prefetch_related(None)
+    return queryset
+
+
+class SparseFieldsMixin:
+    """ Поля ответа и колонки запроса по параметрам fields / exclude """
+
+    sparse_required_fields: tuple[str, ...] = ('id', 'updated')
+
+    def get_sparse_fields(self) -> Optional[tuple[str, ...]]:
+        """ Возвращает выдаваемые поля сериализатора (None - все поля или запрос на изменение) """
+
+        if self.request.method not in ('GET', 'HEAD'):
+            return None
+        if not hasattr(self, '_sparse_fields'):
+            fields = self.get_serializer_class()().fields
+            self._sparse_fields = requested_fields(
+                self.request, (name for name, field in fields.items() if not field.write_only),
+            )
+        return self._sparse_fields
+
+    def get_queryset(self) -> QuerySet:
+        queryset = super().get_queryset()
+        if (fields := self.get_sparse_fields()) is None:
+            return queryset
+        return sparse_queryset(queryset, self.get_serializer_class()(), fields, self.sparse_required_fields)
+
+    def get_serializer(self, *args, **kwargs) -> serializers.BaseSerializer:
+        serializer = super().get_serializer(*args, **kwargs)
+        if (fields := self.get_sparse_fields()) is not None:
+            target = serializer.child if isinstance(serializer, serializers.ListSerializer) else serializer
+            for name in [name for name in target.fields if name not in fields]:
+                del target.fields[name]
+        return serializer
@@ -1,6 +1,39 @@
+from functools import reduce
+from operator import or_
+
+from django.contrib.postgres.search import SearchVector, SearchQuery, SearchRank, TrigramSimilarity
+from django.db import connections
+from django.db.models import QuerySet, Q
+from django.db.models.functions import Greatest, Upper
 from django_filters import rest_framework
+from rest_framework import filters
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
 
 from goals.models import Goal
+from goals.pagination import KeysetLimitOffsetPagination
+
+# конфигурация должна совпадать с выражением GIN-индекса goal_search_idx (миграция 0009)
+SEARCH_CONFIG = 'russian'
+
+
+def trigram_search(queryset: QuerySet, fields: list[str], term: str) -> QuerySet:
+    """ Отбирает записи, содержащие term или похожие на него (pg_trgm), и добавляет оценку похожести search_rank
+
+    Условия строятся над UPPER(поле) - как и icontains в Django, поэтому используют
+    триграммные GIN-индексы по UPPER(title) (миграция 0010).
+    """
+
+    aliases = {f'{field}_upper': Upper(field) for field in fields}
+    condition = reduce(or_, (
+        Q(**{f'{alias}__contains': term.upper()}) | Q(**{f'{alias}__trigram_similar': term.upper()})
+        for alias in aliases
+    ))
+    similarities = [TrigramSimilarity(alias, term.upper()) for alias in aliases]
+
+    return queryset.alias(**aliases).filter(condition).annotate(
+        search_rank=Greatest(*similarities) if len(similarities) > 1 else similarities[0],
+    )
 
 
 class GoalFilter(rest_framework.FilterSet):
@@ -12,3 +45,60 @@ class GoalFilter(rest_framework.FilterSet):
             'status': ['in'],
             'priority': ['in'],
         }
+
+
+class FullTextSearchFilter(filters.SearchFilter):
+    """ Полнотекстовый поиск PostgreSQL по search_fields представления
+
+    Выражение to_tsvector совпадает с выражением GIN-индекса, поэтому поиск идет по индексу.
+    Если сортировка не задана параметром ordering, результаты упорядочиваются по релевантности
+    (кроме представлений с search_ranking = False - их порядок не меняется).
+    На других СУБД (SQLite в тестовых запусках) используется стандартный поиск через ILIKE.
+    """
+
+    def filter_queryset(self, request: Request, queryset: QuerySet, view) -> QuerySet:
+        search_fields = self.get_search_fields(view, request)
+        search_terms = self.get_search_terms(request)
+
+        if not search_fields or not search_terms:
+            return queryset
+
+        if connections[queryset.db].vendor != 'postgresql':
+            return super().filter_queryset(request, queryset, view)
+
+        vector = SearchVector(*search_fields, config=SEARCH_CONFIG)
+        query = SearchQuery(' '.join(search_terms), config=SEARCH_CONFIG, search_type='websearch')
+        queryset = queryset.alias(search=vector).filter(search=query)
+
+        # выдача по ключу требует сортировки по полю модели, поэтому релевантность в ней не используется
+        if getattr(view, 'search_ranking', True) and not (
+            {api_settings.ORDERING_PARAM, KeysetLimitOffsetPagination.cursor_query_param} & set(request.query_params)
+        ):
+            queryset = queryset.annotate(search_rank=SearchRank(vector, query)).order_by(
+                '-search_rank', *queryset.query.order_by
+            )
+        return queryset
+
+
+class TrigramSearchFilter(filters.SearchFilter):
+    """ Поиск подстроки и похожих названий (pg_trgm) для подсказок при вводе
+
+    Если сортировка не задана параметром ordering, сначала выдаются наиболее похожие записи.
+    На других СУБД используется стандартный поиск через ILIKE.
+    """
+
+    def filter_queryset(self, request: Request, queryset: QuerySet, view) -> QuerySet:
+        search_fields = self.get_search_fields(view, request)
+        search_terms = self.get_search_terms(request)
+
+        if not search_fields or not search_terms:
+            return queryset
+
+        if connections[queryset.db].vendor != 'postgresql':
+            return super().filter_queryset(request, queryset, view)
+
+        queryset = trigram_search(queryset, search_fields, ' '.join(search_terms))
+
+        if not {api_settings.ORDERING_PARAM, KeysetLimitOffsetPagination.cursor_query_param} & set(request.query_params):
+            queryset = queryset.order_by('-search_rank', *queryset.query.order_by)
+        return queryset
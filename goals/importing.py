@@ -0,0 +1,262 @@
+""" Массовая загрузка целей и комментариев на доску (NDJSON / CSV)
+
+Формат файла совпадает с выгрузкой (goals/export.py), поэтому выгрузку можно загрузить на другую доску:
+используются поля title, description, category, due_date, status, priority и comments
+(в NDJSON - массив строк или объектов с text, в CSV - такой же массив JSON в колонке comments),
+остальные поля выгрузки (id, board, user, даты) не учитываются. Автор целей и комментариев - загружающий.
+
+Права проверяются один раз на всю загрузку (владелец/редактор доски), категории строк - по множеству
+неудаленных категорий доски, загруженному одним запросом. Строки проверяются без сериализаторов DRF
+(сообщения об ошибках те же) и записываются частями по batch_size: на PostgreSQL через COPY
+(идентификаторы целей для комментариев заранее берутся из последовательности), на других СУБД - bulk_create.
+Счетчики категорий меняются одним запросом на категорию после загрузки, счетчики комментариев
+записываются вместе с целями.
+
+Загрузка выполняется в одной транзакции: при ошибках в строках не записывается ничего,
+а проверка продолжается, чтобы вернуть ошибки всех строк (не больше MAX_ERRORS).
+В режиме dry_run строки только проверяются.
+
+"""
+
+import csv
+import datetime
+import io
+import json
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import IO, Iterable, Iterator, Optional, Union
+
+from django.core.exceptions import PermissionDenied
+from django.db import connection, transaction
+from django.utils import timezone
+
+from core.models import User
+from goals.access import EDITOR_ROLES, user_board_roles
+from goals.models import Goal, GoalCategory, GoalComment
+
+IMPORT_BATCH_SIZE = 10_000
+MAX_ERRORS = 1000
+IMPORT_FORMATS = ('ndjson', 'csv')
+
+TITLE_MAX_LENGTH = Goal._meta.get_field('title').max_length
+STATUSES = set(Goal.Status.values)
+PRIORITIES = set(Goal.Priority.values)
+
+
+@dataclass
+class ImportResult:
+    goals: int = 0
+    comments: int = 0
+    # ошибки строк: {'row': номер строки данных (с 1), 'errors': {поле: [сообщения]}}
+    errors: list[dict] = field(default_factory=list)
+
+
+@dataclass
+class _Goal:
+    title: str
+    description: str
+    category_id: int
+    due_date: Optional[datetime.date]
+    status: int
+    priority: int
+    comments: list[str]
+
+
+def read_rows(file: IO[bytes], import_format: str) -> Iterator[Union[dict, ValueError]]:
+    """ Читает строки файла: словари полей или ValueError для строк, которые не удалось разобрать
+
+    Файл не в UTF-8 (например, CSV из Excel в cp1251) или испорченный CSV дальше не читается:
+    последней строкой возвращается ValueError с причиной.
+    """
+
+    text = io.TextIOWrapper(file, encoding='utf-8-sig', newline='' if import_format == 'csv' else None)
+    try:
+        yield from csv.DictReader(text) if import_format == 'csv' else _json_rows(text)
+    except UnicodeDecodeError:
+        yield ValueError('File is not UTF-8 encoded text.')
+    except csv.Error as error:
+        yield ValueError(f'Invalid CSV: {error}')
+
+
+def _json_rows(lines: Iterable[str]) -> Iterator[Union[dict, ValueError]]:
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as error:
+            yield ValueError(f'Invalid JSON: {error}')
+            continue
+        yield row if isinstance(row, dict) else ValueError('Expected a JSON object.')
+
+
+def import_goals(rows: Iterable[Union[dict, ValueError]], board_id: int, user: User, dry_run: bool = False,
+                 batch_size: int = IMPORT_BATCH_SIZE) -> ImportResult:
+    """ Проверяет строки и загружает цели с комментариями на доску (кроме dry_run и загрузки с ошибками) """
+
+    if user_board_roles(user.id).get(board_id) not in EDITOR_ROLES:
+        raise PermissionDenied('must be owner or writer in project')
+
+    categories = set(GoalCategory.objects.filter(board_id=board_id, is_deleted=False).values_list('id', flat=True))
+    result = ImportResult()
+    batch: list[_Goal] = []
+    counts = Counter()
+    with transaction.atomic():
+        for number, row in enumerate(rows, start=1):
+            goal = _validate(row, categories)
+            if isinstance(goal, dict):
+                result.errors.append({'row': number, 'errors': goal})
+                if len(result.errors) >= MAX_ERRORS:
+                    break
+                continue
+
+            result.goals += 1
+            result.comments += len(goal.comments)
+            if dry_run or result.errors:
+                continue
+            batch.append(goal)
+            counts[goal.category_id, goal.status] += 1
+            if len(batch) >= batch_size:
+                _load(batch, board_id, user.id)
+                batch = []
+
+        if dry_run or result.errors:
+            transaction.set_rollback(True)
+            return result
+
+        if batch:
+            _load(batch, board_id, user.id)
+        GoalCategory.count_goals(counts, [board_id])
+    return result
+
+
+def _validate(row: Union[dict, ValueError], categories: set[int]) -> Union[_Goal, dict[str, list[str]]]:
+    """ Возвращает проверенную цель или ошибки по полям (сообщения как у сериализаторов DRF) """
+
+    if isinstance(row, ValueError):
+        return {'non_field_errors': [str(row)]}
+
+    errors = {}
+    title = row.get('title') or ''
+    title = title.strip() if isinstance(title, str) else title
+    if not isinstance(title, str) or not title:
+        errors['title'] = ['This field is required.']
+    elif len(title) > TITLE_MAX_LENGTH:
+        errors['title'] = [f'Ensure this field has no more than {TITLE_MAX_LENGTH} characters.']
+
+    description = row.get('description') or ''
+    description = description.strip() if isinstance(description, str) else description
+    if not isinstance(description, str):
+        errors['description'] = ['Not a valid string.']
+
+    category = _integer(row.get('category'))
+    if category in (None, ''):
+        errors['category'] = ['This field is required.']
+    elif type(category) is not int or category not in categories:
+        errors['category'] = [f'Invalid pk "{row.get("category")}" - object does not exist.']
+
+    due_date = row.get('due_date') or None
+    if due_date is not None:
+        try:
+            due_date = datetime.date.fromisoformat(due_date)
+        except (TypeError, ValueError):
+            errors['due_date'] = ['Date has wrong format. Use one of these formats instead: YYYY-MM-DD.']
+
+    choices = {}
+    defaults = (('status', STATUSES, Goal.Status.to_do), ('priority', PRIORITIES, Goal.Priority.medium))
+    for name, values, default in defaults:
+        value = _integer(row.get(name))
+        if value in (None, ''):
+            choices[name] = default
+        elif type(value) is int and value in values:
+            choices[name] = value
+        else:
+            errors[name] = [f'"{row.get(name)}" is not a valid choice.']
+
+    comments = row.get('comments') or []
+    if isinstance(comments, str):
+        try:
+            comments = json.loads(comments)
+        except ValueError:
+            comments = None
+    if not isinstance(comments, list):
+        errors['comments'] = ['Expected a list of items.']
+    else:
+        comments = [comment.get('text') if isinstance(comment, dict) else comment for comment in comments]
+        comments = [text.strip() if isinstance(text, str) else text for text in comments]
+        if not all(isinstance(text, str) and text for text in comments):
+            errors['comments'] = ['Each comment must be a non-empty string or an object with text.']
+
+    if errors:
+        return errors
+    return _Goal(
+        title=title, description=description, category_id=category, due_date=due_date,
+        status=choices['status'], priority=choices['priority'], comments=comments,
+    )
+
+
+def _integer(value) -> Union[int, str, None]:
+    """ Приводит значение CSV/JSON к целому числу; не число возвращается как есть (для сообщения об ошибке) """
+
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.strip().lstrip('-').isdigit():
+        return int(value)
+    return value
+
+
+def _load(batch: list[_Goal], board_id: int, user_id: int) -> None:
+    now = timezone.now()
+    if connection.vendor != 'postgresql':
+        goals = Goal.objects.bulk_create([
+            Goal(
+                title=goal.title, description=goal.description, category_id=goal.category_id, board_id=board_id,
+                due_date=goal.due_date, status=goal.status, priority=goal.priority, user_id=user_id,
+                comments_count=len(goal.comments),
+            )
+            for goal in batch
+        ])
+        GoalComment.objects.bulk_create([
+            GoalComment(goal_id=created.id, board_id=board_id, user_id=user_id, text=text)
+            for created, goal in zip(goals, batch) for text in goal.comments
+        ])
+        return
+
+    # дата записи форматируется один раз на часть, а не в каждой строке COPY
+    now = now.isoformat()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT nextval(pg_get_serial_sequence(%s, %s)) FROM generate_series(1, %s)',
+            [Goal._meta.db_table, 'id', len(batch)],
+        )
+        ids = [goal_id for goal_id, in cursor.fetchall()]
+
+        _copy(cursor, Goal, [
+            'id', 'created', 'updated', 'user_id', 'category_id', 'board_id', 'title', 'description', 'due_date',
+            'status', 'priority', 'comments_count',
+        ], (
+            (goal_id, now, now, user_id, goal.category_id, board_id, goal.title, goal.description, goal.due_date,
+             goal.status, goal.priority, len(goal.comments))
+            for goal_id, goal in zip(ids, batch)
+        ), not_null=['title', 'description'])
+        _copy(cursor, GoalComment, ['created', 'updated', 'user_id', 'goal_id', 'board_id', 'text'], (
+            (now, now, user_id, goal_id, board_id, text)
+            for goal_id, goal in zip(ids, batch) for text in goal.comments
+        ), not_null=['text'])
+
+
+def _copy(cursor, model, columns: list[str], rows: Iterable[tuple], not_null: list[str]) -> None:
+    """ Записывает строки в таблицу модели командой COPY в формате CSV (None - NULL, пустая строка - '') """
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(['' if value is None else value for value in row])
+    if not buffer.tell():
+        return
+    buffer.seek(0)
+    cursor.copy_expert(
+        f'COPY {model._meta.db_table} ({", ".join(columns)}) FROM STDIN '
+        f'WITH (FORMAT csv, FORCE_NOT_NULL ({", ".join(not_null)}))',
+        buffer,
+    )
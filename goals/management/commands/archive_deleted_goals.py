@@ -0,0 +1,28 @@
+import time
+
+from django.core.management import BaseCommand
+
+from goals.cascade import DEFAULT_CHUNK_SIZE, archive_pending_goals
+
+
+class Command(BaseCommand):
+    help = 'Архивирует цели удаленных досок и категорий частями (goals/cascade.py)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='целей в одной транзакции')
+        parser.add_argument(
+            '--interval', type=float, default=0,
+            help='секунд между проверками очереди; 0 - архивировать ожидающие цели и завершиться',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            archived = archive_pending_goals(options['chunk_size'], progress=self.progress)
+            if archived:
+                self.stdout.write(self.style.SUCCESS(f'Archived {archived} goals'))
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
+
+    def progress(self, done: int, total: int) -> None:
+        self.stdout.write(f'Archived {done}/{total} goals')
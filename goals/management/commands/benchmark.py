@@ -0,0 +1,24 @@
+from django.core.management import BaseCommand, CommandError
+
+from core.models import User
+from goals.benchmarks import SCENARIOS, Benchmark, busiest_user
+
+
+class Command(BaseCommand):
+    help = 'Запускает сценарий нагрузочного тестирования на данных seed_benchmark_data'
+
+    def add_arguments(self, parser):
+        parser.add_argument('scenario', choices=sorted(SCENARIOS))
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--username', help='пользователь, от имени которого выполняются запросы')
+
+    def handle(self, *args, **options):
+        if options['username']:
+            user = User.objects.filter(username=options['username']).first()
+        else:
+            user = busiest_user()
+        if user is None:
+            raise CommandError('No users found, run seed_benchmark_data first')
+
+        self.stdout.write(self.style.SUCCESS(f'Scenario {options["scenario"]} as {user.username}'))
+        SCENARIOS[options['scenario']](Benchmark(user=user, repeat=options['repeat'], write=self.stdout.write))
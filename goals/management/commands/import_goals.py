@@ -0,0 +1,47 @@
+import time
+
+from django.core.exceptions import PermissionDenied
+from django.core.management import BaseCommand, CommandError
+
+from core.models import User
+from goals.importing import IMPORT_BATCH_SIZE, IMPORT_FORMATS, import_goals, read_rows
+
+
+class Command(BaseCommand):
+    help = 'Загружает цели с комментариями на доску из файла NDJSON / CSV (goals/importing.py)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='файл NDJSON / CSV (формат по расширению, если не задан --input)')
+        parser.add_argument('--board', type=int, required=True)
+        parser.add_argument('--username', required=True, help='автор целей - владелец или редактор доски')
+        parser.add_argument('--input', choices=IMPORT_FORMATS)
+        parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE, help='целей в одном COPY')
+        parser.add_argument('--dry-run', action='store_true', help='только проверить строки')
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(username=options['username']).first()
+        if user is None:
+            raise CommandError(f'User {options["username"]} not found')
+        import_format = options['input'] or ('csv' if options['path'].lower().endswith('.csv') else 'ndjson')
+
+        start = time.perf_counter()
+        with open(options['path'], 'rb') as file:
+            try:
+                result = import_goals(
+                    read_rows(file, import_format), options['board'], user,
+                    dry_run=options['dry_run'], batch_size=options['batch_size'],
+                )
+            except PermissionDenied as error:
+                raise CommandError(str(error))
+        seconds = time.perf_counter() - start
+
+        for error in result.errors:
+            self.stderr.write(f'Row {error["row"]}: {error["errors"]}')
+        if result.errors:
+            raise CommandError(f'{len(result.errors)} invalid rows, nothing imported')
+
+        verb = 'Checked' if options['dry_run'] else 'Imported'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {result.goals} goals and {result.comments} comments in {seconds:.2f} s '
+            f'({result.goals / max(seconds, 1e-9):.0f} goals/s)'
+        ))
@@ -0,0 +1,17 @@
+from django.core.management import BaseCommand
+
+from goals.counters import DEFAULT_CHUNK_SIZE, repair_counters
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счетчики участников досок, целей категорий и комментариев целей (goals/counters.py)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='записей в одной транзакции')
+
+    def handle(self, *args, **options):
+        repair_counters(options['chunk_size'], progress=self.progress)
+        self.stdout.write(self.style.SUCCESS('Counters repaired'))
+
+    def progress(self, model, done: int, total: int) -> None:
+        self.stdout.write(f'{model._meta.verbose_name_plural}: {done}/{total}')
@@ -0,0 +1,140 @@
+import random
+from typing import Iterator
+
+from django.core.management import BaseCommand
+from django.db import transaction
+
+from core.models import User
+from goals.access import invalidate_board_roles
+from goals.counters import repair_counters
+from goals.models import Board, BoardParticipant, GoalCategory, Goal, GoalComment
+
+WORDS = [
+    'отчет', 'бюджет', 'релиз', 'встреча', 'ревью', 'миграция', 'сервер', 'клиент', 'дизайн', 'тест',
+    'report', 'budget', 'release', 'meeting', 'review', 'migration', 'server', 'client', 'design', 'backlog',
+]
+SYLLABLES = ['ка', 'ро', 'ми', 'ла', 'то', 'не', 'зу', 'пи', 'ba', 'ko', 'ri', 'mu', 'se', 'da', 'lo', 've']
+
+
+class Command(BaseCommand):
+    help = 'Наполняет базу синтетическими данными для нагрузочного тестирования (python manage.py benchmark)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--boards', type=int, default=10_000)
+        parser.add_argument('--participants', type=int, default=3, help='участников на доску (включая владельца)')
+        parser.add_argument('--categories', type=int, default=5, help='категорий на доску')
+        parser.add_argument('--goals', type=int, default=1_000_000)
+        parser.add_argument('--comments', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=10_000)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        self.rnd = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+
+        users = self._create_users(options['users'])
+        boards = self._create_boards(options['boards'], users, options['participants'])
+        categories = self._create_categories(boards, users, options['categories'])
+        goals = self._create_goals(categories, users, options['goals'])
+        self._create_comments(goals, users, options['comments'])
+        # bulk_create не меняет счетчики, они пересчитываются после загрузки
+        repair_counters()
+
+        self.stdout.write(self.style.SUCCESS('Data seeded'))
+
+    def _create_users(self, count: int) -> list[int]:
+        offset = User.objects.count()
+        self._bulk_create(
+            User,
+            (User(username=f'bench_user_{offset + i}', password='!') for i in range(count)),
+            count,
+        )
+        return list(User.objects.filter(username__startswith='bench_user_').values_list('id', flat=True))
+
+    def _create_boards(self, count: int, users: list[int], participants: int) -> list[int]:
+        last_id = Board.objects.order_by('-id').values_list('id', flat=True).first() or 0
+        self._bulk_create(Board, (Board(title=self._name()) for _ in range(count)), count)
+        boards = list(Board.objects.filter(id__gt=last_id).values_list('id', flat=True))
+
+        def _participants() -> Iterator[BoardParticipant]:
+            for board_id in boards:
+                members = self.rnd.sample(users, min(participants, len(users)))
+                for index, user_id in enumerate(members):
+                    role = BoardParticipant.Role.owner if index == 0 else self.rnd.choice(BoardParticipant.Role.values)
+                    yield BoardParticipant(board_id=board_id, user_id=user_id, role=role)
+
+        self._bulk_create(BoardParticipant, _participants(), len(boards) * participants)
+        invalidate_board_roles(*users)
+        return boards
+
+    def _create_categories(self, boards: list[int], users: list[int], per_board: int) -> list[tuple[int, int]]:
+        last_id = GoalCategory.objects.order_by('-id').values_list('id', flat=True).first() or 0
+        self._bulk_create(
+            GoalCategory,
+            (
+                GoalCategory(board_id=board_id, user_id=self.rnd.choice(users), title=self._name())
+                for board_id in boards for _ in range(per_board)
+            ),
+            len(boards) * per_board,
+        )
+        return list(GoalCategory.objects.filter(id__gt=last_id).values_list('id', 'board_id'))
+
+    def _create_goals(self, categories: list[tuple[int, int]], users: list[int], count: int) -> list[tuple[int, int]]:
+        last_id = Goal.objects.order_by('-id').values_list('id', flat=True).first() or 0
+
+        def _goals() -> Iterator[Goal]:
+            for _ in range(count):
+                category_id, board_id = self.rnd.choice(categories)
+                yield Goal(
+                    category_id=category_id,
+                    board_id=board_id,
+                    user_id=self.rnd.choice(users),
+                    title=self._title(),
+                    description=' '.join(self.rnd.choices(WORDS, k=12)),
+                    status=self.rnd.choice(Goal.Status.values),
+                    priority=self.rnd.choice(Goal.Priority.values),
+                )
+
+        self._bulk_create(Goal, _goals(), count)
+        return list(Goal.objects.filter(id__gt=last_id).values_list('id', 'board_id'))
+
+    def _create_comments(self, goals: list[tuple[int, int]], users: list[int], count: int) -> None:
+        if not count:
+            return
+
+        def _comments() -> Iterator[GoalComment]:
+            for _ in range(count):
+                goal_id, board_id = self.rnd.choice(goals)
+                yield GoalComment(goal_id=goal_id, board_id=board_id, user_id=self.rnd.choice(users), text=self._title())
+
+        self._bulk_create(GoalComment, _comments(), count)
+
+    def _bulk_create(self, model, objects: Iterator, total: int) -> None:
+        """ Сохраняет объекты пачками, отображая прогресс """
+
+        created = 0
+        batch = []
+        for obj in objects:
+            batch.append(obj)
+            if len(batch) >= self.batch_size:
+                created += self._save_batch(model, batch)
+                batch = []
+                self.stdout.write(f'{model.__name__}: {created}/{total}', ending='\r')
+        if batch:
+            created += self._save_batch(model, batch)
+        self.stdout.write(f'{model.__name__}: {created}/{total}')
+
+    @staticmethod
+    def _save_batch(model, batch: list) -> int:
+        with transaction.atomic():
+            model.objects.bulk_create(batch)
+        return len(batch)
+
+    def _title(self) -> str:
+        return ' '.join(self.rnd.choices(WORDS, k=3)).capitalize()
+
+    def _name(self) -> str:
+        """ Название доски/категории: слово из словаря и уникальное «имя собственное» из слогов """
+
+        return f'{self.rnd.choice(WORDS).capitalize()} {"".join(self.rnd.choices(SYLLABLES, k=4))}'
@@ -0,0 +1,52 @@
+# Generated by Django 4.2.30 on 2026-10-18 19:30
+
+from django.db import migrations, models, transaction
+from django.db.models import Max, OuterRef, Subquery
+import django.db.models.deletion
+
+CHUNK_SIZE = 10_000
+
+
+def _backfill(model, source_model, source_field: str) -> None:
+    """ Проставляет доску пачками по диапазонам id, чтобы не блокировать всю таблицу одной транзакцией """
+
+    board = Subquery(source_model.objects.filter(id=OuterRef(source_field)).values('board_id')[:1])
+    max_id = model.objects.aggregate(max_id=Max('id'))['max_id'] or 0
+
+    for start in range(0, max_id + 1, CHUNK_SIZE):
+        with transaction.atomic():
+            model.objects.filter(
+                id__gte=start, id__lt=start + CHUNK_SIZE, board__isnull=True,
+            ).update(board_id=board)
+
+
+def fill_board(apps, schema_editor):
+    Goal = apps.get_model('goals', 'Goal')
+    GoalCategory = apps.get_model('goals', 'GoalCategory')
+    GoalComment = apps.get_model('goals', 'GoalComment')
+
+    _backfill(Goal, GoalCategory, 'category_id')
+    _backfill(GoalComment, Goal, 'goal_id')
+
+
+class Migration(migrations.Migration):
+    # каждая пачка заполнения фиксируется отдельной транзакцией
+    atomic = False
+
+    dependencies = [
+        ('goals', '0005_boardparticipant_access_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='goal',
+            name='board',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='goals', to='goals.board', verbose_name='Доска'),
+        ),
+        migrations.AddField(
+            model_name='goalcomment',
+            name='board',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='comments', to='goals.board', verbose_name='Доска'),
+        ),
+        migrations.RunPython(fill_board, migrations.RunPython.noop),
+    ]
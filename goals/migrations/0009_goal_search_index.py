@@ -0,0 +1,30 @@
+# Generated by Django 4.2.30 on 2026-10-18 20:05
+
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+
+SEARCH_INDEX = GinIndex(SearchVector('title', 'description', config='russian'), name='goal_search_idx')
+
+
+def create_search_index(apps, schema_editor):
+    """ Индекс полнотекстового поиска создается только в PostgreSQL (в SQLite поиск идет через ILIKE) """
+
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.add_index(apps.get_model('goals', 'Goal'), SEARCH_INDEX)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.remove_index(apps.get_model('goals', 'Goal'), SEARCH_INDEX)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0008_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.30 on 2026-10-18 20:40
+
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+from django.db.models.functions import Upper
+
+# индексы по UPPER(title): этим выражением Django строит icontains, по нему же ищутся похожие названия
+TRIGRAM_INDEXES = {
+    'Board': GinIndex(OpClass(Upper('title'), name='gin_trgm_ops'), name='board_title_trgm_idx'),
+    'GoalCategory': GinIndex(OpClass(Upper('title'), name='gin_trgm_ops'), name='category_title_trgm_idx'),
+}
+
+
+def create_trigram_indexes(apps, schema_editor):
+    """ Триграммные индексы создаются только в PostgreSQL (в SQLite поиск идет через ILIKE) """
+
+    if schema_editor.connection.vendor == 'postgresql':
+        for model_name, index in TRIGRAM_INDEXES.items():
+            schema_editor.add_index(apps.get_model('goals', model_name), index)
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        for model_name, index in TRIGRAM_INDEXES.items():
+            schema_editor.remove_index(apps.get_model('goals', model_name), index)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0009_goal_search_index'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 4.2.30 on 2026-10-18 19:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0010_trigram_title_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='goal',
+            name='goal_board_title_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='goal',
+            name='goal_board_created_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='goal',
+            name='goal_title_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='goal',
+            name='goal_created_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='goalcategory',
+            name='category_board_title_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='goalcategory',
+            name='category_board_created_idx',
+        ),
+        migrations.AddIndex(
+            model_name='goal',
+            index=models.Index(condition=models.Q(('status', 4), _negated=True), fields=['board', 'title', 'id'], name='goal_live_board_title_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='goal',
+            index=models.Index(condition=models.Q(('status', 4), _negated=True), fields=['board', 'created', 'id'], name='goal_live_board_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='goal',
+            index=models.Index(condition=models.Q(('status', 4), _negated=True), fields=['title', 'id'], name='goal_live_title_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='goal',
+            index=models.Index(condition=models.Q(('status', 4), _negated=True), fields=['created', 'id'], name='goal_live_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='goal',
+            index=models.Index(condition=models.Q(('status', 4), _negated=True), fields=['board', 'due_date'], name='goal_live_board_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='goal',
+            index=models.Index(condition=models.Q(('status', 4), _negated=True), fields=['board', 'status', 'priority'], name='goal_live_board_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='goalcategory',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['board', 'title', 'id'], name='category_live_title_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='goalcategory',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['board', 'created', 'id'], name='category_live_created_idx'),
+        ),
+    ]
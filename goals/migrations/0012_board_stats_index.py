@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-18 20:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0011_live_row_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='goal',
+            name='goal_live_board_status_idx',
+        ),
+        migrations.AddIndex(
+            model_name='goal',
+            index=models.Index(condition=models.Q(('status', 4), _negated=True), fields=['board', 'status', 'priority', 'category', 'due_date'], include=('id',), name='goal_live_board_stats_idx'),
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 4.2.30 on 2026-10-18 20:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0012_board_stats_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='board',
+            name='participants_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Участников'),
+        ),
+        migrations.AddField(
+            model_name='goal',
+            name='comments_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Комментариев'),
+        ),
+        migrations.AddField(
+            model_name='goalcategory',
+            name='goals_done',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Выполненных целей'),
+        ),
+        migrations.AddField(
+            model_name='goalcategory',
+            name='goals_in_progress',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Целей в процессе'),
+        ),
+        migrations.AddField(
+            model_name='goalcategory',
+            name='goals_to_do',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Целей к выполнению'),
+        ),
+        # начальные значения счетчиков (далее их поддерживает приложение, исправляет команда repair_counters)
+        migrations.RunSQL(
+            sql=[
+                """
+                UPDATE goals_board SET participants_count = p.count
+                FROM (SELECT board_id, COUNT(*) AS count FROM goals_boardparticipant WHERE role <> 1 GROUP BY board_id) p
+                WHERE p.board_id = goals_board.id
+                """,
+                """
+                UPDATE goals_goalcategory
+                SET goals_to_do = g.to_do, goals_in_progress = g.in_progress, goals_done = g.done
+                FROM (
+                    SELECT category_id,
+                           COUNT(*) FILTER (WHERE status = 1) AS to_do,
+                           COUNT(*) FILTER (WHERE status = 2) AS in_progress,
+                           COUNT(*) FILTER (WHERE status = 3) AS done
+                    FROM goals_goal GROUP BY category_id
+                ) g
+                WHERE g.category_id = goals_goalcategory.id
+                """,
+                """
+                UPDATE goals_goal SET comments_count = c.count
+                FROM (SELECT goal_id, COUNT(*) AS count FROM goals_goalcomment GROUP BY goal_id) c
+                WHERE c.goal_id = goals_goal.id
+                """,
+            ],
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
@@ -1,4 +1,10 @@
-from django.db import models
+from collections import Counter, defaultdict
+from typing import Iterable, Optional
+
+from django.db import models, transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 
 from core.models import User
 from todolist.models import BaseModel
@@ -11,14 +17,28 @@ class Board(BaseModel):
 
     title = models.CharField(verbose_name="Название", max_length=255)
     is_deleted = models.BooleanField(verbose_name="Удалена", default=False)
+    # счетчик участников без владельцев, пересчитывается при изменении участников (recount_participants)
+    participants_count = models.PositiveIntegerField(verbose_name="Участников", default=0, editable=False)
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **_exclude_counters(self, kwargs, 'participants_count'))
+
+    @classmethod
+    def recount_participants(cls, board_ids: Iterable[int]) -> None:
+        """ Пересчитывает участников (без владельцев) досок одним запросом UPDATE """
+
+        participants = BoardParticipant.objects.filter(board=OuterRef('pk')).exclude(role=BoardParticipant.Role.owner)
+        cls.objects.filter(id__in=board_ids).update(participants_count=_count(participants, 'board'))
+
 
 class BoardParticipant(BaseModel):
     class Meta:
         unique_together = ("board", "user")
+        # индекс доступа: доски пользователя выбираются сканированием только индекса
+        indexes = [models.Index(fields=["user", "board", "role"], name="participant_access_idx")]
         verbose_name = "Участник"
         verbose_name_plural = "Участники"
 
@@ -33,25 +53,149 @@ class BoardParticipant(BaseModel):
 
     editable_roles: list[tuple[int, str]] = Role.choices[1:]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        # при смене пользователя участника кэш ролей сбрасывается и у прежнего пользователя (goals/signals.py)
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_user_id = instance.__dict__.get('user_id')
+        instance._loaded_counted = instance._counted()
+        return instance
+
+    def save(self, *args, **kwargs):
+        """ Пересчитывает участников доски, если участник добавлен в ее счетчик или исключен из него """
+
+        loaded = getattr(self, '_loaded_counted', None)
+        if self._counted() == (loaded or (self.board_id, False)):
+            return super().save(*args, **kwargs)
+
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            Board.recount_participants({self.board_id, *(loaded or ())[:1]})
+        self._loaded_counted = self._counted()
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            if self.role != self.Role.owner:
+                Board.recount_participants([self.board_id])
+        return result
+
+    def _counted(self) -> tuple[int, bool]:
+        """ Доска участника и учитывается ли он в счетчике участников (владельцы не учитываются) """
+
+        return self.__dict__.get('board_id'), self.__dict__.get('role') != self.Role.owner
+
 
 class GoalCategory(BaseModel):
     class Meta:
         verbose_name = "Категория"
         verbose_name_plural = "Категории"
+        # частичные индексы по неудаленным категориям: выдача по ключу (сортировка + id) в пределах досок
+        indexes = [
+            models.Index(
+                fields=["board", "title", "id"], name="category_live_title_idx", condition=models.Q(is_deleted=False)
+            ),
+            models.Index(
+                fields=["board", "created", "id"], name="category_live_created_idx", condition=models.Q(is_deleted=False)
+            ),
+        ]
 
     title = models.CharField(verbose_name="Название", max_length=255)
     user = models.ForeignKey(User, verbose_name="Автор", on_delete=models.PROTECT)
     is_deleted = models.BooleanField(verbose_name="Удалена", default=False)
     board = models.ForeignKey(Board, verbose_name="Доска", on_delete=models.PROTECT, related_name="categories")
+    # счетчики неархивных целей категории по статусам (count_goals / recount_goals)
+    goals_to_do = models.PositiveIntegerField(verbose_name="Целей к выполнению", default=0, editable=False)
+    goals_in_progress = models.PositiveIntegerField(verbose_name="Целей в процессе", default=0, editable=False)
+    goals_done = models.PositiveIntegerField(verbose_name="Выполненных целей", default=0, editable=False)
 
     def __str__(self):
         return self.title
 
+    @staticmethod
+    def goals_counter(status: int) -> Optional[str]:
+        """ Возвращает поле счетчика целей со статусом (архивные цели не считаются) """
+
+        return {
+            Goal.Status.to_do: 'goals_to_do',
+            Goal.Status.in_progress: 'goals_in_progress',
+            Goal.Status.done: 'goals_done',
+        }.get(status)
+
+    @classmethod
+    def count_goals(cls, changes: Counter, board_ids: Iterable[int]) -> None:
+        """ Изменяет счетчики целей: changes - {(категория, статус): изменение числа целей}, один UPDATE на категорию
+
+        Счетчики выдаются в списках категорий, поэтому меняются и дата изменения категорий,
+        и версии их досок для кэша ответов (goals.caching).
+        """
+
+        from goals.caching import bump_board_versions
+
+        fields = defaultdict(dict)
+        for (category_id, status), delta in changes.items():
+            if delta and (field := cls.goals_counter(status)):
+                fields[category_id][field] = fields[category_id].get(field, 0) + delta
+        now = timezone.now()
+        for category_id, deltas in fields.items():
+            cls.objects.filter(id=category_id).update(
+                updated=now, **{field: F(field) + delta for field, delta in deltas.items()},
+            )
+        if fields:
+            bump_board_versions(*board_ids)
+
+    @classmethod
+    def recount_goals(cls, category_ids: Iterable[int]) -> None:
+        """ Пересчитывает счетчики целей категорий одним запросом UPDATE (с датой изменения и версиями досок) """
+
+        from goals.caching import bump_board_versions
+
+        categories = cls.objects.filter(id__in=category_ids)
+        categories.update(updated=timezone.now(), **{
+            cls.goals_counter(status): _count(Goal.objects.filter(category=OuterRef('pk'), status=status), 'category')
+            for status in Goal.Status if cls.goals_counter(status)
+        })
+        bump_board_versions(*categories.values_list('board_id', flat=True).distinct())
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_board_id = instance.__dict__.get('board_id')
+        return instance
+
+    def save(self, *args, **kwargs):
+        """ При переносе категории на другую доску переносит на нее и цели с комментариями """
+
+        loaded_board_id = getattr(self, '_loaded_board_id', None)
+        _exclude_counters(self, kwargs, 'goals_to_do', 'goals_in_progress', 'goals_done')
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if loaded_board_id is not None and loaded_board_id != self.board_id:
+                now = timezone.now()
+                Goal.objects.filter(category=self).update(board_id=self.board_id, updated=now)
+                GoalComment.objects.filter(goal__category=self).update(board_id=self.board_id, updated=now)
+        self._loaded_board_id = self.board_id
+
 
 class Goal(BaseModel):
     class Meta:
         verbose_name = "Цель"
         verbose_name_plural = "Цели"
+        # частичные индексы по неархивным целям (status=4 - Status.archived), которые видны в списках:
+        # выдача по ключу (сортировка + id) в пределах досок пользователя и по всей таблице для больших досок,
+        # фильтры GoalFilter по сроку, статусу и приоритету в пределах досок;
+        # goal_live_board_stats_idx покрывает и статистику доски (goals.stats) - цели доски читаются только из индекса
+        indexes = [
+            models.Index(fields=["board", "title", "id"], name="goal_live_board_title_idx", condition=~models.Q(status=4)),
+            models.Index(fields=["board", "created", "id"], name="goal_live_board_created_idx", condition=~models.Q(status=4)),
+            models.Index(fields=["title", "id"], name="goal_live_title_idx", condition=~models.Q(status=4)),
+            models.Index(fields=["created", "id"], name="goal_live_created_idx", condition=~models.Q(status=4)),
+            models.Index(fields=["board", "due_date"], name="goal_live_board_due_idx", condition=~models.Q(status=4)),
+            models.Index(
+                fields=["board", "status", "priority", "category", "due_date"], name="goal_live_board_stats_idx",
+                include=["id"], condition=~models.Q(status=4),
+            ),
+        ]
 
     class Status(models.IntegerChoices):
         to_do = 1, "К выполнению"
@@ -68,23 +212,170 @@ class Goal(BaseModel):
     title = models.CharField(verbose_name="Название", max_length=255)
     description = models.TextField(blank=True)
     category = models.ForeignKey(to=GoalCategory, on_delete=models.PROTECT)
+    # дублирует category.board, чтобы проверки доступа не проходили через категорию
+    board = models.ForeignKey(Board, verbose_name="Доска", on_delete=models.PROTECT, related_name="goals", editable=False)
     due_date = models.DateField(null=True, blank=True)
     user = models.ForeignKey(to=User, verbose_name="Автор", on_delete=models.PROTECT)
     status = models.PositiveSmallIntegerField(verbose_name="Статус", choices=Status.choices, default=Status.to_do)
     priority = models.PositiveSmallIntegerField(verbose_name="Приоритет", choices=Priority.choices, default=Priority.medium)
+    # счетчик комментариев цели (count_comments / recount_comments)
+    comments_count = models.PositiveIntegerField(verbose_name="Комментариев", default=0, editable=False)
 
     def __str__(self):
         return self.title
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_counted = instance._counted()
+        return instance
+
+    def save(self, *args, **kwargs):
+        """ Синхронизирует доску цели с доской категории (и комментариев при переносе цели), счетчики целей категорий """
+
+        update_fields = _exclude_counters(self, kwargs, 'comments_count').get('update_fields')
+        sync_board = update_fields is None or 'category' in update_fields
+        moved = sync_board and self.pk is not None and self.board_id != self.category.board_id
+        if sync_board:
+            self.board_id = self.category.board_id
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'board'}
+
+        loaded = getattr(self, '_loaded_counted', None)
+        counted = self._counted()
+        if not moved and counted == loaded:
+            return super().save(*args, **kwargs)
+
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if moved:
+                self.goalcomment_set.update(board_id=self.board_id, updated=timezone.now())
+            Goal.count_saved([self])
+
+    @classmethod
+    def count_saved(cls, goals: Iterable['Goal']) -> None:
+        """ Изменяет счетчики категорий для сохраненных целей (в том числе через bulk_create / bulk_update) """
+
+        changes = Counter()
+        board_ids = set()
+        for goal in goals:
+            loaded = getattr(goal, '_loaded_counted', None)
+            counted = goal._counted()
+            if counted == loaded:
+                continue
+            changes[counted[1:]] += 1
+            board_ids.add(counted[0])
+            if loaded is not None:
+                changes[loaded[1:]] -= 1
+                board_ids.add(loaded[0])
+            goal._loaded_counted = counted
+        GoalCategory.count_goals(changes, board_ids)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            GoalCategory.count_goals(Counter({self._counted()[1:]: -1}), [self.board_id])
+        return result
+
+    def _counted(self) -> tuple[int, int, int]:
+        """ Доска, категория и статус цели - по ним цель учитывается в счетчиках категорий """
+
+        return self.__dict__.get('board_id'), self.__dict__.get('category_id'), self.__dict__.get('status')
+
+    @classmethod
+    def count_comments(cls, changes: Counter) -> None:
+        """ Изменяет счетчики комментариев: changes - {цель: изменение числа комментариев}
+
+        Счетчик выдается вместе с целью, поэтому меняется и дата изменения цели (версия для условных запросов).
+        """
+
+        goals = defaultdict(list)
+        for goal_id, delta in changes.items():
+            if delta:
+                goals[delta].append(goal_id)
+        now = timezone.now()
+        for delta, goal_ids in goals.items():
+            cls.objects.filter(id__in=goal_ids).update(comments_count=F('comments_count') + delta, updated=now)
+
+    @classmethod
+    def recount_comments(cls, goal_ids: Iterable[int]) -> None:
+        """ Пересчитывает счетчики комментариев целей одним запросом UPDATE """
+
+        cls.objects.filter(id__in=goal_ids).update(
+            comments_count=_count(GoalComment.objects.filter(goal=OuterRef('pk')), 'goal'),
+        )
+
 
 class GoalComment(BaseModel):
     class Meta:
         verbose_name = "Комментарий"
         verbose_name_plural = "Комментарии"
+        # выдача по ключу (сортировка + id) для комментариев цели и комментариев досок пользователя
+        indexes = [
+            models.Index(fields=["goal", "created", "id"], name="comment_goal_created_idx"),
+            models.Index(fields=["board", "created", "id"], name="comment_board_created_idx"),
+        ]
 
     user = models.ForeignKey(User, on_delete=models.PROTECT)
     goal = models.ForeignKey(Goal, on_delete=models.CASCADE)
+    # дублирует goal.board, чтобы списки комментариев фильтровались без соединения с целями
+    board = models.ForeignKey(Board, verbose_name="Доска", on_delete=models.PROTECT, related_name="comments", editable=False)
     text = models.TextField()
 
     def __str__(self):
         return self.text
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_goal_id = instance.__dict__.get('goal_id')
+        return instance
+
+    def save(self, *args, **kwargs):
+        """ Проставляет комментарию доску его цели, изменяет счетчики комментариев целей """
+
+        update_fields = kwargs.get('update_fields')
+        if self.board_id is None or GoalComment.goal.field.is_cached(self):
+            self.board_id = self.goal.board_id
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'board'}
+
+        loaded_goal_id = getattr(self, '_loaded_goal_id', None)
+        if self.goal_id == loaded_goal_id:
+            return super().save(*args, **kwargs)
+
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            changes = Counter({self.goal_id: 1})
+            if loaded_goal_id is not None:
+                changes[loaded_goal_id] -= 1
+            Goal.count_comments(changes)
+        self._loaded_goal_id = self.goal_id
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            Goal.count_comments(Counter({self.goal_id: -1}))
+        return result
+
+
+def _count(queryset: models.QuerySet, field: str) -> Coalesce:
+    """ Подзапрос числа записей queryset (связанных через field с OuterRef) для UPDATE счетчиков """
+
+    return Coalesce(Subquery(queryset.order_by().values(field).annotate(count=Count('id')).values('count')), 0)
+
+
+def _exclude_counters(instance: models.Model, kwargs: dict, *counters: str) -> dict:
+    """ Исключает счетчики из полей сохранения существующей записи
+
+    Счетчики меняются только запросами UPDATE с F(), поэтому save() не записывает их значения,
+    загруженные вместе с записью (они могли устареть). Возвращает kwargs для save().
+    """
+
+    if not instance._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+        deferred = instance.get_deferred_fields()
+        kwargs['update_fields'] = [
+            field.name for field in instance._meta.concrete_fields
+            if not field.primary_key and field.name not in counters and field.attname not in deferred
+        ]
+    return kwargs
@@ -0,0 +1,155 @@
+""" Постраничная выдача списков приложения
+
+KeysetLimitOffsetPagination - по умолчанию работает как LimitOffsetPagination (limit/offset с подсчетом count).
+Если в запросе передан параметр cursor (для первой страницы - пустой: ?cursor=&limit=50), включается выдача
+по ключу: следующая страница выбирается условием (поле сортировки, id) > (значения последней записи),
+без COUNT(*) и OFFSET, поэтому глубокие страницы выдаются так же быстро, как первая.
+Поддерживается сортировка по полям title и created (в т.ч. по убыванию), id используется для однозначности порядка.
+apaginate_queryset - то же для асинхронных представлений (goals/asynchronous.py).
+
+"""
+
+import base64
+import json
+from functools import partial
+from typing import Any, Optional
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import QuerySet
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+KEYSET_FIELDS: tuple[str, ...] = ('title', 'created')
+
+
+def keyset_queryset(queryset: QuerySet, ordering: str, after: Optional[tuple[Any, int]]) -> QuerySet:
+    """ Возвращает записи, следующие за ключом after (значение поля сортировки, id), в порядке выдачи """
+
+    field = ordering.lstrip('-')
+    descending = ordering.startswith('-')
+
+    if after is not None:
+        value, pk = after
+        # условие по полю сортировки использует индекс, равные значения отсекаются по id
+        queryset = queryset.filter(**{f'{field}__{"lte" if descending else "gte"}': value}).exclude(
+            **{field: value, f'id__{"gte" if descending else "lte"}': pk}
+        )
+
+    return queryset.order_by(ordering, '-id' if descending else 'id')
+
+
+class KeysetLimitOffsetPagination(LimitOffsetPagination):
+    cursor_query_param = 'cursor'
+    keyset_default_limit = 100
+    invalid_cursor_message = 'Invalid cursor'
+
+    keyset = False
+    next_cursor: Optional[str] = None
+
+    def paginate_queryset(self, queryset: QuerySet, request: Request, view=None) -> Optional[list]:
+        if self.cursor_query_param not in request.query_params:
+            return super().paginate_queryset(queryset, request, view)
+
+        page_queryset, ordering = self._keyset_page_queryset(queryset, request)
+        return self._keyset_page(list(page_queryset), ordering)
+
+    async def apaginate_queryset(self, queryset: QuerySet, request: Request, view=None) -> Optional[list]:
+        """ Асинхронная версия paginate_queryset: count и страница - через асинхронный интерфейс ORM """
+
+        if self.cursor_query_param in request.query_params:
+            page_queryset, ordering = self._keyset_page_queryset(queryset, request)
+            return self._keyset_page([item async for item in page_queryset], ordering)
+
+        # повторяет LimitOffsetPagination.paginate_queryset
+        self.request = request
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+
+        self.count = await queryset.acount()
+        self.offset = self.get_offset(request)
+        if self.count > self.limit and self.template is not None:
+            self.display_page_controls = True
+        if self.count == 0 or self.offset > self.count:
+            return []
+        return [item async for item in queryset[self.offset:self.offset + self.limit]]
+
+    def _keyset_page_queryset(self, queryset: QuerySet, request: Request) -> tuple[QuerySet, str]:
+        """ Возвращает запрос страницы по ключу (на одну запись больше limit) и поле сортировки """
+
+        self.keyset = True
+        self.request = request
+        self.limit = self.get_limit(request) or self.keyset_default_limit
+
+        ordering = self._get_ordering(queryset)
+        after = self._decode_cursor(request.query_params[self.cursor_query_param], queryset, ordering)
+        return keyset_queryset(queryset, ordering, after)[:self.limit + 1], ordering
+
+    def _keyset_page(self, page: list, ordering: str) -> list:
+        """ Отрезает лишнюю запись страницы, по последней записи формирует ключ следующей страницы """
+
+        self.next_cursor = None
+        if len(page) > self.limit:
+            page = page[:self.limit]
+            last = page[-1]
+            # записи страницы - экземпляры моделей или строки values() (goals/projections.py)
+            value = last.get if isinstance(last, dict) else partial(getattr, last)
+            self.next_cursor = self._encode_cursor(value(ordering.lstrip('-')), value('id'))
+        return page
+
+    def get_paginated_response(self, data: list) -> Response:
+        if not self.keyset:
+            return super().get_paginated_response(data)
+
+        return Response({'next': self.get_next_link(), 'results': data})
+
+    def get_next_link(self) -> Optional[str]:
+        if not self.keyset:
+            return super().get_next_link()
+
+        if self.next_cursor is None:
+            return None
+        url = replace_query_param(self.request.build_absolute_uri(), self.limit_query_param, self.limit)
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_html_context(self) -> dict:
+        if not self.keyset:
+            return super().get_html_context()
+
+        return {'previous_url': None, 'next_url': self.get_next_link(), 'page_links': []}
+
+    @staticmethod
+    def _get_ordering(queryset: QuerySet) -> str:
+        """ Определяет поле сортировки, заданное фильтром сортировки представления """
+
+        order_by = queryset.query.order_by or ('id',)
+        ordering = order_by[0]
+        if not isinstance(ordering, str) or ordering.lstrip('-') not in (*KEYSET_FIELDS, 'id'):
+            raise ValidationError({'ordering': f'cursor pagination supports ordering by {", ".join(KEYSET_FIELDS)}'})
+        return ordering
+
+    @staticmethod
+    def _encode_cursor(value: Any, pk: int) -> str:
+        if hasattr(value, 'isoformat'):
+            value = value.isoformat()
+        return base64.urlsafe_b64encode(json.dumps([value, pk]).encode()).decode()
+
+    def _decode_cursor(self, cursor: str, queryset: QuerySet, ordering: str) -> Optional[tuple[Any, int]]:
+        """ Возвращает ключ (значение поля сортировки, id), приведенный к типам полей модели """
+
+        if not cursor:
+            return None
+
+        meta = queryset.model._meta
+        try:
+            value, pk = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            value = meta.get_field(ordering.lstrip('-')).to_python(value)
+            pk = meta.pk.to_python(pk)
+        except (TypeError, ValueError, DjangoValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        if value is None or pk is None:
+            raise NotFound(self.invalid_cursor_message)
+        return value, pk
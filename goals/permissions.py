@@ -6,49 +6,49 @@
 - категорий (GoalCategoryPermission): создание/изменение категории доступно только владельцу и редактору
 - целей (GoalPermission): создание/изменение цели доступно только владельцу и редактору
 - комментариев (GoalCommentPermission): создание/изменение цели доступно только владельцу и редактору
+Роль пользователя в доске берется из board_role (загружается один раз за запрос).
 
 """
 
-from typing import Any
-
 from rest_framework.generics import GenericAPIView
 from rest_framework.permissions import IsAuthenticated, SAFE_METHODS
 from rest_framework.request import Request
 
+from goals.access import EDITOR_ROLES, board_role
 from goals.models import GoalCategory, Goal, GoalComment, Board, BoardParticipant
 
 
 class BoardPermission(IsAuthenticated):
 
     def has_object_permission(self, request: Request, view: GenericAPIView, obj: Board) -> bool:
-        _filters: dict[str, Any] = {'user': request.user, 'board': obj}
+        role = board_role(request, obj.id)
 
         if request.method not in SAFE_METHODS:
-            _filters['role'] = BoardParticipant.Role.owner
+            return role == BoardParticipant.Role.owner
 
-        return BoardParticipant.objects.filter(**_filters).exists()
+        return role is not None
 
 
 class GoalCategoryPermission(IsAuthenticated):
 
     def has_object_permission(self, request: Request, view: GenericAPIView, obj: GoalCategory) -> bool:
-        _filters: dict[str, Any] = {'user': request.user, 'board': obj.board}
+        role = board_role(request, obj.board_id)
 
         if request.method not in SAFE_METHODS:
-            _filters['role__in'] = [BoardParticipant.Role.owner, BoardParticipant.Role.writer]
+            return role in EDITOR_ROLES
 
-        return BoardParticipant.objects.filter(**_filters).exists()
+        return role is not None
 
 
 class GoalPermission(IsAuthenticated):
 
     def has_object_permission(self, request: Request, view: GenericAPIView, obj: Goal) -> bool:
-        _filters: dict[str, Any] = {'user': request.user, 'board': obj.category.board}
+        role = board_role(request, obj.board_id)
 
         if request.method not in SAFE_METHODS:
-            _filters['role__in'] = [BoardParticipant.Role.owner, BoardParticipant.Role.writer]
+            return role in EDITOR_ROLES
 
-        return BoardParticipant.objects.filter(**_filters).exists()
+        return role is not None
 
 
 class GoalCommentPermission(IsAuthenticated):
@@ -58,4 +58,4 @@ class GoalCommentPermission(IsAuthenticated):
         if request.method in SAFE_METHODS:
             return True
 
-        return obj.user == request.user
+        return obj.user_id == request.user.id
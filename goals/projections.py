@@ -0,0 +1,155 @@
+""" Выдача списков из строк values() без создания экземпляров моделей
+
+Сериализаторы списков (GoalWithUserSerializer и др.) на каждую запись создают экземпляр модели и экземпляр
+пользователя, а затем для каждого поля вызывают to_representation полей DRF - на больших страницах это
+основная часть времени ответа. Projection строится один раз по классу сериализатора: поля сериализатора
+превращаются в колонки запроса values() (поля вложенного сериализатора пользователя - в колонки
+user__<поле>, то есть соединение с пользователями выполняется тем же запросом), а строки values()
+превращаются в словари той же структуры, что и у сериализатора, - ответ совпадает побайтово.
+
+Преобразуются только даты (представление как у DRF, часовой пояс определяется один раз на страницу),
+остальные поддерживаемые поля отдаются как есть: их представление в DRF совпадает со значением из БД.
+Для сериализатора с другими полями (вычисляемые, вложенные списки) Projection не строится (TypeError).
+
+ProjectionListMixin - список представления из Projection его сериализатора (с выборочными полями
+?fields= / ?exclude=, goals/fieldsets.py); изменение и детальная информация используют сериализатор.
+
+"""
+
+import datetime
+from functools import lru_cache
+from typing import Any, Callable, Iterable, Optional
+
+from django.db.models import QuerySet
+from django.http.response import HttpResponseBase
+from rest_framework import ISO_8601, relations, serializers
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from goals.asynchronous import afiltered_queryset
+from goals.fieldsets import SparseFieldsMixin
+
+# поля, представление которых в DRF совпадает со значением из БД
+PLAIN_FIELDS = (
+    serializers.IntegerField, serializers.CharField, serializers.BooleanField, serializers.ChoiceField,
+    relations.PrimaryKeyRelatedField,
+)
+
+
+def datetime_representation() -> Callable[[datetime.datetime], str]:
+    """ Представление даты и времени как у DateTimeField DRF, часовой пояс определяется один раз
+
+    DateTimeField.to_representation запрашивает текущий часовой пояс при каждом вызове - на выгрузке
+    миллиона целей это большая часть времени.
+    """
+
+    field = serializers.DateTimeField()
+    timezone = field.default_timezone()
+    if api_settings.DATETIME_FORMAT != ISO_8601 or timezone is None:
+        return field.to_representation
+
+    def _represent(value: datetime.datetime) -> str:
+        value = value.astimezone(timezone).isoformat()
+        return value[:-6] + 'Z' if value.endswith('+00:00') else value
+    return _represent
+
+
+class Projection:
+    """ Колонки values() и их представление для полей сериализатора """
+
+    def __init__(self, serializer_class: type[serializers.Serializer], names: Optional[tuple[str, ...]] = None):
+        self.columns: list[str] = []
+        # (поле, колонка, представление) или (поле, колонка внешнего ключа, поля вложенного сериализатора)
+        self.fields = self._fields(serializer_class(), '', names)
+
+    def _fields(self, serializer: serializers.Serializer, prefix: str,
+                names: Optional[tuple[str, ...]] = None) -> list[tuple]:
+        fields = []
+        for name, field in serializer.fields.items():
+            if field.write_only or names is not None and name not in names:
+                continue
+            column = prefix + field.source
+            if isinstance(field, serializers.ModelSerializer) and not prefix:
+                # колонка внешнего ключа: без пользователя (NULL) вложенное представление - None
+                self.columns.append(column)
+                fields.append((name, column, self._fields(field, f'{column}__')))
+                continue
+
+            if isinstance(field, serializers.DateTimeField):
+                represent = 'datetime'
+            elif isinstance(field, serializers.DateField):
+                represent = field.to_representation
+            elif isinstance(field, PLAIN_FIELDS) and '.' not in field.source and field.source != '*':
+                represent = None
+            else:
+                raise TypeError(f'{type(serializer).__name__}.{name}: {type(field).__name__} is not supported')
+            self.columns.append(column)
+            fields.append((name, column, represent))
+        return fields
+
+    def represent(self, rows: Iterable[dict]) -> list[dict]:
+        """ Преобразует строки values(columns) в данные ответа сериализатора """
+
+        represent_datetime = datetime_representation()
+        return [self._represent(row, self.fields, represent_datetime) for row in rows]
+
+    def _represent(self, row: dict, fields: list[tuple], represent_datetime: Callable) -> dict:
+        item = {}
+        for name, column, represent in fields:
+            value = row[column]
+            if value is None or represent is None:
+                item[name] = value
+            elif isinstance(represent, list):
+                item[name] = self._represent(row, represent, represent_datetime)
+            elif represent == 'datetime':
+                item[name] = represent_datetime(value)
+            else:
+                item[name] = represent(value)
+        return item
+
+
+@lru_cache(maxsize=256)
+def projection(serializer_class: type[serializers.Serializer], names: Optional[tuple[str, ...]] = None) -> Projection:
+    return Projection(serializer_class, names)
+
+
+class ProjectionListMixin(SparseFieldsMixin):
+    """ Список из строк values() вместо экземпляров моделей (Projection сериализатора представления)
+
+    Поля ответа можно выбрать параметрами fields / exclude (goals/fieldsets.py) - выбираются только их колонки.
+    """
+
+    def list(self, request: Request, *args, **kwargs) -> HttpResponseBase:
+        fields = projection(self.get_serializer_class(), self.get_sparse_fields())
+        queryset: QuerySet = self.filter_queryset(self.get_queryset())
+        queryset = queryset.values(*fields.columns, *self._key_columns(queryset, fields.columns))
+
+        page: Optional[list[dict[str, Any]]] = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(fields.represent(page))
+        return Response(fields.represent(queryset))
+
+    async def alist(self, request: Request, *args, **kwargs) -> HttpResponseBase:
+        fields = projection(self.get_serializer_class(), self.get_sparse_fields())
+        queryset: QuerySet = await afiltered_queryset(self)
+        queryset = queryset.values(*fields.columns, *self._key_columns(queryset, fields.columns))
+
+        if self.paginator is not None:
+            page = await self.paginator.apaginate_queryset(queryset, request, view=self)
+            if page is not None:
+                return self.get_paginated_response(fields.represent(page))
+        return Response(fields.represent([row async for row in queryset]))
+
+    def _key_columns(self, queryset: QuerySet, columns: Iterable[str]) -> tuple[str, ...]:
+        """ Возвращает невыдаваемые колонки ключа страницы (поле сортировки, id) для выдачи по ключу
+
+        Ключ следующей страницы берется из последней строки (goals/pagination.py), поэтому его колонки
+        выбираются, даже если поля не выдаются (?fields=), а в ответ не попадают.
+        """
+
+        if getattr(self.paginator, 'cursor_query_param', None) not in self.request.query_params:
+            return ()
+        ordering = (queryset.query.order_by or ('id',))[0]
+        keys = (ordering.lstrip('-'), 'id') if isinstance(ordering, str) else ('id',)
+        return tuple(key for key in dict.fromkeys(keys) if key not in columns)
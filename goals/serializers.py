@@ -3,7 +3,8 @@
 Данный модуль описывает сериализаторы для:
 - досок:
     BoardSerializer - для создания доски;
-    BoardParticipantSerializer - для получения участника доски;
+    BoardParticipantSerializer - для получения участника доски
+    (BoardParticipantListSerializer - список участников, пользователи загружаются одним запросом);
     BoardWithParticipantSerializer - для получения детальной информации по доске, обновление списка участников доски;
 - категорий:
     GoalCategorySerializer - для создания категории;
@@ -11,19 +12,27 @@
 - целей:
     GoalSerializer - для создания цели;
     GoalWithUserSerializer - для получения списка целей и детальной информации по цели;
+    GoalBatchItemSerializer - для проверки элемента пакетного создания/изменения целей;
+    GoalTransitionSerializer - для массовой смены статуса/приоритета целей;
 - комментариев:
     GoalCommentSerializer - для создания комментария;
     GoalCommentWithUserSerializer - для получения списка комментариев и детальной информации по комментарию
 
 """
 
-from django.db import transaction
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
 from rest_framework import serializers
-from rest_framework.exceptions import ValidationError, PermissionDenied
+from rest_framework.exceptions import ValidationError, PermissionDenied, NotFound
 from rest_framework.request import Request
 
 from core.models import User
 from core.serializers import UserSerializer
+from goals.access import EDITOR_ROLES, board_role, invalidate_board_roles, participant_boards
+from goals.caching import bump_board_versions
+from goals.importing import IMPORT_FORMATS
 from goals.models import GoalCategory, Goal, GoalComment, Board, BoardParticipant
 
 
@@ -31,18 +40,43 @@ class BoardSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Board
-        fields = '__all__'
+        exclude = ('participants_count',)
         read_only_fields = ('id', 'created', 'updated', 'is_deleted')
 
 
+class ParticipantUserField(serializers.SlugRelatedField):
+    """ Пользователь участника по username: в списке участников - из пользователей, загруженных списком заранее """
+
+    def to_internal_value(self, data):
+        users = getattr(self.parent.parent, 'users', None)
+        if users is None:
+            return super().to_internal_value(data)
+        if not isinstance(data, str):
+            self.fail('invalid')
+        if data not in users:
+            self.fail('does_not_exist', slug_name=self.slug_field, value=data)
+        return users[data]
+
+
+class BoardParticipantListSerializer(serializers.ListSerializer):
+    """ Список участников: пользователи всех элементов загружаются одним запросом username__in """
+
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            usernames = {item['user'] for item in data if isinstance(item, dict) and isinstance(item.get('user'), str)}
+            self.users = User.objects.in_bulk(usernames, field_name='username')
+        return super().to_internal_value(data)
+
+
 class BoardParticipantSerializer(serializers.ModelSerializer):
     role = serializers.ChoiceField(required=True, choices=BoardParticipant.editable_roles)
-    user = serializers.SlugRelatedField(slug_field='username', queryset=User.objects.all())
+    user = ParticipantUserField(slug_field='username', queryset=User.objects.all())
 
     class Meta:
         model = BoardParticipant
         fields = '__all__'
         read_only_fields = ('id', 'created', 'updated', 'board')
+        list_serializer_class = BoardParticipantListSerializer
 
     def validate_user(self, user: User) -> User:
         """ Проверяет роль пользователя """
@@ -57,23 +91,15 @@ class BoardWithParticipantSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Board
-        fields = '__all__'
+        exclude = ('participants_count',)
         read_only_fields = ('id', 'created', 'updated')
 
     def update(self, instance: Board, validated_data: dict) -> Board:
-        """ Обновляет список участников доски, обновляет название доски """
-
-        request: Request = self.context['request']
+        """ Обновляет список участников доски (если он передан), обновляет название доски """
 
         with transaction.atomic():
-            BoardParticipant.objects.filter(board=instance).exclude(user=request.user).delete()
-            BoardParticipant.objects.bulk_create(
-                [
-                    BoardParticipant(user=participant['user'], role=participant['role'], board=instance)
-                    for participant in validated_data.get('participants', [])
-                ],
-                ignore_conflicts=True,
-            )
+            if 'participants' in validated_data:
+                self._sync_participants(instance, validated_data['participants'])
 
             if title := validated_data.get('title'):
                 instance.title = title
@@ -82,6 +108,54 @@ class BoardWithParticipantSerializer(serializers.ModelSerializer):
 
         return instance
 
+    def _sync_participants(self, instance: Board, participants: list[dict]) -> None:
+        """ Приводит участников доски (кроме текущего пользователя) к переданному списку
+
+        Изменяются только отличающиеся записи: новые участники добавляются, роли изменившихся обновляются
+        (один запрос UPDATE на роль), отсутствующие в списке удаляются.
+        """
+
+        request: Request = self.context['request']
+        roles = {participant['user'].id: participant['role'] for participant in participants}
+        # участники загружены вместе с доской (BoardDetailView), иначе - одним запросом
+        current = {
+            participant.user_id: participant
+            for participant in instance.participants.all() if participant.user_id != request.user.id
+        }
+
+        removed = [participant.id for user_id, participant in current.items() if user_id not in roles]
+        changed = defaultdict(list)
+        for user_id, role in roles.items():
+            if user_id in current and current[user_id].role != role:
+                changed[role].append(current[user_id].id)
+        added = [
+            BoardParticipant(user_id=user_id, role=role, board=instance)
+            for user_id, role in roles.items() if user_id not in current
+        ]
+
+        if removed:
+            # удаление отправляет сигналы post_delete, кэши удаленных участников сбрасываются в goals/signals.py
+            BoardParticipant.objects.filter(id__in=removed).delete()
+        now = timezone.now()
+        for role, ids in changed.items():
+            BoardParticipant.objects.filter(id__in=ids).update(role=role, updated=now)
+        if added:
+            try:
+                with transaction.atomic():
+                    BoardParticipant.objects.bulk_create(added)
+            except IntegrityError:
+                # участника добавил параллельный запрос: изменения доски откатываются, клиент повторяет запрос
+                raise ValidationError({'participants': ['Participants were changed concurrently, retry the request.']})
+
+        if removed or changed or added:
+            Board.recount_participants([instance.id])
+        if changed or added:
+            # bulk_create и update не отправляют сигналы, кэши ролей и версия доски сбрасываются явно
+            invalidate_board_roles(*(
+                user_id for user_id, role in roles.items() if user_id not in current or current[user_id].role != role
+            ))
+            bump_board_versions(instance.id)
+
 
 class GoalCategorySerializer(serializers.ModelSerializer):
     user = serializers.HiddenField(default=serializers.CurrentUserDefault())
@@ -97,11 +171,7 @@ class GoalCategorySerializer(serializers.ModelSerializer):
         if board.is_deleted:
             raise ValidationError('Board is deleted')
 
-        if not BoardParticipant.objects.filter(
-                    board_id=board.id,
-                    role__in=[BoardParticipant.Role.owner, BoardParticipant.Role.writer],
-                    user_id=self.context['request'].user
-                ).exists():
+        if board_role(self.context['request'], board.id) not in EDITOR_ROLES:
             raise PermissionDenied
 
         return board
@@ -116,7 +186,7 @@ class GoalSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Goal
-        fields = '__all__'
+        exclude = ('board',)
         read_only_fields = ('id', 'created', 'updated', 'user')
 
     def validate_category(self, value: GoalCategory) -> GoalCategory:
@@ -125,11 +195,7 @@ class GoalSerializer(serializers.ModelSerializer):
         if value.is_deleted:
             raise ValidationError('Category not found')
 
-        if not BoardParticipant.objects.filter(
-                board_id=value.board.id,
-                role__in=[BoardParticipant.Role.owner, BoardParticipant.Role.writer],
-                user_id=self.context['request'].user
-        ).exists():
+        if board_role(self.context['request'], value.board_id) not in EDITOR_ROLES:
             raise PermissionDenied('must be owner or writer in project')
 
         return value
@@ -142,12 +208,105 @@ class GoalWithUserSerializer(GoalSerializer):
     user = UserSerializer(read_only=True)
 
 
+class GoalBatchItemSerializer(serializers.ModelSerializer):
+    """ Элемент пакета целей: без id - создание, с id - частичное изменение цели
+
+    Цели и категории пакета загружаются заранее и передаются в context ('goals', 'categories'),
+    поэтому проверка элемента не обращается к БД.
+    """
+
+    id = serializers.IntegerField(required=False)
+    category = serializers.IntegerField()
+
+    class Meta:
+        model = Goal
+        fields = ('id', 'title', 'description', 'category', 'due_date', 'status', 'priority')
+
+    def validate_id(self, value: int) -> Goal:
+        """ Находит изменяемую цель, проверяет права пользователя на ее изменение """
+
+        if (goal := self.context['goals'].get(value)) is None:
+            raise NotFound('Goal not found')
+
+        if board_role(self.context['request'], goal.board_id) not in EDITOR_ROLES:
+            raise PermissionDenied('must be owner or writer in project')
+
+        return goal
+
+    def validate_category(self, value: int) -> GoalCategory:
+        """ Проверяет наличие категории, права пользователя на создание цели в ней """
+
+        if (category := self.context['categories'].get(value)) is None or category.is_deleted:
+            raise ValidationError('Category not found')
+
+        if board_role(self.context['request'], category.board_id) not in EDITOR_ROLES:
+            raise PermissionDenied('must be owner or writer in project')
+
+        return category
+
+
+class GoalTransitionSerializer(serializers.Serializer):
+    """ Массовая смена статуса/приоритета: цели задаются списком ids и/или выражением filter (параметры GoalFilter) """
+
+    ids = serializers.ListField(child=serializers.IntegerField(), required=False, allow_empty=False)
+    filter = serializers.DictField(required=False, allow_empty=False)
+    # архивирование - это удаление цели, оно выполняется только через удаление отдельной цели
+    status = serializers.ChoiceField(
+        choices=[(value, label) for value, label in Goal.Status.choices if value != Goal.Status.archived],
+        required=False,
+    )
+    priority = serializers.ChoiceField(choices=Goal.Priority.choices, required=False)
+
+    def validate(self, attrs: dict) -> dict:
+        """ Проверяет, что заданы отбор целей и хотя бы одно изменяемое поле """
+
+        if 'ids' not in attrs and 'filter' not in attrs:
+            raise ValidationError('Specify goal ids or filter')
+        if 'status' not in attrs and 'priority' not in attrs:
+            raise ValidationError('Specify status or priority')
+        return attrs
+
+    def validate_filter(self, value: dict) -> dict[str, str]:
+        """ Приводит значения к строкам параметров запроса GoalFilter: список - значения через запятую """
+
+        params = {}
+        for name, item in value.items():
+            items = item if isinstance(item, list) else [item]
+            if not items or not all(isinstance(element, (str, int, float)) for element in items):
+                raise ValidationError({name: ['Expected a value or a list of values.']})
+            params[name] = ','.join(map(str, items))
+        return params
+
+
+class EditorBoardField(serializers.PrimaryKeyRelatedField):
+    """ Доска, в которой пользователь запроса - владелец или редактор (чужая доска - ошибка поля) """
+
+    def get_queryset(self):
+        user = self.context['request'].user
+        return Board.objects.filter(id__in=participant_boards(user, EDITOR_ROLES)).exclude(is_deleted=True)
+
+
+class GoalImportSerializer(serializers.Serializer):
+    """ Загрузка целей: файл NDJSON / CSV (формат - input или по расширению файла), доска и режим проверки """
+
+    file = serializers.FileField()
+    board = EditorBoardField()
+    input = serializers.ChoiceField(choices=IMPORT_FORMATS, required=False)
+    dry_run = serializers.BooleanField(default=False)
+
+    def validate(self, attrs: dict) -> dict:
+        """ Определяет формат по расширению файла, если он не задан """
+
+        attrs.setdefault('input', 'csv' if attrs['file'].name.lower().endswith('.csv') else 'ndjson')
+        return attrs
+
+
 class GoalCommentSerializer(serializers.ModelSerializer):
     user = serializers.HiddenField(default=serializers.CurrentUserDefault())
 
     class Meta:
         model = GoalComment
-        fields = '__all__'
+        exclude = ('board',)
         read_only_fields = ('id', 'created', 'updated', 'user', 'is_deleted')
 
     def validate_goal(self, value):
@@ -156,11 +315,7 @@ class GoalCommentSerializer(serializers.ModelSerializer):
         if value.status == Goal.Status.archived:
             raise ValidationError('Goal not found')
 
-        if not BoardParticipant.objects.filter(
-                    board_id=value.category.board.id,
-                    role__in=[BoardParticipant.Role.owner, BoardParticipant.Role.writer],
-                    user_id=self.context['request'].user
-                ).exists():
+        if board_role(self.context['request'], value.board_id) not in EDITOR_ROLES:
             raise PermissionDenied
 
         return value
@@ -0,0 +1,62 @@
+""" Сброс кэшей при изменении досок, категорий и участников
+
+- кэш ролей пользователей (goals.access) - при изменении участников досок;
+- версии досок для кэша ответов списков (goals.caching) - при изменении досок, категорий и участников,
+  а также профилей пользователей: данные автора вложены в выдачу категорий.
+Массовые операции без сигналов (bulk_create, update) сбрасывают кэши явно.
+
+"""
+
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from core.models import User
+from goals.access import invalidate_board_roles
+from goals.caching import bump_board_versions
+from goals.models import Board, BoardParticipant, GoalCategory
+
+# поля пользователя, которые выдаются вместе с записями досок (core.serializers.UserSerializer)
+USER_SHOWN_FIELDS = {'username', 'first_name', 'last_name', 'email'}
+
+
+@receiver(post_save, sender=BoardParticipant)
+def participant_saved(sender, instance: BoardParticipant, **kwargs) -> None:
+    loaded_user_id = getattr(instance, '_loaded_user_id', None)
+    invalidate_board_roles(*{instance.user_id, loaded_user_id} - {None})
+    bump_board_versions(instance.board_id)
+    instance._loaded_user_id = instance.user_id
+
+
+@receiver(post_delete, sender=BoardParticipant)
+def participant_deleted(sender, instance: BoardParticipant, **kwargs) -> None:
+    invalidate_board_roles(instance.user_id)
+    bump_board_versions(instance.board_id)
+
+
+@receiver([post_save, post_delete], sender=Board)
+def board_changed(sender, instance: Board, **kwargs) -> None:
+    bump_board_versions(instance.id)
+
+
+@receiver(post_save, sender=GoalCategory)
+def category_saved(sender, instance: GoalCategory, **kwargs) -> None:
+    # при переносе категории меняется и список прежней доски
+    loaded_board_id = getattr(instance, '_loaded_board_id', None)
+    bump_board_versions(*{instance.board_id, loaded_board_id} - {None})
+
+
+@receiver(post_delete, sender=GoalCategory)
+def category_deleted(sender, instance: GoalCategory, **kwargs) -> None:
+    bump_board_versions(instance.board_id)
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance: User, created: bool, update_fields=None, **kwargs) -> None:
+    if created or (update_fields is not None and not USER_SHOWN_FIELDS & set(update_fields)):
+        return
+    # доски, где пользователь - участник или автор категорий (автор мог уже покинуть доску)
+    board_ids = list(BoardParticipant.objects.filter(user=instance).values_list('board_id', flat=True).union(
+        GoalCategory.objects.filter(user=instance).values_list('board_id', flat=True),
+    ))
+    if board_ids:
+        bump_board_versions(*board_ids)
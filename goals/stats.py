@@ -0,0 +1,74 @@
+""" Статистика целей доски
+
+board_stats считает цели доски по статусам, приоритетам и просроченные цели одним запросом
+GROUP BY (категория, статус, приоритет) по неархивным целям неудаленных категорий - только по индексу
+goal_live_board_stats_idx. Групп не больше, чем категорий доски * статусов * приоритетов,
+итоги складываются из них в Python. Комментарии по категориям считаются отдельным запросом GROUP BY
+по комментариям доски (соединение с ними в первом запросе исключило бы выборку только по индексу),
+цели для него тоже читаются из индекса (включает id).
+
+Результат хранится в кэше Django settings.BOARD_STATS_CACHE_TIMEOUT секунд (0 - без кэша):
+изменения целей попадают в статистику не позже, чем через это время.
+
+"""
+
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from goals.models import Goal, GoalComment
+
+
+def board_stats(board_id: int) -> dict:
+    """ Возвращает статистику целей доски (из кэша, если он включен) """
+
+    timeout = settings.BOARD_STATS_CACHE_TIMEOUT
+    if not timeout:
+        return _board_stats(board_id)
+
+    key = f'goals:board_stats:{board_id}'
+    if (stats := cache.get(key)) is None:
+        stats = _board_stats(board_id)
+        cache.set(key, stats, timeout)
+    return stats
+
+
+def _board_stats(board_id: int) -> dict:
+    overdue = Q(due_date__lt=timezone.localdate()) & ~Q(status=Goal.Status.done)
+    live_goals = Q(goal__board_id=board_id, goal__category__is_deleted=False) & ~Q(goal__status=Goal.Status.archived)
+    groups = Goal.objects.filter(
+        board_id=board_id, category__is_deleted=False,
+    ).exclude(status=Goal.Status.archived).values(
+        'category_id', 'category__title', 'status', 'priority',
+    ).annotate(
+        # считается непустое поле индекса (не id), чтобы запрос выполнялся только по индексу
+        goals=Count('status'), overdue=Count('status', filter=overdue),
+    ).order_by()
+    comments = dict(GoalComment.objects.filter(live_goals, board_id=board_id).values_list(
+        'goal__category_id',
+    ).annotate(comments=Count('id')).order_by())
+
+    statuses = Counter({status.name: 0 for status in Goal.Status if status != Goal.Status.archived})
+    priorities = Counter({priority.name: 0 for priority in Goal.Priority})
+    categories: dict[int, dict] = {}
+    for group in groups:
+        statuses[Goal.Status(group['status']).name] += group['goals']
+        priorities[Goal.Priority(group['priority']).name] += group['goals']
+        category = categories.setdefault(group['category_id'], {
+            'id': group['category_id'], 'title': group['category__title'], 'goals': 0, 'overdue': 0,
+            'comments': comments.get(group['category_id'], 0),
+        })
+        category['goals'] += group['goals']
+        category['overdue'] += group['overdue']
+
+    return {
+        'goals': sum(statuses.values()),
+        'overdue': sum(category['overdue'] for category in categories.values()),
+        'comments': sum(category['comments'] for category in categories.values()),
+        'status': dict(statuses),
+        'priority': dict(priorities),
+        'categories': sorted(categories.values(), key=lambda category: (category['title'], category['id'])),
+    }
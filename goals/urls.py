@@ -1,14 +1,18 @@
 from django.urls import path
 
+from goals.asynchronous import async_view
+
 from goals.views.goal_category import GoalCategoryCreateView, GoalCategoryListView, GoalCategoryDetailView
-from goals.views.goals import GoalCreateView, GoalListView, GoalDetailView
+from goals.views.goals import GoalCreateView, GoalListView, GoalDetailView, GoalBatchView, \
+    GoalTransitionView, GoalExportView, GoalImportView
 from goals.views.goal_comment import GoalCommentCreateView, GoalCommentListView, GoalCommentDetailView
-from goals.views.board import BoardCreateView, BoardListView, BoardDetailView
+from goals.views.board import BoardCreateView, BoardListView, BoardDetailView, BoardStatsView
 urlpatterns = [
     # Board
     path('board/create', BoardCreateView.as_view(), name='create_board'),
     path('board/list', BoardListView.as_view(), name='board_list'),
     path('board/<int:pk>', BoardDetailView.as_view(), name='board_detail'),
+    path('board/<int:pk>/stats', BoardStatsView.as_view(), name='board_stats'),
 
     # Category
     path('goal_category/create', GoalCategoryCreateView.as_view(), name='create_category'),
@@ -19,9 +23,24 @@ urlpatterns = [
     path('goal/create', GoalCreateView.as_view(), name='create_goal'),
     path('goal/list', GoalListView.as_view(), name='goal_list'),
     path('goal/<int:pk>', GoalDetailView.as_view(), name='goal_detail'),
+    path('goal/batch', GoalBatchView.as_view(), name='goal_batch'),
+    path('goal/transition', GoalTransitionView.as_view(), name='goal_transition'),
+    path('goal/export', GoalExportView.as_view(), name='goal_export'),
+    path('goal/import', GoalImportView.as_view(), name='goal_import'),
 
     # Comments
     path('goal_comment/create', GoalCommentCreateView.as_view(), name='create_comment'),
     path('goal_comment/list', GoalCommentListView.as_view(), name='comment_list'),
     path('goal_comment/<int:pk>', GoalCommentDetailView.as_view(), name='comment_detail'),
 ]
+
+# ASGI-приложение (todolist/urls_asgi.py): частые запросы чтения - асинхронными представлениями
+asgi_urlpatterns = [
+    path('goal_category/list', async_view(GoalCategoryListView, 'alist'), name='category_list'),
+    path('goal/list', async_view(GoalListView, 'alist'), name='goal_list'),
+    path('goal/<int:pk>', async_view(GoalDetailView, 'aretrieve'), name='goal_detail'),
+    path('goal_comment/list', async_view(GoalCommentListView, 'alist'), name='comment_list'),
+]
+asgi_urlpatterns += [
+    pattern for pattern in urlpatterns if pattern.name not in {async_pattern.name for async_pattern in asgi_urlpatterns}
+]
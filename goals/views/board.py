@@ -3,17 +3,30 @@
 BoardCreateView - создание доски (любой аутентифицированный пользователь)
 BoardListView - формирование списка досок (доступно участнику: владельцу/редактору/читателю)
 BoardDetailView - предоставление информации по отдельной доске / ее изменение / удаление (доступно только владельцу)
-(при удалении доски остаются в БД со статусом удалена)
+(при удалении доски остаются в БД со статусом удалена, их цели архивируются в фоне - goals/cascade.py)
+BoardStatsView - статистика целей доски по статусам, приоритетам, срокам и категориям (доступно участнику доски)
+Списки и детальная информация выдают выбранные поля: ?fields= / ?exclude= (goals/fieldsets.py)
 
 """
 
+from datetime import datetime
+
 from django.db import transaction
-from django.db.models import QuerySet
+from django.db.models import QuerySet, prefetch_related_objects
+from django.utils import timezone
 from rest_framework import generics, filters, permissions
-
-from goals.models import BoardParticipant, Board, Goal
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from goals.access import participant_boards
+from goals.caching import CachedListMixin, bump_board_versions
+from goals.conditional import ConditionalListMixin, ConditionalRetrieveMixin
+from goals.fieldsets import SparseFieldsMixin
+from goals.filters import TrigramSearchFilter
+from goals.models import BoardParticipant, Board
 from goals.permissions import BoardPermission
 from goals.serializers import BoardSerializer, BoardWithParticipantSerializer
+from goals.stats import board_stats
 
 
 class BoardCreateView(generics.CreateAPIView):
@@ -28,27 +41,71 @@ class BoardCreateView(generics.CreateAPIView):
             BoardParticipant.objects.create(user=self.request.user, board=board, role=BoardParticipant.Role.owner)
 
 
-class BoardListView(generics.ListAPIView):
+class BoardListView(CachedListMixin, ConditionalListMixin, SparseFieldsMixin, generics.ListAPIView):
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = BoardSerializer
-    filter_backends = [filters.OrderingFilter]
+    filter_backends = [filters.OrderingFilter, TrigramSearchFilter]
     ordering = ['title']
+    search_fields = ['title']
+    etag_user_field = None
 
     def get_queryset(self) -> QuerySet[Board]:
         """ Показывает доски участникам за исключением удаленных """
 
-        return Board.objects.filter(participants__user=self.request.user).exclude(is_deleted=True)
+        return Board.objects.filter(id__in=participant_boards(self.request.user)).exclude(is_deleted=True)
 
 
-class BoardDetailView(generics.RetrieveUpdateDestroyAPIView):
+class BoardDetailView(SparseFieldsMixin, ConditionalRetrieveMixin, generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [BoardPermission]
     serializer_class = BoardWithParticipantSerializer
     queryset = Board.objects.prefetch_related('participants__user').exclude(is_deleted=True)
 
+    def get_object_version(self, instance: Board) -> datetime:
+        """ Учитывает изменения участников доски и их пользователей (загружены вместе с доской), если они выдаются """
+
+        if not self._participants_shown():
+            return instance.updated
+        return max([instance.updated, *(
+            max(participant.updated, participant.user.updated) for participant in instance.participants.all()
+        )])
+
+    def get_object_etag_parts(self, instance: Board) -> tuple:
+        """ Удаление участника не меняет время изменения доски и оставшихся участников, поэтому учитывается их число """
+
+        return (len(instance.participants.all()),) if self._participants_shown() else ()
+
+    def _participants_shown(self) -> bool:
+        return (fields := self.get_sparse_fields()) is None or 'participants' in fields
+
+    def update(self, request: Request, *args, **kwargs) -> Response:
+        """ Изменяет доску и возвращает ее с участниками, загруженными заново вместе с пользователями """
+
+        instance = self.get_object()
+        serializer = self.get_serializer(instance, data=request.data, partial=kwargs.pop('partial', False))
+        serializer.is_valid(raise_exception=True)
+        self.perform_update(serializer)
+
+        # участники, загруженные до изменения, устарели; без prefetch пользователь загружался бы для каждого участника
+        instance._prefetched_objects_cache = {}
+        prefetch_related_objects([instance], 'participants__user')
+        return Response(serializer.data)
+
     def perform_destroy(self, instance: Board) -> None:
-        """ При удалении доски также удаляет категории / архивирует цели, связанные с ней """
+        """ При удалении доски также удаляет ее категории (цели архивируются в фоне, goals/cascade.py) """
 
+        now = timezone.now()
         with transaction.atomic():
-            Board.objects.filter(id=instance.id).update(is_deleted=True)
-            instance.categories.update(is_deleted=True)
-            Goal.objects.filter(category__board=instance).update(status=Goal.Status.archived)
+            Board.objects.filter(id=instance.id).update(is_deleted=True, updated=now)
+            instance.categories.update(is_deleted=True, updated=now)
+            # update() не отправляет сигналы, версия доски для кэша списков меняется явно
+            bump_board_versions(instance.id)
+
+
+class BoardStatsView(generics.RetrieveAPIView):
+    permission_classes = [BoardPermission]
+    queryset = Board.objects.exclude(is_deleted=True)
+
+    def retrieve(self, request: Request, *args, **kwargs) -> Response:
+        """ Возвращает статистику целей доски (goals.stats) """
+
+        return Response(board_stats(self.get_object().id))
@@ -1,18 +1,25 @@
 """ Набор представлений для управления категориями (CRUD)
 
 GoalCategoryCreateView - создание категории (любой аутентифицированный пользователь)
-GoalCategoryListView - формирование списка категорий (доступно любому участнику доски)
+GoalCategoryListView - формирование списка категорий (доступно любому участнику доски; выдается из строк values() - goals/projections.py)
 GoalCategoryDetailView - предоставление информации по отдельной категории / ее изменение / удаление
-(при удалении категории остаются в БД со статусом удалена)
+(при удалении категории остаются в БД со статусом удалена, их цели архивируются в фоне - goals/cascade.py)
+Списки и детальная информация выдают выбранные поля: ?fields= / ?exclude= (goals/fieldsets.py)
 
 """
 
-from django.db import transaction
 from django.db.models import QuerySet
 from rest_framework import generics, permissions, filters
 
-from goals.models import GoalCategory, Goal
+from goals.access import participant_boards
+from goals.caching import CachedListMixin
+from goals.conditional import ConditionalListMixin, ConditionalRetrieveMixin
+from goals.fieldsets import SparseFieldsMixin
+from goals.filters import TrigramSearchFilter
+from goals.models import GoalCategory
+from goals.pagination import KeysetLimitOffsetPagination
 from goals.permissions import GoalCategoryPermission
+from goals.projections import ProjectionListMixin
 from goals.serializers import GoalCategorySerializer, GoalCategoryWithUserSerializer
 
 
@@ -21,10 +28,11 @@ class GoalCategoryCreateView(generics.CreateAPIView):
     serializer_class = GoalCategorySerializer
 
 
-class GoalCategoryListView(generics.ListAPIView):
+class GoalCategoryListView(CachedListMixin, ConditionalListMixin, ProjectionListMixin, generics.ListAPIView):
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = GoalCategoryWithUserSerializer
-    filter_backends = [filters.OrderingFilter, filters.SearchFilter]
+    pagination_class = KeysetLimitOffsetPagination
+    filter_backends = [filters.OrderingFilter, TrigramSearchFilter]
     ordering_fields = ['title', 'created']
     ordering = ['title']
     search_fields = ['title']
@@ -32,19 +40,19 @@ class GoalCategoryListView(generics.ListAPIView):
     def get_queryset(self) -> QuerySet[GoalCategory]:
         """ Показывает участникам категории за исключением удаленных """
 
-        return GoalCategory.objects.filter(board__participants__user=self.request.user).exclude(is_deleted=True)
+        return GoalCategory.objects.select_related('user').filter(
+                board__in=participant_boards(self.request.user),
+            ).exclude(is_deleted=True)
 
 
-class GoalCategoryDetailView(generics.RetrieveUpdateDestroyAPIView):
+class GoalCategoryDetailView(SparseFieldsMixin, ConditionalRetrieveMixin, generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [GoalCategoryPermission]
     serializer_class = GoalCategoryWithUserSerializer
-    queryset = GoalCategory.objects.exclude(is_deleted=True)
+    sparse_required_fields = ('id', 'updated', 'board')
+    queryset = GoalCategory.objects.select_related('user').exclude(is_deleted=True)
 
     def perform_destroy(self, instance: GoalCategory) -> None:
-        """ При удалении категории также архивирует цели, связанные с ней """
+        """ Помечает категорию удаленной, ее цели архивируются в фоне (goals/cascade.py) """
 
-        with transaction.atomic():
-            instance.is_deleted = True
-            instance.save(update_fields=['is_deleted'])
-            instance.goal_set.update(status=Goal.Status.archived)
-        # return instance
+        instance.is_deleted = True
+        instance.save(update_fields=['is_deleted', 'updated'])
@@ -1,16 +1,22 @@
 """ Набор представлений для управления комментариями к цели (CRUD)
 
 GoalCommentCreateView - создание комментария (только владелец/редактор)
-GoalCommentListView - формирование списка комментариев (доступно любому участнику доски)
+GoalCommentListView - формирование списка комментариев (доступно любому участнику доски; выдается из строк values() - goals/projections.py)
 GoalCommentDetailView - предоставление информации по комментарию / его изменение / удаление (только владелец/редактор)
+Списки и детальная информация выдают выбранные поля: ?fields= / ?exclude= (goals/fieldsets.py)
 
 """
 from django.db.models import QuerySet
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, generics, permissions
 
+from goals.access import participant_boards
+from goals.conditional import ConditionalListMixin, ConditionalRetrieveMixin
+from goals.fieldsets import SparseFieldsMixin
 from goals.models import GoalComment
+from goals.pagination import KeysetLimitOffsetPagination
 from goals.permissions import GoalCommentPermission
+from goals.projections import ProjectionListMixin
 from goals.serializers import GoalCommentSerializer, GoalCommentWithUserSerializer
 
 
@@ -19,9 +25,10 @@ class GoalCommentCreateView(generics.CreateAPIView):
     serializer_class = GoalCommentSerializer
 
 
-class GoalCommentListView(generics.ListAPIView):
+class GoalCommentListView(ConditionalListMixin, ProjectionListMixin, generics.ListAPIView):
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = GoalCommentWithUserSerializer
+    pagination_class = KeysetLimitOffsetPagination
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ['goal']
     ordering = ['-created']
@@ -29,10 +36,10 @@ class GoalCommentListView(generics.ListAPIView):
     def get_queryset(self) -> QuerySet[GoalComment]:
         """ Показывает комментарии участникам """
 
-        return GoalComment.objects.filter(goal__category__board__participants__user=self.request.user)
+        return GoalComment.objects.select_related('user').filter(board__in=participant_boards(self.request.user))
 
 
-class GoalCommentDetailView(generics.RetrieveUpdateDestroyAPIView):
+class GoalCommentDetailView(SparseFieldsMixin, ConditionalRetrieveMixin, generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [GoalCommentPermission]
     serializer_class = GoalCommentWithUserSerializer
 
@@ -40,5 +47,5 @@ class GoalCommentDetailView(generics.RetrieveUpdateDestroyAPIView):
         """ Показывает детальный комментарий участникам """
 
         return GoalComment.objects.select_related('user').filter(
-                goal__category__board__participants__user=self.request.user
+                board__in=participant_boards(self.request.user)
             )
@@ -1,20 +1,45 @@
 """ Набор представлений для управления целями (CRUD)
 
 GoalCreateView - создание цели (любой аутентифицированный пользователь)
-GoalListView - формирование списка целей (доступно любому участнику доски)
+GoalListView - формирование списка целей (доступно любому участнику доски; выдается из строк values() - goals/projections.py)
 GoalDetailView - предоставление информации по отдельной цели / ее изменение / удаление
 (при удалении цели помечаются в БД как архивные)
+GoalBatchView - пакетное создание и частичное изменение целей (только владелец/редактор досок целей)
+GoalTransitionView - массовая смена статуса/приоритета целей одним запросом UPDATE
+(изменяются только цели досок, где пользователь владелец/редактор)
+GoalExportView - потоковая выгрузка всех видимых пользователю целей в NDJSON / CSV (goals/export.py)
+GoalImportView - массовая загрузка целей с комментариями на доску из NDJSON / CSV (goals/importing.py)
+Списки и детальная информация выдают выбранные поля: ?fields= / ?exclude= (goals/fieldsets.py)
 
 """
+from collections import defaultdict
+from typing import Any, Iterable
+
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
 from django.db.models import QuerySet
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import permissions, filters
-from rest_framework.generics import CreateAPIView, ListAPIView, RetrieveUpdateDestroyAPIView
+from rest_framework.exceptions import APIException, ValidationError
+from rest_framework.generics import CreateAPIView, ListAPIView, RetrieveUpdateDestroyAPIView, GenericAPIView
+from rest_framework.parsers import MultiPartParser
+from rest_framework.request import Request
+from rest_framework.response import Response
 
-from goals.filters import GoalFilter
-from goals.models import Goal
+from goals.access import EDITOR_ROLES, participant_boards
+from goals.conditional import ConditionalListMixin, ConditionalRetrieveMixin
+from goals.export import EXPORT_FORMATS, export_response
+from goals.fieldsets import SparseFieldsMixin
+from goals.filters import GoalFilter, FullTextSearchFilter
+from goals.importing import import_goals, read_rows
+from goals.models import Goal, GoalCategory, GoalComment
+from goals.pagination import KeysetLimitOffsetPagination
 from goals.permissions import GoalPermission
-from goals.serializers import GoalSerializer, GoalWithUserSerializer
+from goals.projections import ProjectionListMixin
+from goals.serializers import GoalSerializer, GoalWithUserSerializer, GoalBatchItemSerializer, \
+    GoalTransitionSerializer, GoalImportSerializer
 
 
 class GoalCreateView(CreateAPIView):
@@ -22,20 +47,21 @@ class GoalCreateView(CreateAPIView):
     serializer_class = GoalSerializer
 
 
-class GoalListView(ListAPIView):
+class GoalListView(ConditionalListMixin, ProjectionListMixin, ListAPIView):
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = GoalWithUserSerializer
-    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, filters.SearchFilter]
+    pagination_class = KeysetLimitOffsetPagination
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, FullTextSearchFilter]
     filterset_class = GoalFilter
     ordering_fields = ['title', 'created']
     ordering = ['title']
     search_fields = ['title', 'description']
 
     def get_queryset(self) -> QuerySet[Goal]:
-        """ Показывает участникам цели за исключением архивных """
+        """ Показывает участникам цели за исключением архивных и целей удаленных категорий (ожидающих архивации) """
 
-        return Goal.objects.filter(
-                category__board__participants__user=self.request.user,
+        return Goal.objects.select_related('user').filter(
+                board__in=participant_boards(self.request.user), category__is_deleted=False,
             ).exclude(status=Goal.Status.archived)
 
     # def get_queryset(self): предыдущая версия
@@ -44,13 +70,214 @@ class GoalListView(ListAPIView):
     #     ).exclude(status=Goal.Status.archived)
 
 
-class GoalDetailView(RetrieveUpdateDestroyAPIView):
+class GoalDetailView(SparseFieldsMixin, ConditionalRetrieveMixin, RetrieveUpdateDestroyAPIView):
     permission_classes = [GoalPermission]
     serializer_class = GoalWithUserSerializer
-    queryset = Goal.objects.exclude(status=Goal.Status.archived)
+    sparse_required_fields = ('id', 'updated', 'board')
+    queryset = Goal.objects.select_related('user').filter(
+        category__is_deleted=False,
+    ).exclude(status=Goal.Status.archived)
 
     def perform_destroy(self, instance: Goal) -> None:
         """ При удалении цели присваивает ей статус архивная """
 
         instance.status = Goal.Status.archived
-        instance.save(update_fields=['status'])
+        instance.save(update_fields=['status', 'updated'])
+
+
+MAX_BATCH_SIZE = 1000
+
+
+def _ids(items: Iterable[Any], field: str) -> set[int]:
+    """ Собирает идентификаторы из поля элементов пакета (некорректные значения отклонит сериализатор) """
+
+    ids = set()
+    for item in items:
+        try:
+            ids.add(int(item[field]))
+        except (TypeError, KeyError, ValueError):
+            pass
+    return ids
+
+
+class GoalBatchView(GenericAPIView):
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = GoalBatchItemSerializer
+
+    def post(self, request: Request, *args, **kwargs) -> Response:
+        """ Создает и изменяет цели пакетом, возвращает результат по каждому элементу
+
+        Цели и категории пакета загружаются двумя запросами, роли пользователя - одним (goals.access),
+        запись выполняется в одной транзакции через bulk_create / bulk_update.
+        """
+
+        items = request.data
+        if not isinstance(items, list):
+            raise ValidationError('Expected a list of goals')
+        if len(items) > MAX_BATCH_SIZE:
+            raise ValidationError(f'Batch size is limited to {MAX_BATCH_SIZE} goals')
+
+        context = {
+            **self.get_serializer_context(),
+            'goals': Goal.objects.select_related('user').filter(
+                category__is_deleted=False,
+            ).exclude(status=Goal.Status.archived).in_bulk(_ids(items, 'id')),
+            'categories': GoalCategory.objects.in_bulk(_ids(items, 'category')),
+        }
+        results: list[dict] = []
+        created: dict[int, Goal] = {}
+        updated: dict[int, Goal] = {}
+        updated_ids: set[int] = set()
+        fields = {'updated'}
+        moved = defaultdict(list)
+        now = timezone.now()
+
+        for index, item in enumerate(items):
+            serializer = self.get_serializer(data=item, partial=isinstance(item, dict) and 'id' in item, context=context)
+            try:
+                serializer.is_valid(raise_exception=True)
+            except APIException as exc:
+                results.append({'status': exc.status_code, 'errors': exc.detail})
+                continue
+
+            attrs = dict(serializer.validated_data)
+            results.append({})
+            if (goal := attrs.pop('id', None)) is None:
+                category = attrs['category']
+                created[index] = Goal(user=request.user, board_id=category.board_id, **attrs)
+                continue
+
+            if goal.id in updated_ids:
+                results[index] = {'status': 400, 'errors': {'id': ['Goal is repeated in the batch']}}
+                continue
+            for field, value in attrs.items():
+                setattr(goal, field, value)
+            if (category := attrs.get('category')) is not None and category.board_id != goal.board_id:
+                moved[category.board_id].append(goal.id)
+                goal.board_id = category.board_id
+                fields.add('board')
+            goal.updated = now
+            fields.update(attrs)
+            updated[index] = goal
+            updated_ids.add(goal.id)
+
+        with transaction.atomic():
+            Goal.objects.bulk_create(created.values())
+            if updated:
+                Goal.objects.bulk_update(updated.values(), fields)
+            Goal.count_saved([*created.values(), *updated.values()])
+            # комментарии перенесенных целей переходят на новую доску (как в Goal.save)
+            for board_id, goal_ids in moved.items():
+                GoalComment.objects.filter(goal_id__in=goal_ids).update(board_id=board_id, updated=now)
+
+        for status, goals in ((201, created), (200, updated)):
+            for index, data in zip(goals, GoalWithUserSerializer(goals.values(), many=True).data):
+                results[index] = {'status': status, 'data': data}
+        return Response(results)
+
+
+class GoalTransitionView(GenericAPIView):
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = GoalTransitionSerializer
+
+    def post(self, request: Request, *args, **kwargs) -> Response:
+        """ Меняет статус/приоритет отобранных целей, возвращает число измененных целей
+
+        Права проверяются в том же запросе подзапросом по участникам (goals.access):
+        цели досок, где пользователь не владелец/редактор, не изменяются и не учитываются в updated.
+        Если цели заданы списком ids, ответ перечисляет в not_updated цели, которые не изменены
+        (нет прав на доску, цель архивная или не найдена). Архивирование (удаление) через этот метод недоступно.
+        При смене статуса в той же транзакции пересчитываются счетчики целей затронутых категорий.
+        """
+
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        queryset = Goal.objects.filter(
+            board__in=participant_boards(request.user, EDITOR_ROLES), category__is_deleted=False,
+        ).exclude(status=Goal.Status.archived)
+        if 'ids' in data:
+            queryset = queryset.filter(id__in=data['ids'])
+        if 'filter' in data:
+            filterset = GoalFilter(data=data['filter'], queryset=queryset, request=request)
+            if not filterset.is_valid():
+                raise ValidationError({'filter': filterset.errors})
+            queryset = filterset.qs
+
+        values = {field: data[field] for field in ('status', 'priority') if field in data}
+        if 'status' not in values and 'ids' not in data:
+            return Response({'updated': queryset.update(**values, updated=timezone.now())})
+
+        with transaction.atomic():
+            if 'ids' in data:
+                # отобранные цели блокируются до изменения, поэтому неизмененные цели в ответе точны
+                selected = set(queryset.select_for_update(of=('self',)).values_list('id', flat=True))
+                queryset = Goal.objects.filter(id__in=selected)
+            if 'status' in values:
+                category_ids = list(queryset.order_by().values_list('category_id', flat=True).distinct())
+            count = queryset.update(**values, updated=timezone.now())
+            if 'status' in values:
+                # update() не вызывает save(), счетчики целей затронутых категорий пересчитываются
+                GoalCategory.recount_goals(category_ids)
+
+        if 'ids' not in data:
+            return Response({'updated': count})
+        return Response({'updated': count, 'not_updated': sorted(set(data['ids']) - selected)})
+
+
+class GoalExportView(GenericAPIView):
+    permission_classes = [permissions.IsAuthenticated]
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter]
+    filterset_class = GoalFilter
+    search_fields = ['title', 'description']
+    # выгрузка идет в порядке id: без сортировки всех найденных целей по релевантности первая строка выдается сразу
+    search_ranking = False
+
+    def get_queryset(self) -> QuerySet[Goal]:
+        """ Выгружает те же цели, что и список целей, в порядке id """
+
+        return Goal.objects.filter(
+            board__in=participant_boards(self.request.user), category__is_deleted=False,
+        ).exclude(status=Goal.Status.archived).order_by('id')
+
+    def get(self, request: Request, *args, **kwargs) -> StreamingHttpResponse:
+        """ Выгружает цели (с фильтрами GoalFilter и поиском списка целей) в формате output: ndjson или csv
+
+        Параметр comments=true добавляет к целям их комментарии.
+        """
+
+        export_format = request.query_params.get('output', 'ndjson')
+        if export_format not in EXPORT_FORMATS:
+            raise ValidationError({'output': [f'Выберите один из форматов: {", ".join(EXPORT_FORMATS)}']})
+        with_comments = request.query_params.get('comments', '').lower() in ('1', 'true')
+
+        return export_response(
+            self.filter_queryset(self.get_queryset()), export_format, with_comments,
+            asynchronous=isinstance(request._request, ASGIRequest),
+        )
+
+
+class GoalImportView(GenericAPIView):
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = GoalImportSerializer
+    parser_classes = [MultiPartParser]
+
+    def post(self, request: Request, *args, **kwargs) -> Response:
+        """ Загружает цели файла на доску (владелец/редактор доски), возвращает число целей и комментариев
+
+        При ошибках в строках ничего не загружается, ответ 400 содержит ошибки по номерам строк;
+        с dry_run=true строки только проверяются.
+        """
+
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        result = import_goals(
+            read_rows(data['file'], data['input']), data['board'].id, request.user, dry_run=data['dry_run'],
+        )
+        body = {'goals': result.goals, 'comments': result.comments, 'dry_run': data['dry_run']}
+        if result.errors:
+            return Response(body | {'errors': result.errors}, status=400)
+        return Response(body, status=200 if data['dry_run'] else 201)
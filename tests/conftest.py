@@ -1,4 +1,5 @@
 import pytest
+from django.core.cache import cache
 from rest_framework.test import APIClient
 
 pytest_plugins = 'tests.factories'
@@ -15,6 +16,22 @@ def auth_client(client, user):
     return client
 
 
+@pytest.fixture()
+def async_auth_client(async_client, user):
+    async_client.force_login(user)
+    return async_client
+
+
 @pytest.fixture()
 def another_user(user_factory):
     return user_factory.create()
+
+
+@pytest.fixture(autouse=True)
+def fast_password_hasher(settings):
+    settings.PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
@@ -0,0 +1,33 @@
+from unittest.mock import patch
+
+import factory
+import pytest
+from django.urls import reverse
+
+from bot.tg.client import TgClient
+from bot.urls import urlpatterns
+
+# (имя маршрута, метод, предельное число запросов к БД - вместе с загрузкой сессии и пользователя)
+ROUTES = [
+    ('bot-verify', 'patch', 5),
+]
+
+
+def test_all_routes_have_budget():
+    assert {pattern.name for pattern in urlpatterns} == {name for name, *_ in ROUTES}
+
+
+@pytest.mark.django_db()
+class TestQueryBudget:
+    @pytest.mark.parametrize('count', [1, 25])
+    @pytest.mark.parametrize('name, method, budget', ROUTES)
+    @patch.object(TgClient, 'send_message')
+    def test_query_budget(self, mocked_send_message, auth_client, tg_user_factory, django_assert_max_num_queries,
+                          name, method, budget, count):
+        tg_user_factory.create_batch(count, user=None, chat_id=factory.Sequence(lambda n: n + 1))
+        tg_user_factory.create(user=None, chat_id=10 ** 6, verification_code='code')
+
+        with django_assert_max_num_queries(budget):
+            response = getattr(auth_client, method)(reverse(f'bot.urls:{name}'), data={'verification_code': 'code'})
+
+        assert response.status_code < 400, response.data
@@ -0,0 +1,54 @@
+import factory
+import pytest
+from django.urls import reverse
+
+from core.urls import urlpatterns
+from tests.test_core.factories import LoginRequest, SignUpRequest
+
+PASSWORD = 'ffyyRwS!21QWE2!'
+
+# (имя маршрута, метод, предельное число запросов к БД - вместе с загрузкой сессии и пользователя)
+# изменение профиля включает запрос досок пользователя для сброса кэша ответов (goals/signals.py)
+ROUTES = [
+    ('signup', 'post', 4),
+    ('login', 'post', 9),
+    ('profile', 'get', 2),
+    ('profile', 'put', 6),
+    ('profile', 'delete', 4),
+    ('update_password', 'put', 4),
+]
+
+
+def test_all_routes_have_budget():
+    assert {pattern.name for pattern in urlpatterns} == {name for name, *_ in ROUTES}
+
+
+@pytest.mark.django_db()
+@pytest.mark.parametrize('user__password', [PASSWORD], ids=['user'])
+class TestQueryBudget:
+    @pytest.fixture()
+    def send(self, auth_client, user):
+        def _send(name: str, method: str):
+            """ Выполняет запрос method к маршруту name от пользователя user """
+
+            data = {
+                'signup': SignUpRequest.build(password=PASSWORD),
+                'login': LoginRequest.build(username=user.username, password=PASSWORD),
+                'profile': {'username': user.username, 'email': 'user@example.com'},
+                'update_password': {'old_password': PASSWORD, 'new_password': f'{PASSWORD}1'},
+            }
+            url = reverse(f'core:{name}')
+            if method == 'get':
+                return auth_client.get(url)
+            return getattr(auth_client, method)(url, data=data[name] if method != 'delete' else None, format='json')
+        return _send
+
+    @pytest.mark.parametrize('count', [1, 25])
+    @pytest.mark.parametrize('name, method, budget', ROUTES)
+    def test_query_budget(self, send, user_factory, django_assert_max_num_queries, name, method, budget, count):
+        user_factory.create_batch(count, username=factory.Sequence(lambda n: f'budget_user_{n}'))
+
+        with django_assert_max_num_queries(budget):
+            response = send(name, method)
+
+        assert response.status_code < 400, response.data
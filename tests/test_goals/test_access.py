@@ -0,0 +1,65 @@
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from goals.access import roles_cache_stats, user_board_roles, _roles_version
+from goals.models import BoardParticipant
+
+
+@pytest.mark.django_db()
+class TestBoardRolesCache:
+    @pytest.fixture(autouse=True)
+    def setup(self, board_participant, goal) -> None:
+        board_participant.role = BoardParticipant.Role.writer
+        board_participant.save(update_fields=['role'])
+        self.url = reverse('goals:goal_detail', kwargs={'pk': goal.pk})
+
+    def test_roles_loaded_once_across_requests(self, auth_client):
+        stats = roles_cache_stats.copy()
+
+        auth_client.get(self.url)
+        with CaptureQueriesContext(connection) as context:
+            response = auth_client.get(self.url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert not [query for query in context if 'goals_boardparticipant' in query['sql']]
+        assert roles_cache_stats['misses'] - stats['misses'] == 1
+        assert roles_cache_stats['hits'] - stats['hits'] == 1
+
+    def test_removed_participant_loses_access(self, auth_client, board_participant):
+        assert auth_client.get(self.url).status_code == status.HTTP_200_OK
+
+        board_participant.delete()
+
+        assert auth_client.get(self.url).status_code == status.HTTP_403_FORBIDDEN
+
+    def test_role_downgrade_through_board_update(self, client, auth_client, user, another_user, board,
+                                                 board_participant_factory):
+        board_participant_factory.create(board=board, user=another_user, role=BoardParticipant.Role.owner)
+        assert auth_client.patch(self.url, data={'title': 'Цель'}).status_code == status.HTTP_200_OK
+
+        client.force_login(another_user)
+        response = client.put(
+            reverse('goals:board_detail', kwargs={'pk': board.pk}),
+            data={'title': board.title, 'participants': [
+                {'user': user.username, 'role': BoardParticipant.Role.reader},
+            ]},
+            format='json',
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+        client.force_login(user)
+        assert client.patch(self.url, data={'title': 'Цель'}).status_code == status.HTTP_403_FORBIDDEN
+
+    def test_roles_read_before_revoke_are_not_used(self, user, board, board_participant):
+        # запрос, прочитавший роли до отзыва доступа, записывает их в кэш уже после сброса
+        stale_key = f'goals:board_roles:{user.id}:{_roles_version(user.id)}'
+        stale_roles = user_board_roles(user.id)
+
+        board_participant.delete()
+        cache.set(stale_key, stale_roles)
+
+        assert board.id not in user_board_roles(user.id)
@@ -0,0 +1,137 @@
+import warnings
+from functools import partial
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+
+from goals import export
+from goals.caching import response_cache_stats
+from goals.models import Goal
+
+
+@pytest.mark.django_db()
+@pytest.mark.usefixtures('board_participant', 'goals')
+class TestAsyncViews:
+    """ Асинхронные представления (маршруты ASGI-приложения) отвечают так же, как синхронные """
+
+    @pytest.fixture()
+    def goals(self, user, goal, goal_category, goal_factory, goal_comment_factory) -> list[Goal]:
+        goal_comment_factory.create_batch(3, goal=goal, user=user)
+        return [goal, *goal_factory.create_batch(4, category=goal_category, user=user)]
+
+    @pytest.fixture()
+    def async_request(self, async_auth_client):
+        def _request(method: str, url: str, **kwargs):
+            async def _send():
+                return await getattr(async_auth_client, method)(url, **kwargs)
+
+            with override_settings(ROOT_URLCONF='todolist.urls_asgi'):
+                return async_to_sync(_send)()
+        return _request
+
+    @pytest.fixture()
+    def assert_same(self, auth_client, async_request):
+        def _assert_same(url: str, data: dict = None):
+            expected = auth_client.get(url, data=data)
+            response = async_request('get', url, data=data)
+
+            assert response.status_code == expected.status_code
+            assert response.content == expected.content
+            assert response.get('ETag') == expected.get('ETag')
+            return response
+        return _assert_same
+
+    @pytest.mark.parametrize('data', [
+        None,
+        {'limit': 2, 'offset': 2},
+        {'limit': 2, 'cursor': '', 'ordering': '-created'},
+        {'status__in': '1,2', 'search': 'цель', 'fields': 'id,title'},
+        {'ordering': 'unknown_field', 'cursor': ''},
+    ])
+    def test_goal_list(self, assert_same, data):
+        assert_same(reverse('goals:goal_list'), data)
+
+    @pytest.mark.parametrize('data', [
+        {'limit': 2, 'cursor': ''},
+        {'limit': 2, 'cursor': '', 'ordering': 'title', 'fields': 'status'},
+    ])
+    def test_goal_list_next_cursor(self, assert_same, data):
+        response = assert_same(reverse('goals:goal_list'), data)
+
+        response = assert_same(response.json()['next'])
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_goal_detail(self, assert_same, async_request, goal):
+        response = assert_same(reverse('goals:goal_detail', kwargs={'pk': goal.id}))
+        assert_same(reverse('goals:goal_detail', kwargs={'pk': goal.id}), {'fields': 'id,title'})
+
+        response = async_request(
+            'get', reverse('goals:goal_detail', kwargs={'pk': goal.id}), headers={'If-None-Match': response['ETag']},
+        )
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_goal_detail_not_found(self, assert_same, another_user, board_factory, goal_factory):
+        assert_same(reverse('goals:goal_detail', kwargs={'pk': 0}))
+
+        foreign = goal_factory.create(category__board=board_factory.create(with_owner=another_user), user=another_user)
+        response = assert_same(reverse('goals:goal_detail', kwargs={'pk': foreign.id}))
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_goal_detail_update(self, async_request, goal):
+        response = async_request(
+            'patch', reverse('goals:goal_detail', kwargs={'pk': goal.id}),
+            data={'title': 'Новая'}, content_type='application/json',
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert Goal.objects.get(id=goal.id).title == 'Новая'
+
+    def test_category_list_cache(self, assert_same, async_request, goal_category):
+        response_cache_stats.clear()
+        assert_same(reverse('goals:category_list'), {'fields': 'id,title'})
+        response = async_request('get', reverse('goals:category_list'), data={'fields': 'id,title'})
+
+        assert response.json() == [{'id': goal_category.id, 'title': goal_category.title}]
+        assert response_cache_stats == {'misses': 1, 'hits': 2}
+
+    def test_comment_list(self, assert_same, goal):
+        assert_same(reverse('goals:comment_list'), {'goal': goal.id, 'limit': 2})
+
+    def test_not_authenticated(self, async_request, async_client):
+        async_client.logout()
+
+        response = async_request('get', reverse('goals:goal_list'))
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_export_streams(self, auth_client, async_auth_client, monkeypatch):
+        url = reverse('goals:goal_export')
+        ndjson_lines, produced = export.ndjson_lines, []
+
+        def lines(chunks):
+            for part in ndjson_lines(chunks):
+                produced.append(part)
+                yield part
+
+        monkeypatch.setattr(export, 'ndjson_lines', lines)
+        monkeypatch.setattr('goals.views.goals.export_response', partial(export.export_response, chunk_size=2))
+
+        async def _read():
+            response = await async_auth_client.get(url)
+            parts = response.__aiter__()
+            first = await parts.__anext__()
+            produced_before_rest = len(produced)
+            return response, [first, *[part async for part in parts]], produced_before_rest
+
+        # синхронный итератор Django собрал бы целиком с предупреждением
+        with override_settings(ROOT_URLCONF='todolist.urls_asgi'), warnings.catch_warnings():
+            warnings.simplefilter('error')
+            response, parts, produced_before_rest = async_to_sync(_read)()
+
+        assert response.is_async
+        assert produced_before_rest == 1
+        assert len(parts) == 3
+        assert b''.join(parts) == auth_client.get(url).getvalue()
@@ -0,0 +1,173 @@
+from datetime import timedelta
+from functools import partial
+
+import factory
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from goals.models import Board, BoardParticipant, Goal
+
+
+@pytest.mark.django_db()
+class TestBoardParticipantsUpdate:
+    @pytest.fixture(autouse=True)
+    def setup(self, board_participant, user_factory, board_participant_factory) -> None:
+        self.url = reverse('goals:board_detail', kwargs={'pk': board_participant.board_id})
+        self.users = user_factory.create_batch(3, username=factory.Sequence(lambda n: f'participant_{n}'))
+        for member in self.users[:2]:
+            board_participant_factory.create(board=board_participant.board, user=member,
+                                             role=BoardParticipant.Role.reader)
+
+    def put(self, client, roles: dict):
+        return client.put(self.url, data={'title': 'Доска', 'participants': [
+            {'user': member.username, 'role': role} for member, role in roles.items()
+        ]}, format='json')
+
+    @staticmethod
+    def current(board: Board) -> dict[int, tuple[int, int]]:
+        return dict((user_id, (pk, role)) for pk, user_id, role in BoardParticipant.objects.filter(
+            board=board,
+        ).values_list('id', 'user_id', 'role'))
+
+    def test_title_only_patch_does_not_touch_participants(self, auth_client):
+        with CaptureQueriesContext(connection) as context:
+            response = auth_client.patch(self.url, data={'title': 'Новое название'}, format='json')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.json()['participants']) == 3
+        assert not [query for query in context if 'goals_boardparticipant' in query['sql']
+                    and not query['sql'].startswith('SELECT')]
+
+    def test_diff(self, auth_client, user, board):
+        before = self.current(board)
+
+        response = self.put(auth_client, {
+            self.users[0]: BoardParticipant.Role.reader,
+            self.users[1]: BoardParticipant.Role.writer,
+            self.users[2]: BoardParticipant.Role.reader,
+        })
+
+        assert response.status_code == status.HTTP_200_OK
+        after = self.current(board)
+        assert after[user.id] == before[user.id]
+        assert after[self.users[0].id] == before[self.users[0].id]
+        assert after[self.users[1].id] == (before[self.users[1].id][0], BoardParticipant.Role.writer)
+        assert after[self.users[2].id][1] == BoardParticipant.Role.reader
+
+    def test_removed_participants(self, auth_client, user, board):
+        response = self.put(auth_client, {self.users[1]: BoardParticipant.Role.reader})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert set(self.current(board)) == {user.id, self.users[1].id}
+
+    def test_unchanged_list_writes_nothing(self, auth_client):
+        roles = {member: BoardParticipant.Role.reader for member in self.users[:2]}
+
+        with CaptureQueriesContext(connection) as context:
+            self.put(auth_client, roles)
+
+        assert not [query for query in context if 'goals_boardparticipant' in query['sql']
+                    and not query['sql'].startswith('SELECT')]
+
+    def test_constant_query_count(self, auth_client, user_factory):
+        members = user_factory.create_batch(50, username=factory.Sequence(lambda n: f'member_{n}'))
+        counts = []
+
+        for count in (1, 50):
+            cache.clear()
+            with CaptureQueriesContext(connection) as context:
+                response = self.put(auth_client, {
+                    member: BoardParticipant.Role.reader for member in [*self.users[:2], *members[:count]]
+                })
+            assert response.status_code == status.HTTP_200_OK
+            counts.append(len(context))
+
+        assert counts[0] == counts[1]
+
+    def test_concurrently_added_participant(self, auth_client, board, monkeypatch):
+        bulk_create = BoardParticipant.objects.bulk_create
+
+        def concurrent_bulk_create(objs, **kwargs):
+            # участника добавляет параллельный запрос после чтения текущих участников
+            BoardParticipant.objects.create(board=board, user=self.users[2], role=BoardParticipant.Role.writer)
+            return bulk_create(objs, **kwargs)
+
+        monkeypatch.setattr(BoardParticipant.objects, 'bulk_create', concurrent_bulk_create)
+        before = self.current(board)
+
+        response = self.put(auth_client, {member: BoardParticipant.Role.reader for member in self.users})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'participants' in response.json()
+        assert self.current(board) == before
+
+    def test_unknown_username_reported_per_item(self, auth_client):
+        response = auth_client.put(self.url, data={'title': 'Доска', 'participants': [
+            {'user': self.users[0].username, 'role': BoardParticipant.Role.reader},
+            {'user': 'no_such_user', 'role': BoardParticipant.Role.reader},
+        ]}, format='json')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        errors = response.json()['participants']
+        assert errors[0] == {}
+        assert 'user' in errors[1]
+
+
+@pytest.mark.django_db()
+@pytest.mark.parametrize('goal_category__title', ['Работа'], ids=['category'])
+class TestBoardStatsView:
+    @pytest.fixture(autouse=True)
+    def setup(self, board_participant, goal_category, user, another_user, board_factory, goal_category_factory,
+              goal_factory, goal_comment_factory) -> None:
+        self.url = reverse('goals:board_stats', kwargs={'pk': goal_category.board_id})
+        self.other_category = goal_category_factory.create(board=goal_category.board, user=user, title='Дом')
+        yesterday = timezone.localdate() - timedelta(days=1)
+
+        create = partial(goal_factory.create, category=goal_category, user=user, priority=Goal.Priority.medium,
+                         due_date=None)
+        goals = [
+            create(status=Goal.Status.to_do, due_date=yesterday),
+            create(status=Goal.Status.done, due_date=yesterday),
+            create(status=Goal.Status.in_progress, priority=Goal.Priority.high),
+            create(status=Goal.Status.archived),
+            create(category=self.other_category, status=Goal.Status.to_do),
+        ]
+        goal_comment_factory.create_batch(2, goal=goals[0], user=user)
+        goal_comment_factory.create(goal=goals[4], user=user)
+        goal_factory.create(category__board=board_factory.create(with_owner=another_user), user=another_user)
+
+    def test_stats(self, auth_client, goal_category):
+        response = auth_client.get(self.url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {
+            'goals': 4,
+            'overdue': 1,
+            'comments': 3,
+            'status': {'to_do': 2, 'in_progress': 1, 'done': 1},
+            'priority': {'low': 0, 'medium': 3, 'high': 1, 'critical': 0},
+            'categories': [
+                {'id': self.other_category.id, 'title': 'Дом', 'goals': 1, 'overdue': 0, 'comments': 1},
+                {'id': goal_category.id, 'title': 'Работа', 'goals': 3, 'overdue': 1, 'comments': 2},
+            ],
+        }
+
+    def test_cached(self, auth_client, settings, goal_category, goal_factory, user):
+        settings.BOARD_STATS_CACHE_TIMEOUT = 30
+        auth_client.get(self.url)
+        goal_factory.create(category=goal_category, user=user, status=Goal.Status.to_do)
+
+        assert auth_client.get(self.url).json()['goals'] == 4
+
+        settings.BOARD_STATS_CACHE_TIMEOUT = 0
+        assert auth_client.get(self.url).json()['goals'] == 5
+
+    def test_not_participant(self, client, another_user):
+        client.force_login(another_user)
+
+        assert client.get(self.url).status_code == status.HTTP_403_FORBIDDEN
@@ -0,0 +1,158 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from goals.caching import response_cache_stats
+from goals.models import BoardParticipant
+from todolist.cache import BoundedLocMemCache
+
+
+@pytest.mark.django_db()
+@pytest.mark.usefixtures('board_participant', 'goal_category')
+class TestListResponseCache:
+
+    @pytest.mark.parametrize('name', ['board_list', 'category_list'])
+    def test_repeated_list_served_from_cache(self, auth_client, name):
+        url = reverse(f'goals:{name}')
+        stats = response_cache_stats.copy()
+        expected = auth_client.get(url).json()
+
+        with CaptureQueriesContext(connection) as context:
+            response = auth_client.get(url)
+
+        assert response.json() == expected
+        assert not [query for query in context if 'goals_' in query['sql']]
+        assert response_cache_stats['hits'] - stats['hits'] == 1
+
+    def test_cached_list_not_modified(self, auth_client):
+        url = reverse('goals:board_list')
+        etag = auth_client.get(url)['ETag']
+
+        response = auth_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_board_update(self, auth_client, board):
+        url = reverse('goals:board_list')
+        auth_client.get(url)
+
+        auth_client.patch(reverse('goals:board_detail', kwargs={'pk': board.pk}), data={'title': 'Новая'})
+
+        assert auth_client.get(url).json()[0]['title'] == 'Новая'
+
+    def test_board_delete(self, auth_client, board):
+        auth_client.get(reverse('goals:board_list'))
+        auth_client.get(reverse('goals:category_list'))
+
+        auth_client.delete(reverse('goals:board_detail', kwargs={'pk': board.pk}))
+
+        assert auth_client.get(reverse('goals:board_list')).json() == []
+        assert auth_client.get(reverse('goals:category_list')).json() == []
+
+    def test_category_created(self, auth_client, board, goal_category_factory):
+        url = reverse('goals:category_list')
+        auth_client.get(url)
+
+        goal_category_factory.create(board=board)
+
+        assert len(auth_client.get(url).json()) == 2
+
+    def test_category_moved_to_another_board(self, auth_client, goal_category, another_user, board_factory):
+        other_board = board_factory.create(with_owner=another_user)
+        other_client = APIClient()
+        other_client.force_login(another_user)
+        url = reverse('goals:category_list')
+        auth_client.get(url)
+        other_client.get(url)
+
+        goal_category.board = other_board
+        goal_category.save()
+
+        assert auth_client.get(url).json() == []
+        assert len(other_client.get(url).json()) == 1
+
+    def test_participant_added(self, auth_client, board, another_user):
+        other_client = APIClient()
+        other_client.force_login(another_user)
+        assert other_client.get(reverse('goals:board_list')).json() == []
+
+        auth_client.put(
+            reverse('goals:board_detail', kwargs={'pk': board.pk}),
+            data={'title': board.title, 'participants': [
+                {'user': another_user.username, 'role': BoardParticipant.Role.reader},
+            ]},
+            format='json',
+        )
+
+        assert len(other_client.get(reverse('goals:board_list')).json()) == 1
+
+    def test_author_profile_update(self, auth_client, board, another_user, goal_category_factory):
+        goal_category_factory.create(board=board, user=another_user)
+        url = reverse('goals:category_list')
+        auth_client.get(url)
+
+        another_user.username = 'renamed_author'
+        another_user.save()
+
+        assert 'renamed_author' in [category['user']['username'] for category in auth_client.get(url).json()]
+
+    def test_last_login_keeps_cache(self, auth_client, user):
+        url = reverse('goals:category_list')
+        auth_client.get(url)
+        stats = response_cache_stats.copy()
+
+        # вход обновляет только last_login, выдаваемые поля не меняются
+        user.save(update_fields=['last_login'])
+        auth_client.get(url)
+
+        assert response_cache_stats['hits'] - stats['hits'] == 1
+
+
+class TestBoundedLocMemCache:
+    @pytest.fixture()
+    def cache(self):
+        cache = BoundedLocMemCache('test-bounded', {'OPTIONS': {'MAX_ENTRIES': 3, 'MAX_BYTES': 1000}})
+        cache.clear()
+        return cache
+
+    def test_evicts_least_recently_used_by_entries(self, cache):
+        cache.set_many({'a': 1, 'b': 2, 'c': 3})
+        cache.get('a')
+
+        cache.set('d', 4)
+
+        assert cache.get_many(['a', 'b', 'c', 'd']) == {'a': 1, 'c': 3, 'd': 4}
+
+    def test_evicts_least_recently_used_by_size(self, cache):
+        cache.set('a', 'x' * 400)
+        cache.set('b', 'x' * 400)
+        cache.get('a')
+
+        cache.set('c', 'x' * 400)
+
+        assert set(cache.get_many(['a', 'b', 'c'])) == {'a', 'c'}
+        assert cache.size <= 1000
+
+    def test_value_larger_than_limit_not_stored(self, cache):
+        cache.set('a', 1)
+
+        cache.set('b', 'x' * 2000)
+
+        assert cache.get('b') is None
+        assert cache.get('a') == 1
+
+    def test_size_tracks_overwrite_delete_and_clear(self, cache):
+        cache.set('a', 'x' * 100)
+        size = cache.size
+        cache.set('a', 'x' * 100)
+        assert cache.size == size
+
+        cache.delete('a')
+        assert cache.size == 0
+
+        cache.set('b', 1)
+        cache.clear()
+        assert cache.size == 0
@@ -0,0 +1,61 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+
+from goals.cascade import archive_pending_goals, pending_goals
+from goals.models import Goal, GoalCategory
+
+
+@pytest.mark.django_db()
+@pytest.mark.usefixtures('board_participant', 'goals')
+class TestDeleteCascade:
+    @pytest.fixture()
+    def goals(self, goal_category, goal_factory) -> list[Goal]:
+        return goal_factory.create_batch(5, category=goal_category, user=goal_category.user, status=Goal.Status.to_do)
+
+    def test_board_delete_defers_goal_archiving(self, auth_client, board, goal_category, goals):
+        response = auth_client.delete(reverse('goals:board_detail', kwargs={'pk': board.pk}))
+
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        goal_category.refresh_from_db()
+        assert goal_category.is_deleted is True
+        assert pending_goals().count() == 5
+        assert auth_client.get(reverse('goals:goal_list')).json() == []
+        assert auth_client.get(
+            reverse('goals:goal_detail', kwargs={'pk': goals[0].pk}),
+        ).status_code == status.HTTP_404_NOT_FOUND
+
+        assert archive_pending_goals() == 5
+        assert not Goal.objects.exclude(status=Goal.Status.archived).exists()
+
+    def test_archiving_in_chunks_and_restart(self, auth_client, goal_category):
+        auth_client.delete(reverse('goals:category_detail', kwargs={'pk': goal_category.pk}))
+        progress = []
+
+        assert archive_pending_goals(chunk_size=2, progress=lambda *args: progress.append(args)) == 5
+        assert progress == [(2, 5), (4, 5), (5, 5)]
+        assert archive_pending_goals(chunk_size=2) == 0
+
+    def test_live_categories_not_affected(self, user, board, goal_category, goal_category_factory, goal_factory):
+        goal = goal_factory.create(
+            category=goal_category_factory.create(board=board, user=user), user=user, status=Goal.Status.to_do,
+        )
+        GoalCategory.objects.filter(pk=goal_category.pk).update(is_deleted=True)
+
+        archive_pending_goals()
+
+        goal.refresh_from_db()
+        assert goal.status != Goal.Status.archived
+
+    def test_command(self, goal_category):
+        GoalCategory.objects.filter(pk=goal_category.pk).update(is_deleted=True)
+        out = StringIO()
+
+        call_command('archive_deleted_goals', '--chunk-size', '3', stdout=out)
+
+        assert 'Archived 3/5 goals' in out.getvalue()
+        assert 'Archived 5 goals' in out.getvalue()
+        assert not pending_goals().exists()
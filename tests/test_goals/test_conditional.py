@@ -0,0 +1,107 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from goals.models import BoardParticipant
+
+
+@pytest.mark.django_db()
+@pytest.mark.usefixtures('board_participant', 'goal')
+class TestConditionalGet:
+
+    @pytest.mark.parametrize('name', ['board_list', 'category_list', 'goal_list', 'comment_list'])
+    def test_list_not_modified(self, auth_client, django_assert_max_num_queries, name):
+        url = reverse(f'goals:{name}')
+        etag = auth_client.get(url)['ETag']
+
+        with django_assert_max_num_queries(3):
+            response = auth_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response['ETag'] == etag
+        assert not response.content
+
+    def test_list_etag_depends_on_query(self, auth_client):
+        url = reverse('goals:goal_list')
+        etag = auth_client.get(url)['ETag']
+
+        response = auth_client.get(url, {'ordering': '-created'}, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_list_modified_after_update(self, auth_client, goal):
+        url = reverse('goals:goal_list')
+        etag = auth_client.get(url)['ETag']
+
+        auth_client.patch(reverse('goals:goal_detail', kwargs={'pk': goal.pk}), data={'title': 'Новая'})
+        response = auth_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response['ETag'] != etag
+
+    def test_list_modified_after_delete(self, auth_client, goal_category):
+        url = reverse('goals:goal_list')
+        etag = auth_client.get(url)['ETag']
+
+        auth_client.delete(reverse('goals:category_detail', kwargs={'pk': goal_category.pk}))
+        response = auth_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == []
+
+    def test_list_ignores_if_modified_since(self, auth_client, user, goal_category, goal, goal_factory):
+        goal_factory.create(category=goal_category, user=user)
+        url = reverse('goals:goal_list')
+        assert 'Last-Modified' not in auth_client.get(url)
+
+        # удаленная цель не сдвигает max(updated) оставшихся целей
+        auth_client.delete(reverse('goals:goal_detail', kwargs={'pk': goal.pk}))
+        response = auth_client.get(url, HTTP_IF_MODIFIED_SINCE='Fri, 01 Jan 2100 00:00:00 GMT')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.json()) == 1
+
+    def test_detail_not_modified(self, auth_client, goal):
+        url = reverse('goals:goal_detail', kwargs={'pk': goal.pk})
+        response = auth_client.get(url)
+
+        assert auth_client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code == status.HTTP_304_NOT_MODIFIED
+        assert auth_client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'],
+        ).status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_board_detail_modified_by_participants(self, auth_client, board, another_user, board_participant_factory):
+        url = reverse('goals:board_detail', kwargs={'pk': board.pk})
+        etag = auth_client.get(url)['ETag']
+
+        board_participant_factory.create(board=board, user=another_user, role=BoardParticipant.Role.reader)
+        response = auth_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.json()['participants']) == 2
+
+    def test_board_detail_modified_by_removed_participant(self, auth_client, board, another_user,
+                                                          board_participant_factory):
+        board_participant_factory.create(board=board, user=another_user, role=BoardParticipant.Role.reader)
+        url = reverse('goals:board_detail', kwargs={'pk': board.pk})
+        etag = auth_client.get(url)['ETag']
+
+        BoardParticipant.objects.filter(board=board, user=another_user).delete()
+        response = auth_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.json()['participants']) == 1
+
+    @pytest.mark.parametrize('name', [
+        'category_list', 'goal_list', 'comment_list', 'goal_detail', 'category_detail', 'board_detail',
+    ])
+    def test_modified_by_profile_update(self, auth_client, user, board, goal_category, goal, goal_comment, name):
+        objects = {'goal_detail': goal, 'category_detail': goal_category, 'board_detail': board}
+        url = reverse(f'goals:{name}', kwargs={'pk': objects[name].pk} if name in objects else None)
+        etag = auth_client.get(url)['ETag']
+
+        auth_client.put(reverse('core:profile'), data={'username': 'renamed_user', 'email': user.email})
+        response = auth_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert 'renamed_user' in response.content.decode()
@@ -0,0 +1,118 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+
+from goals.cascade import archive_pending_goals
+from goals.models import Board, BoardParticipant, Goal, GoalCategory
+from tests.test_goals.factories import CreateGoalCommentRequest, CreateGoalRequest
+
+
+@pytest.mark.django_db()
+@pytest.mark.usefixtures('board_participant')
+class TestCounters:
+    @pytest.fixture()
+    def other_category(self, board, user, goal_category_factory) -> GoalCategory:
+        return goal_category_factory.create(board=board, user=user)
+
+    def counters(self, category: GoalCategory) -> tuple[int, int, int]:
+        category.refresh_from_db()
+        return category.goals_to_do, category.goals_in_progress, category.goals_done
+
+    def test_goal_create_update_delete(self, auth_client, goal_category, other_category):
+        data = CreateGoalRequest.build(category=goal_category.pk)
+        response = auth_client.post(reverse('goals:create_goal'), data=data)
+        url = reverse('goals:goal_detail', kwargs={'pk': response.json()['id']})
+        assert self.counters(goal_category) == (1, 0, 0)
+
+        auth_client.patch(url, data={'status': Goal.Status.done})
+        assert self.counters(goal_category) == (0, 0, 1)
+
+        auth_client.patch(url, data={'category': other_category.pk, 'status': Goal.Status.in_progress})
+        assert self.counters(goal_category) == (0, 0, 0)
+        assert self.counters(other_category) == (0, 1, 0)
+
+        auth_client.delete(url)
+        assert self.counters(other_category) == (0, 0, 0)
+
+    def test_category_counters_in_response(self, auth_client, user, goal_category, goal_factory):
+        goal_factory.create_batch(2, category=goal_category, user=user, status=Goal.Status.in_progress)
+
+        response = auth_client.get(reverse('goals:category_detail', kwargs={'pk': goal_category.pk}))
+
+        assert response.json()['goals_in_progress'] == 2
+
+    def test_batch_and_transition(self, auth_client, goal_category, other_category, goal):
+        auth_client.post(reverse('goals:goal_batch'), data=[
+            CreateGoalRequest.build(category=goal_category.pk),
+            {'id': goal.pk, 'category': other_category.pk},
+        ], format='json')
+        assert self.counters(goal_category) == (1, 0, 0)
+        assert self.counters(other_category) == (1, 0, 0)
+
+        response = auth_client.post(reverse('goals:goal_transition'), data={
+            'filter': {'category__in': f'{goal_category.pk},{other_category.pk}'}, 'status': Goal.Status.done,
+        }, format='json')
+        assert response.json() == {'updated': 2}
+        assert self.counters(goal_category) == (0, 0, 1)
+        assert self.counters(other_category) == (0, 0, 1)
+
+    def test_archive_deleted_category(self, auth_client, user, goal_category, goal_factory):
+        goal_factory.create_batch(3, category=goal_category, user=user, status=Goal.Status.to_do)
+
+        auth_client.delete(reverse('goals:category_detail', kwargs={'pk': goal_category.pk}))
+        archive_pending_goals(chunk_size=2)
+
+        assert self.counters(goal_category) == (0, 0, 0)
+
+    def test_comments(self, auth_client, goal):
+        response = auth_client.post(reverse('goals:create_comment'), data=CreateGoalCommentRequest.build(goal=goal.pk))
+        auth_client.post(reverse('goals:create_comment'), data=CreateGoalCommentRequest.build(goal=goal.pk))
+        assert auth_client.get(reverse('goals:goal_detail', kwargs={'pk': goal.pk})).json()['comments_count'] == 2
+
+        auth_client.delete(reverse('goals:comment_detail', kwargs={'pk': response.json()['id']}))
+        goal.refresh_from_db()
+        assert goal.comments_count == 1
+
+    def test_participants(self, auth_client, board, another_user, user_factory):
+        third_user = user_factory.create()
+        url = reverse('goals:board_detail', kwargs={'pk': board.pk})
+        participants = [
+            {'user': another_user.username, 'role': BoardParticipant.Role.writer},
+            {'user': third_user.username, 'role': BoardParticipant.Role.reader},
+        ]
+
+        auth_client.put(url, data={'title': 'Доска', 'participants': participants}, format='json')
+        board.refresh_from_db()
+        assert board.participants_count == 2
+
+        auth_client.put(url, data={'title': 'Доска', 'participants': participants[:1]}, format='json')
+        board.refresh_from_db()
+        assert board.participants_count == 1
+
+    def test_save_does_not_overwrite_counters(self, user, goal_category, goal_factory):
+        goal_factory.create(category=goal_category, user=user, status=Goal.Status.to_do)
+
+        goal_category.title = 'Новое название'
+        goal_category.save()
+
+        assert self.counters(goal_category) == (1, 0, 0)
+
+    def test_repair_command(self, user, board, goal_category, other_category, goal_factory, goal_comment_factory):
+        goal = goal_factory.create(category=goal_category, user=user, status=Goal.Status.done)
+        goal_comment_factory.create(goal=goal, user=user)
+        GoalCategory.objects.update(goals_done=5, goals_to_do=3)
+        Goal.objects.update(comments_count=0)
+        Board.objects.update(participants_count=7)
+        out = StringIO()
+
+        call_command('repair_counters', '--chunk-size', '1', stdout=out)
+
+        assert self.counters(goal_category) == (0, 0, 1)
+        assert self.counters(other_category) == (0, 0, 0)
+        goal.refresh_from_db()
+        assert goal.comments_count == 1
+        board.refresh_from_db()
+        assert board.participants_count == 0
+        assert 'Counters repaired' in out.getvalue()
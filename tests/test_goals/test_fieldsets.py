@@ -0,0 +1,108 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+
+@pytest.mark.django_db()
+@pytest.mark.usefixtures('board_participant', 'goal')
+class TestSparseFields:
+
+    def get(self, client, url: str, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url, data=params)
+        sql = [query['sql'] for query in queries if 'goals_' in query['sql'] and 'django_session' not in query['sql']]
+        return response, sql
+
+    def test_goal_list_fields(self, auth_client, goal):
+        response, sql = self.get(auth_client, reverse('goals:goal_list'), fields='id,title,status,due_date')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == [{
+            'id': goal.id, 'title': goal.title, 'due_date': None, 'status': goal.status,
+        }]
+        page = sql[-1]
+        assert '"description"' not in page and 'core_user' not in page
+
+    @pytest.mark.parametrize('ordering, fields', [
+        ('created', 'id,status'),
+        ('-title', 'status'),
+        ('-created', 'title'),
+    ])
+    def test_goal_list_cursor_with_fields(self, auth_client, goal_category, goal, goal_factory, ordering, fields):
+        goals = [goal, *goal_factory.create_batch(4, category=goal_category, user=goal.user)]
+        expected = sorted(goals, key=lambda item: (getattr(item, ordering.lstrip('-')), item.id),
+                          reverse=ordering.startswith('-'))
+
+        results, url, params = [], reverse('goals:goal_list'), {'cursor': '', 'limit': 2, 'ordering': ordering,
+                                                                'fields': fields}
+        while url:
+            response = auth_client.get(url, data=params)
+            assert response.status_code == status.HTTP_200_OK
+            results += response.json()['results']
+            url, params = response.json()['next'], None
+
+        assert results == [{name: getattr(item, name) for name in fields.split(',')} for item in expected]
+
+    def test_goal_list_exclude(self, auth_client):
+        response, _ = self.get(auth_client, reverse('goals:goal_list'), exclude='description,user')
+
+        assert set(response.json()[0]) == {
+            'id', 'created', 'updated', 'title', 'due_date', 'status', 'priority', 'comments_count', 'category',
+        }
+
+    def test_goal_detail_fields(self, auth_client, goal):
+        url = reverse('goals:goal_detail', kwargs={'pk': goal.id})
+
+        response, sql = self.get(auth_client, url, fields='title,user')
+
+        assert response.json() == {'title': goal.title, 'user': {
+            'id': goal.user.id, 'username': goal.user.username, 'first_name': goal.user.first_name,
+            'last_name': goal.user.last_name, 'email': goal.user.email,
+        }}
+        detail = next(query for query in sql if query.startswith('SELECT "goals_goal"'))
+        assert '"description"' not in detail and '"core_user"."password"' not in detail
+
+    def test_detail_etag_depends_on_fields(self, auth_client, goal):
+        url = reverse('goals:goal_detail', kwargs={'pk': goal.id})
+
+        assert auth_client.get(url, {'fields': 'id'})['ETag'] != auth_client.get(url)['ETag']
+
+    def test_update_ignores_fields(self, auth_client, goal):
+        url = reverse('goals:goal_detail', kwargs={'pk': goal.id})
+
+        response = auth_client.patch(f'{url}?fields=id', data={'title': 'Новая'})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()['title'] == 'Новая'
+        assert 'description' in response.json()
+
+    def test_category_list(self, auth_client, goal_category):
+        response, sql = self.get(auth_client, reverse('goals:category_list'), fields='id,title')
+
+        assert response.json() == [{'id': goal_category.id, 'title': goal_category.title}]
+        assert 'core_user' not in sql[-1]
+
+    def test_board_detail_without_participants(self, auth_client, board):
+        url = reverse('goals:board_detail', kwargs={'pk': board.id})
+
+        response, sql = self.get(auth_client, url, exclude='participants')
+
+        assert response.json() == {
+            'id': board.id, 'created': response.json()['created'], 'updated': response.json()['updated'],
+            'title': board.title, 'is_deleted': False,
+        }
+        assert not any('goals_boardparticipant"."created' in query for query in sql)
+
+    def test_board_list(self, auth_client, board):
+        response, _ = self.get(auth_client, reverse('goals:board_list'), fields='id,title')
+
+        assert response.json() == [{'id': board.id, 'title': board.title}]
+
+    @pytest.mark.parametrize('param', ['fields', 'exclude'])
+    def test_unknown_field(self, auth_client, param):
+        response, _ = self.get(auth_client, reverse('goals:goal_list'), **{param: 'title,password'})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json() == {param: ['Unknown fields: password']}
@@ -55,6 +55,50 @@ class TestCreateGoalCategoryView:
         assert GoalCategory.objects.last().is_deleted is False
 
 
+@pytest.mark.django_db()
+class TestGoalCategorySearch:
+    url = reverse('goals:category_list')
+
+    @pytest.fixture(autouse=True)
+    def setup(self, board_participant, board, user, goal_category_factory) -> None:
+        self.create_category = lambda title: goal_category_factory.create(board=board, user=user, title=title)
+
+    def test_search_by_substring(self, auth_client):
+        budget = self.create_category('Годовой бюджет')
+        self.create_category('Отпуск')
+
+        response = auth_client.get(self.url, data={'search': 'бюдж'})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [category['id'] for category in response.json()] == [budget.id]
+
+    def test_similar_titles_ranked_first(self, auth_client):
+        similar = self.create_category('Релизы')
+        exact = self.create_category('Релиз')
+        self.create_category('Отпуск')
+
+        response = auth_client.get(self.url, data={'search': 'релиз'})
+
+        assert [category['id'] for category in response.json()] == [exact.id, similar.id]
+
+    def test_search_tolerates_typos(self, auth_client):
+        release = self.create_category('Подготовка релиза')
+
+        response = auth_client.get(self.url, data={'search': 'подготвка'})
+
+        assert [category['id'] for category in response.json()] == [release.id]
+
+    def test_admin_search(self, client, board, user_factory, goal_category_factory):
+        client.force_login(user_factory.create(is_staff=True, is_superuser=True))
+        exact = self.create_category('Релиз')
+        similar = self.create_category('Релизы весной')
+
+        response = client.get(reverse('admin:goals_goalcategory_changelist'), data={'q': 'релиз'})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert list(response.context['cl'].result_list) == [exact, similar]
+
+
 def _serialize_response(goal_category: GoalCategory, **kwargs) -> dict:
     data = {
         'id': goal_category.id,
@@ -62,7 +106,10 @@ def _serialize_response(goal_category: GoalCategory, **kwargs) -> dict:
         'updated': DateTimeField().to_representation(goal_category.updated),
         'title': goal_category.title,
         'is_deleted': goal_category.is_deleted,
-        'board': goal_category.board.id
+        'board': goal_category.board.id,
+        'goals_to_do': goal_category.goals_to_do,
+        'goals_in_progress': goal_category.goals_in_progress,
+        'goals_done': goal_category.goals_done,
     }
 
     return data | kwargs
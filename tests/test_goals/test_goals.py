@@ -1,8 +1,14 @@
+import base64
+import csv
+import io
+import json
+
 import pytest
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.fields import DateTimeField
 
+from goals.export import GOAL_FIELDS, goal_chunks
 from goals.models import BoardParticipant, Goal
 from tests.test_goals.factories import CreateGoalRequest
 
@@ -81,6 +87,360 @@ def _serialize_response(goal: Goal, **kwargs) -> dict:
         'description': goal.description,
         'due_date': DateTimeField().to_representation(goal.due_date),
         'status': goal.status,
-        'priority': goal.priority
+        'priority': goal.priority,
+        'comments_count': goal.comments_count,
     }
     return data | kwargs
+
+
+@pytest.mark.django_db()
+class TestUpdateGoalView:
+
+    @pytest.fixture(autouse=True)
+    def setup(self, goal, board_participant, user) -> None:
+        self.url = reverse('goals:goal_detail', kwargs={'pk': goal.pk})
+
+    def test_goal_moved_to_another_board(self, auth_client, goal, user, goal_comment_factory, goal_category_factory,
+                                         board_factory):
+        comment = goal_comment_factory.create(goal=goal, user=user)
+        new_category = goal_category_factory.create(board=board_factory.create(with_owner=user), user=user)
+
+        response = auth_client.patch(self.url, data={'category': new_category.id})
+
+        assert response.status_code == status.HTTP_200_OK
+        goal.refresh_from_db()
+        comment.refresh_from_db()
+        assert goal.board_id == new_category.board_id
+        assert comment.board_id == new_category.board_id
+
+    def test_category_moved_to_another_board(self, goal, goal_category, goal_comment_factory, board_factory):
+        comment = goal_comment_factory.create(goal=goal)
+        goal_category.board = board_factory.create()
+        goal_category.save()
+
+        goal.refresh_from_db()
+        comment.refresh_from_db()
+        assert goal.board_id == goal_category.board_id
+        assert comment.board_id == goal_category.board_id
+
+
+@pytest.mark.django_db()
+class TestGoalListView:
+    url = reverse('goals:goal_list')
+
+    @pytest.fixture(autouse=True)
+    def setup(self, board_participant, goal_category, goal_factory) -> None:
+        self.goals = [
+            goal_factory.create(category=goal_category, user=goal_category.user, title=title)
+            for title in ['b', 'a', 'b', 'c', 'a', 'b']
+        ]
+
+    def test_limit_offset_by_default(self, auth_client):
+        response = auth_client.get(self.url, data={'limit': 2})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()['count'] == len(self.goals)
+
+    @pytest.mark.parametrize('ordering', ['title', '-title', 'created', '-created'])
+    def test_cursor_pages_follow_ordering(self, auth_client, ordering):
+        field = ordering.lstrip('-')
+        expected = sorted(self.goals, key=lambda goal: (getattr(goal, field), goal.id), reverse=ordering[0] == '-')
+
+        ids, url, params = [], self.url, {'cursor': '', 'limit': 4, 'ordering': ordering}
+        while url:
+            response = auth_client.get(url, data=params)
+            assert response.status_code == status.HTTP_200_OK
+            assert 'count' not in response.json()
+            ids += [goal['id'] for goal in response.json()['results']]
+            url, params = response.json()['next'], None
+
+        assert ids == [goal.id for goal in expected]
+
+    @pytest.mark.parametrize('ordering, key', [
+        ('created', None),
+        ('created', ['garbage', 1]),
+        ('created', [None, 1]),
+        ('-title', ['a', 'garbage']),
+        ('title', {'title': 'a'}),
+    ])
+    def test_invalid_cursor(self, auth_client, ordering, key):
+        cursor = 'invalid' if key is None else base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+        response = auth_client.get(self.url, data={'cursor': cursor, 'ordering': ordering})
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db()
+class TestGoalSearch:
+    url = reverse('goals:goal_list')
+
+    @pytest.fixture(autouse=True)
+    def setup(self, board_participant, goal_category, goal_factory) -> None:
+        self.create_goal = lambda **kwargs: goal_factory.create(category=goal_category, user=goal_category.user, **kwargs)
+
+    def test_search_matches_word_forms(self, auth_client):
+        report = self.create_goal(title='Годовой отчет')
+        self.create_goal(title='Встреча с клиентом')
+
+        response = auth_client.get(self.url, data={'search': 'отчеты'})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [goal['id'] for goal in response.json()] == [report.id]
+
+    def test_results_ranked_by_relevance(self, auth_client):
+        mentioned = self.create_goal(title='А: план', description='обсудить релиз')
+        relevant = self.create_goal(title='Б: релиз', description='подготовить релиз к выпуску')
+
+        response = auth_client.get(self.url, data={'search': 'релиз'})
+
+        assert [goal['id'] for goal in response.json()] == [relevant.id, mentioned.id]
+
+    def test_explicit_ordering_kept(self, auth_client):
+        first = self.create_goal(title='А: план', description='обсудить релиз')
+        second = self.create_goal(title='Б: релиз', description='подготовить релиз к выпуску')
+
+        response = auth_client.get(self.url, data={'search': 'релиз', 'ordering': 'title'})
+
+        assert [goal['id'] for goal in response.json()] == [first.id, second.id]
+
+    def test_goals_of_other_boards_not_found(self, auth_client, goal_factory):
+        goal_factory.create(title='Годовой отчет')
+
+        response = auth_client.get(self.url, data={'search': 'отчет'})
+
+        assert response.json() == []
+
+
+@pytest.fixture()
+def reader_goal(user, another_user, board_factory, board_participant_factory, goal_factory):
+    # цель чужой доски, на которой пользователь - читатель
+    board = board_factory.create(with_owner=another_user)
+    board_participant_factory.create(board=board, user=user, role=BoardParticipant.Role.reader)
+    return goal_factory.create(category__board=board, category__user=another_user, user=another_user)
+
+
+@pytest.mark.django_db()
+@pytest.mark.usefixtures('board_participant')
+class TestGoalBatchView:
+    url = reverse('goals:goal_batch')
+
+    def test_per_item_results(self, auth_client, goal_category, goal, reader_goal):
+        new_goal = CreateGoalRequest.build(category=goal_category.id)
+
+        response = auth_client.post(self.url, data=[
+            new_goal,
+            {'id': goal.id, 'status': Goal.Status.done},
+            CreateGoalRequest.build(category=reader_goal.category_id),
+            {'id': reader_goal.id, 'priority': Goal.Priority.high},
+            {'id': 0, 'title': 'Нет такой цели'},
+            {'category': goal_category.id},
+        ], format='json')
+
+        assert response.status_code == status.HTTP_200_OK
+        results = response.json()
+        assert [result['status'] for result in results] == [201, 200, 403, 403, 404, 400]
+        assert results[0]['data']['title'] == new_goal['title']
+        assert results[1]['data']['status'] == Goal.Status.done
+        assert 'title' in results[5]['errors']
+        assert Goal.objects.filter(category=goal_category).count() == 2
+        goal.refresh_from_db()
+        assert goal.status == Goal.Status.done
+        assert goal.updated > goal.created
+
+    def test_move_goal_to_another_board(self, auth_client, user, goal, goal_comment, board_factory,
+                                        goal_category_factory):
+        category = goal_category_factory.create(board=board_factory.create(with_owner=user), user=user)
+
+        response = auth_client.post(self.url, data=[{'id': goal.id, 'category': category.id}], format='json')
+
+        assert response.json()[0]['status'] == status.HTTP_200_OK
+        goal.refresh_from_db()
+        goal_comment.refresh_from_db()
+        assert goal.board_id == goal_comment.board_id == category.board_id
+
+    @pytest.mark.parametrize('count', [1, 100])
+    def test_queries_do_not_depend_on_batch_size(self, auth_client, goal_category, goal_factory,
+                                                 django_assert_max_num_queries, count):
+        goals = goal_factory.create_batch(count, category=goal_category, user=goal_category.user)
+        data = CreateGoalRequest.build_batch(count, category=goal_category.id)
+        data += [{'id': goal.id, 'priority': Goal.Priority.critical} for goal in goals]
+
+        with django_assert_max_num_queries(10):
+            response = auth_client.post(self.url, data=data, format='json')
+
+        assert {result['status'] for result in response.json()} == {201, 200}
+
+    def test_list_required(self, auth_client):
+        response = auth_client.post(self.url, data=CreateGoalRequest.build(), format='json')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db()
+@pytest.mark.usefixtures('board_participant')
+class TestGoalTransitionView:
+    url = reverse('goals:goal_transition')
+
+    @pytest.fixture()
+    def goals(self, goal_category, goal_factory) -> list[Goal]:
+        return goal_factory.create_batch(3, category=goal_category, user=goal_category.user, status=Goal.Status.to_do)
+
+    def test_transition_by_ids(self, auth_client, goals, reader_goal):
+        ids = [goal.id for goal in goals[:2]] + [reader_goal.id]
+
+        response = auth_client.post(self.url, data={'ids': ids, 'status': Goal.Status.done}, format='json')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {'updated': 2, 'not_updated': [reader_goal.id]}
+        assert Goal.objects.filter(status=Goal.Status.done).count() == 2
+        reader_goal.refresh_from_db()
+        assert reader_goal.status == Goal.Status.to_do
+
+    def test_not_updated_ids(self, auth_client, goals):
+        Goal.objects.filter(id=goals[0].id).update(status=Goal.Status.archived)
+        ids = [goal.id for goal in goals] + [0]
+
+        response = auth_client.post(self.url, data={'ids': ids, 'priority': Goal.Priority.low}, format='json')
+
+        assert response.json() == {'updated': 2, 'not_updated': sorted([0, goals[0].id])}
+
+    def test_transition_by_filter(self, auth_client, goal_category, goals, django_assert_max_num_queries):
+        data = {'filter': {'category__in': str(goal_category.id)}, 'priority': Goal.Priority.critical}
+
+        # сессия, пользователь, проверка категорий фильтра, UPDATE
+        with django_assert_max_num_queries(4):
+            response = auth_client.post(self.url, data=data, format='json')
+
+        assert response.json() == {'updated': 3}
+        for goal in goals:
+            goal.refresh_from_db()
+            assert goal.priority == Goal.Priority.critical
+            assert goal.updated > goal.created
+
+    @pytest.mark.usefixtures('reader_goal')
+    def test_archived_goals_not_changed(self, auth_client, goals):
+        Goal.objects.filter(id=goals[0].id).update(status=Goal.Status.archived)
+
+        response = auth_client.post(self.url, data={
+            'filter': {'status__in': f'{Goal.Status.to_do},{Goal.Status.archived}'}, 'status': Goal.Status.done,
+        }, format='json')
+
+        assert response.json() == {'updated': 2}
+
+    def test_filter_list_values(self, auth_client, goal_category, goals):
+        Goal.objects.filter(id=goals[0].id).update(status=Goal.Status.in_progress)
+
+        response = auth_client.post(self.url, data={
+            'filter': {'status__in': [Goal.Status.to_do, Goal.Status.in_progress], 'category__in': [goal_category.id]},
+            'status': Goal.Status.done,
+        }, format='json')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {'updated': 3}
+
+    @pytest.mark.parametrize('data', [
+        {'status': Goal.Status.done},
+        {'ids': [1]},
+        {'filter': {'status__in': 'abc'}, 'status': Goal.Status.done},
+        {'filter': {'status__in': []}, 'status': Goal.Status.done},
+        {'filter': {'status__in': [[1, 2]]}, 'status': Goal.Status.done},
+        {'filter': {'category__in': {'id': 1}}, 'status': Goal.Status.done},
+        {'filter': {'category__in': None}, 'status': Goal.Status.done},
+        {'ids': [1], 'status': Goal.Status.archived},
+    ])
+    def test_invalid_request(self, auth_client, data):
+        response = auth_client.post(self.url, data=data, format='json')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db()
+@pytest.mark.usefixtures('board_participant', 'goal_comment', 'goals')
+class TestGoalExportView:
+    url = reverse('goals:goal_export')
+
+    @pytest.fixture()
+    def goals(self, user, another_user, goal, goal_category, board_factory, goal_factory) -> list[Goal]:
+        # архивная цель и цель чужой доски не выгружаются
+        goal.status = Goal.Status.done
+        goal.save()
+        goals = [goal, *goal_factory.create_batch(2, category=goal_category, user=user, status=Goal.Status.to_do)]
+        goal_factory.create(category=goal_category, user=user, status=Goal.Status.archived)
+        goal_factory.create(category__board=board_factory.create(with_owner=another_user), user=another_user)
+        return goals
+
+    def test_auth_required(self, client):
+        assert client.get(self.url).status_code == status.HTTP_403_FORBIDDEN
+
+    def test_ndjson(self, auth_client, user, goal, goals):
+        response = auth_client.get(self.url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response['Content-Type'] == 'application/x-ndjson'
+        rows = [json.loads(line) for line in response.getvalue().decode().splitlines()]
+        assert [row['id'] for row in rows] == [goal.id for goal in goals]
+        goal.refresh_from_db()
+        assert rows[0] == {
+            'id': goal.id,
+            'title': goal.title,
+            'description': goal.description,
+            'category': goal.category_id,
+            'board': goal.board_id,
+            'due_date': goal.due_date,
+            'status': Goal.Status.done,
+            'priority': goal.priority,
+            'comments_count': 1,
+            'user': user.username,
+            'created': DateTimeField().to_representation(goal.created),
+            'updated': DateTimeField().to_representation(goal.updated),
+        }
+
+    def test_filters_and_comments(self, auth_client, user, goal, goal_comment):
+        response = auth_client.get(self.url, {'status__in': Goal.Status.done, 'comments': 'true'})
+
+        [row] = [json.loads(line) for line in response.getvalue().decode().splitlines()]
+        assert row['id'] == goal.id
+        assert row['comments'] == [{
+            'id': goal_comment.id,
+            'text': goal_comment.text,
+            'user': user.username,
+            'created': DateTimeField().to_representation(goal_comment.created),
+            'updated': DateTimeField().to_representation(goal_comment.updated),
+        }]
+
+    def test_search_keeps_id_order(self, auth_client, goal_category, goal_factory):
+        mentioned = goal_factory.create(category=goal_category, title='А: план', description='обсудить релиз')
+        relevant = goal_factory.create(category=goal_category, title='Б: релиз', description='подготовить релиз')
+
+        response = auth_client.get(self.url, {'search': 'релиз'})
+
+        goals = [json.loads(line) for line in response.getvalue().decode().splitlines()]
+        assert [goal['id'] for goal in goals] == [mentioned.id, relevant.id]
+
+    def test_csv(self, auth_client, goals):
+        response = auth_client.get(self.url, {'output': 'csv', 'comments': '1'})
+
+        assert response['Content-Type'] == 'text/csv; charset=utf-8'
+        rows = list(csv.DictReader(io.StringIO(response.getvalue().decode())))
+        assert [int(row['id']) for row in rows] == [goal.id for goal in goals]
+        assert [len(json.loads(row['comments'])) for row in rows] == [1, 0, 0]
+
+    def test_empty_csv_has_header(self, auth_client):
+        response = auth_client.get(self.url, {'output': 'csv', 'status__in': Goal.Status.in_progress})
+
+        assert response.getvalue().decode().splitlines() == [','.join(GOAL_FIELDS)]
+
+    def test_unknown_output(self, auth_client):
+        response = auth_client.get(self.url, {'output': 'xml'})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_chunks(self, goal_category, django_assert_num_queries):
+        queryset = Goal.objects.filter(category=goal_category).exclude(status=Goal.Status.archived).order_by('id')
+
+        # серверный курсор по целям и один запрос комментариев на каждую часть
+        with django_assert_num_queries(3):
+            chunks = list(goal_chunks(queryset, with_comments=True, chunk_size=2))
+
+        assert [len(chunk) for chunk in chunks] == [2, 1]
@@ -0,0 +1,183 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.urls import reverse
+from rest_framework import status
+
+from goals.importing import import_goals
+from goals.models import BoardParticipant, Goal, GoalComment
+from tests.test_goals.factories import CreateGoalRequest
+
+
+def _ndjson(*rows: dict) -> bytes:
+    return ''.join(json.dumps(row, ensure_ascii=False) + '\n' for row in rows).encode()
+
+
+@pytest.mark.django_db()
+@pytest.mark.usefixtures('board_participant')
+class TestGoalImportView:
+    url = reverse('goals:goal_import')
+
+    @pytest.fixture()
+    def upload(self, board):
+        def _upload(client, content: bytes, name: str = 'goals.ndjson', **data):
+            file = SimpleUploadedFile(name, content)
+            return client.post(self.url, data={'file': file, 'board': board.id, **data}, format='multipart')
+        return _upload
+
+    def test_ndjson(self, auth_client, upload, user, board, goal_category):
+        content = _ndjson(
+            {'title': 'Первая', 'category': goal_category.id, 'due_date': '2024-05-01', 'status': Goal.Status.done,
+             'comments': ['Готово', {'text': 'Проверено'}]},
+            {'title': ' Вторая ', 'category': goal_category.id, 'priority': Goal.Priority.high},
+        )
+
+        response = upload(auth_client, content)
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.json() == {'goals': 2, 'comments': 2, 'dry_run': False}
+        first, second = Goal.objects.order_by('id')
+        assert (first.title, first.status, str(first.due_date), first.comments_count) == (
+            'Первая', Goal.Status.done, '2024-05-01', 2,
+        )
+        assert (second.title, second.priority, second.status, second.user) == (
+            'Вторая', Goal.Priority.high, Goal.Status.to_do, user,
+        )
+        assert list(GoalComment.objects.order_by('id').values_list('text', 'goal_id', 'board_id')) == [
+            ('Готово', first.id, board.id), ('Проверено', first.id, board.id),
+        ]
+        goal_category.refresh_from_db()
+        assert (goal_category.goals_to_do, goal_category.goals_done) == (1, 1)
+
+    @pytest.mark.usefixtures('goal_comment')
+    def test_export_round_trip(self, auth_client, upload):
+        exported = auth_client.get(reverse('goals:goal_export'), {'output': 'csv', 'comments': 'true'}).getvalue()
+
+        response = upload(auth_client, exported, name='goals.csv')
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.json() == {'goals': 1, 'comments': 1, 'dry_run': False}
+        assert Goal.objects.count() == 2
+        assert GoalComment.objects.count() == 2
+
+    def test_row_errors(self, auth_client, upload, goal_category, another_user, board_factory,
+                        goal_category_factory):
+        foreign_category = goal_category_factory.create(board=board_factory.create(with_owner=another_user))
+        content = _ndjson(
+            {'title': 'Цель', 'category': goal_category.id},
+            {'title': '', 'category': foreign_category.id},
+            {'title': 'Цель', 'category': goal_category.id, 'status': 7, 'due_date': '01.05.2024'},
+        ) + b'{not json}\n'
+
+        response = upload(auth_client, content)
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json()['errors'] == [
+            {'row': 2, 'errors': {
+                'title': ['This field is required.'],
+                'category': [f'Invalid pk "{foreign_category.id}" - object does not exist.'],
+            }},
+            {'row': 3, 'errors': {
+                'due_date': ['Date has wrong format. Use one of these formats instead: YYYY-MM-DD.'],
+                'status': ['"7" is not a valid choice.'],
+            }},
+            {'row': 4, 'errors': {'non_field_errors': [
+                'Invalid JSON: Expecting property name enclosed in double quotes: line 1 column 2 (char 1)',
+            ]}},
+        ]
+        assert not Goal.objects.exists()
+
+    @pytest.mark.parametrize('name, content', [
+        ('goals.csv', 'title,category\r\nЦель,1\r\n'.encode('cp1251')),
+        ('goals.ndjson', _ndjson({'title': 'Цель', 'category': 1}).decode().encode('cp1251')),
+    ])
+    def test_not_utf8(self, auth_client, upload, name, content):
+        response = upload(auth_client, content, name=name)
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json()['errors'] == [{'row': 1, 'errors': {'non_field_errors': [
+            'File is not UTF-8 encoded text.',
+        ]}}]
+
+    def test_invalid_csv(self, auth_client, upload, goal_category):
+        content = f'title,category\r\nЦель,{goal_category.id}\r\n"{"x" * 200_000}",1\r\n'.encode()
+
+        response = upload(auth_client, content, name='goals.csv')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json()['errors'] == [{'row': 2, 'errors': {'non_field_errors': [
+            'Invalid CSV: field larger than field limit (131072)',
+        ]}}]
+        assert not Goal.objects.exists()
+
+    def test_dry_run(self, auth_client, upload, goal_category):
+        response = upload(auth_client, _ndjson(CreateGoalRequest.build(category=goal_category.id)), dry_run=True)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {'goals': 1, 'comments': 0, 'dry_run': True}
+        assert not Goal.objects.exists()
+
+    def test_reader_forbidden(self, client, upload, board, goal_category, another_user, board_participant_factory):
+        board_participant_factory.create(board=board, user=another_user, role=BoardParticipant.Role.reader)
+        client.force_login(another_user)
+
+        response = upload(client, _ndjson(CreateGoalRequest.build(category=goal_category.id)))
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json() == {'board': [f'Invalid pk "{board.id}" - object does not exist.']}
+        assert not Goal.objects.exists()
+
+    @pytest.mark.parametrize('is_deleted', [False, True], ids=['foreign', 'deleted'])
+    def test_invalid_board(self, auth_client, user, goal_category, another_user, board_factory, is_deleted):
+        board = board_factory.create(with_owner=user if is_deleted else another_user, is_deleted=is_deleted)
+        file = SimpleUploadedFile('goals.ndjson', _ndjson(CreateGoalRequest.build(category=goal_category.id)))
+
+        response = auth_client.post(self.url, data={'file': file, 'board': board.id}, format='multipart')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json() == {'board': [f'Invalid pk "{board.id}" - object does not exist.']}
+        assert not Goal.objects.exists()
+
+    def test_category_of_other_board(self, auth_client, upload, user, board_factory, goal_category_factory):
+        other_category = goal_category_factory.create(board=board_factory.create(with_owner=user), user=user)
+
+        response = upload(auth_client, _ndjson(CreateGoalRequest.build(category=other_category.id)))
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json()['errors'] == [{'row': 1, 'errors': {
+            'category': [f'Invalid pk "{other_category.id}" - object does not exist.'],
+        }}]
+        assert not Goal.objects.exists()
+
+    def test_batches(self, user, board, goal_category):
+        rows = CreateGoalRequest.build_batch(5, category=goal_category.id, comments=['Комментарий'])
+
+        result = import_goals(rows, board.id, user, batch_size=2)
+
+        assert (result.goals, result.comments, result.errors) == (5, 5, [])
+        assert list(Goal.objects.values_list('comments_count', flat=True).distinct()) == [1]
+        goal_category.refresh_from_db()
+        assert goal_category.goals_to_do == 5
+
+    def test_command(self, user, board, goal_category, tmp_path):
+        path = tmp_path / 'goals.csv'
+        path.write_text(f'title,category,status\nЦель,{goal_category.id},2\n', encoding='utf-8')
+        out = StringIO()
+
+        call_command('import_goals', str(path), '--board', str(board.id), '--username', user.username, stdout=out)
+
+        assert 'Imported 1 goals and 0 comments' in out.getvalue()
+        assert Goal.objects.get().status == Goal.Status.in_progress
+
+    def test_command_errors(self, user, board, tmp_path):
+        path = tmp_path / 'goals.ndjson'
+        path.write_bytes(_ndjson({'title': 'Цель', 'category': 0}))
+
+        with pytest.raises(CommandError, match='1 invalid rows'):
+            call_command(
+                'import_goals', str(path), '--board', str(board.id), '--username', user.username,
+                stderr=StringIO(),
+            )
@@ -0,0 +1,63 @@
+import datetime
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+
+from goals.models import Goal, GoalCategory, GoalComment
+from goals.projections import Projection, projection
+from goals.serializers import GoalWithUserSerializer, GoalCategoryWithUserSerializer, GoalCommentWithUserSerializer
+
+
+@pytest.mark.django_db()
+class TestProjection:
+    @pytest.fixture(autouse=True)
+    def setup(self, board_participant, goal_category, user, another_user, goal_factory, goal_comment_factory) -> None:
+        goal_factory.create(
+            category=goal_category, user=user, title='Цель ', description='Описание',
+            due_date=datetime.date(2024, 5, 1), status=Goal.Status.done, priority=Goal.Priority.critical,
+        )
+        goal = goal_factory.create(category=goal_category, user=another_user, due_date=None)
+        goal_comment_factory.create(goal=goal, user=user, text='Комментарий')
+
+    @pytest.mark.parametrize('serializer_class, model', [
+        (GoalWithUserSerializer, Goal),
+        (GoalCategoryWithUserSerializer, GoalCategory),
+        (GoalCommentWithUserSerializer, GoalComment),
+    ])
+    def test_same_bytes_as_serializer(self, serializer_class, model):
+        fields = projection(serializer_class)
+        queryset = model.objects.select_related('user').order_by('id')
+
+        expected = JSONRenderer().render(serializer_class(queryset, many=True).data)
+
+        assert JSONRenderer().render(fields.represent(queryset.values(*fields.columns))) == expected
+
+    def test_same_bytes_in_other_timezone(self):
+        fields = projection(GoalWithUserSerializer)
+        queryset = Goal.objects.select_related('user').order_by('id')
+
+        with timezone.override('Europe/Moscow'):
+            expected = JSONRenderer().render(GoalWithUserSerializer(queryset, many=True).data)
+            assert JSONRenderer().render(fields.represent(queryset.values(*fields.columns))) == expected
+
+    def test_list_view(self, auth_client):
+        response = auth_client.get(reverse('goals:goal_list'), data={'ordering': '-created', 'cursor': '', 'limit': 1})
+
+        goal = Goal.objects.select_related('user').latest('created')
+        assert response.json()['results'] == [GoalWithUserSerializer(goal).data]
+
+        response = auth_client.get(response.json()['next'])
+        goal = Goal.objects.select_related('user').earliest('created')
+        assert response.content == JSONRenderer().render({
+            'next': None, 'results': [GoalWithUserSerializer(goal).data],
+        })
+
+    def test_unsupported_field(self):
+        class Serializer(GoalWithUserSerializer):
+            title_length = serializers.SerializerMethodField()
+
+        with pytest.raises(TypeError, match='title_length'):
+            Projection(Serializer)
@@ -0,0 +1,140 @@
+import json
+
+import factory
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from goals.models import BoardParticipant, Goal
+from goals.urls import urlpatterns
+from tests.test_goals.factories import CreateGoalCategoryRequest, CreateGoalCommentRequest, CreateGoalRequest
+
+# (имя маршрута, метод, предельное число запросов к БД - вместе с загрузкой сессии и пользователя и точками сохранения)
+# бюджет не зависит от числа записей: списки выдаются одним запросом вместе с пользователями;
+# кэши (роли, ответы списков) в каждом тесте пустые, поэтому бюджет учитывает промахи;
+# изменения целей и комментариев включают запросы UPDATE счетчиков (goals/counters.py)
+ROUTES = [
+    ('create_board', 'post', 6),
+    ('board_list', 'get', 5),
+    ('board_detail', 'get', 6),
+    ('board_detail', 'put', 18),
+    ('board_detail', 'delete', 10),
+    ('board_stats', 'get', 6),
+    ('create_category', 'post', 7),
+    ('category_list', 'get', 5),
+    ('category_detail', 'get', 4),
+    ('category_detail', 'put', 8),
+    ('category_detail', 'delete', 7),
+    ('create_goal', 'post', 8),
+    ('goal_list', 'get', 4),
+    ('goal_detail', 'get', 4),
+    ('goal_detail', 'put', 8),
+    ('goal_detail', 'delete', 8),
+    ('goal_batch', 'post', 10),
+    ('goal_transition', 'post', 9),
+    ('goal_export', 'get', 4),
+    ('goal_import', 'post', 11),  # COPY выполняется в обход журнала запросов Django и не учитывается
+    ('create_comment', 'post', 8),
+    ('comment_list', 'get', 4),
+    ('comment_detail', 'get', 3),
+    ('comment_detail', 'put', 4),
+    ('comment_detail', 'delete', 7),
+]
+
+
+def test_all_routes_have_budget():
+    assert {pattern.name for pattern in urlpatterns} == {name for name, *_ in ROUTES}
+
+
+@pytest.mark.django_db()
+@pytest.mark.usefixtures('board_participant')
+class TestQueryBudget:
+    @pytest.fixture()
+    def seed(self, user, board, goal_category, goal, user_factory, board_factory, board_participant_factory,
+             goal_category_factory, goal_factory, goal_comment_factory):
+        def _seed(count: int) -> None:
+            """ Добавляет по count досок, участников, категорий, целей и комментариев (от разных пользователей) """
+
+            for author in user_factory.create_batch(count, username=factory.Sequence(lambda n: f'budget_user_{n}')):
+                board_factory.create(with_owner=user)
+                board_participant_factory.create(board=board, user=author, role=BoardParticipant.Role.reader)
+                goal_category_factory.create(board=board, user=author)
+                goal_factory.create(category=goal_category, user=author)
+                goal_comment_factory.create(goal=goal, user=author)
+        return _seed
+
+    @pytest.fixture()
+    def send(self, auth_client, another_user, board, goal_category, goal, goal_comment):
+        def _send(name: str, method: str):
+            """ Выполняет запрос method к маршруту name от участника доски """
+
+            objects = {
+                'board_detail': board,
+                'board_stats': board,
+                'category_detail': goal_category,
+                'goal_detail': goal,
+                'comment_detail': goal_comment,
+            }
+            data = {
+                'create_board': {'title': 'Доска'},
+                'board_detail': {
+                    'title': 'Доска',
+                    'participants': [{'user': another_user.username, 'role': BoardParticipant.Role.writer}],
+                },
+                'create_category': CreateGoalCategoryRequest.build(board=board.pk),
+                'category_detail': CreateGoalCategoryRequest.build(board=board.pk),
+                'create_goal': CreateGoalRequest.build(category=goal_category.pk),
+                'goal_detail': CreateGoalRequest.build(category=goal_category.pk),
+                'goal_batch': [CreateGoalRequest.build(category=goal_category.pk), {'id': goal.pk, 'title': 'Цель'}],
+                'goal_transition': {'filter': {'category__in': str(goal_category.pk)}, 'status': Goal.Status.done},
+                'create_comment': CreateGoalCommentRequest.build(goal=goal.pk),
+                'comment_detail': CreateGoalCommentRequest.build(goal=goal.pk),
+            }
+            url = reverse(f'goals:{name}', kwargs={'pk': objects[name].pk} if name in objects else None)
+            if method == 'get':
+                response = auth_client.get(url)
+                if response.streaming:
+                    # запросы потокового ответа выполняются при чтении его содержимого
+                    response.getvalue()
+                return response
+            if name == 'goal_import':
+                file = SimpleUploadedFile('goals.ndjson', b''.join(
+                    json.dumps({'title': 'Цель', 'category': goal_category.pk, 'comments': ['Комментарий']}).encode()
+                    + b'\n' for _ in range(10)
+                ))
+                return auth_client.post(url, data={'file': file, 'board': board.pk}, format='multipart')
+            return getattr(auth_client, method)(url, data=data.get(name), format='json')
+        return _send
+
+    @pytest.mark.parametrize('count', [1, 25])
+    @pytest.mark.parametrize('name, method, budget', ROUTES)
+    def test_query_budget(self, seed, send, django_assert_max_num_queries, name, method, budget, count):
+        seed(count)
+
+        with django_assert_max_num_queries(budget):
+            response = send(name, method)
+
+        assert response.status_code < 400, response.data
+
+
+@pytest.mark.django_db()
+@pytest.mark.usefixtures('board_participant')
+class TestMembershipQueries:
+    @pytest.mark.parametrize('name, method', [
+        ('category_detail', 'patch'),
+        ('goal_detail', 'patch'),
+        ('create_goal', 'post'),
+        ('create_comment', 'post'),
+    ])
+    def test_one_membership_query_per_request(self, auth_client, goal_category, goal, name, method):
+        data = {'title': 'Новое название', 'category': goal_category.pk, 'goal': goal.pk, 'text': 'Комментарий'}
+        objects = {'category_detail': goal_category, 'goal_detail': goal}
+        url = reverse(f'goals:{name}', kwargs={'pk': objects[name].pk} if name in objects else None)
+
+        with CaptureQueriesContext(connection) as context:
+            response = getattr(auth_client, method)(url, data=data, format='json')
+
+        assert response.status_code < 400, response.data
+        assert len([query for query in context if 'goals_boardparticipant' in query['sql']]) == 1
@@ -0,0 +1,24 @@
+import pytest
+
+from goals.benchmarks import LIST_REQUESTS, list_queryset, seq_scans, without_seq_scans
+from goals.models import BoardParticipant
+
+
+@pytest.mark.django_db()
+class TestListQueryPlans:
+    @pytest.fixture(autouse=True)
+    def setup(self, board_participant, goal_category, another_user, board_factory, board_participant_factory,
+              goal_category_factory, goal_factory, goal_comment_factory):
+        reader_board = board_factory.create(with_owner=another_user)
+        board_participant_factory.create(board=reader_board, user=board_participant.user,
+                                         role=BoardParticipant.Role.reader)
+        for category in (goal_category, goal_category_factory.create(board=reader_board, user=another_user)):
+            for goal in goal_factory.create_batch(3, category=category, user=category.user):
+                goal_comment_factory.create(goal=goal, user=category.user)
+
+    @pytest.mark.parametrize('label, view_class, params', LIST_REQUESTS, ids=[label for label, *_ in LIST_REQUESTS])
+    def test_no_seq_scan_on_large_tables(self, user, label, view_class, params):
+        queryset = list_queryset(view_class, user, params)
+
+        with without_seq_scans():
+            assert seq_scans(queryset) == []
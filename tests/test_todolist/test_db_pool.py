@@ -0,0 +1,193 @@
+import threading
+import time
+
+import psycopg2
+import pytest
+from django.db import connection, connections, transaction
+from django.urls import reverse
+from psycopg2 import extensions
+from rest_framework import status
+
+from todolist.db.base import DatabaseWrapper
+from todolist.db.pool import ConnectionPool, PoolTimeout, get_pool
+
+
+@pytest.mark.django_db()
+class TestConnectionPool:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        params = connection.get_connection_params()
+        self.connect = lambda: psycopg2.connect(**params)
+        self.pools = []
+        yield
+        for pool in self.pools:
+            pool.close()
+
+    def make_pool(self, max_size: int = 2, timeout: float = 1.0) -> ConnectionPool:
+        pool = ConnectionPool(max_size, timeout)
+        self.pools.append(pool)
+        return pool
+
+    def test_reuse(self):
+        pool = self.make_pool()
+
+        first = pool.acquire(self.connect)
+        pool.release(first)
+        second = pool.acquire(self.connect)
+
+        assert second is first
+        assert pool.stats() | {'wait_ms': 0} == {
+            'max_size': 2, 'size': 1, 'in_use': 1, 'idle': 0,
+            'created': 1, 'reused': 1, 'discarded': 0, 'waits': 0, 'timeouts': 0, 'wait_ms': 0,
+        }
+        pool.release(second)
+
+    def test_timeout(self):
+        pool = self.make_pool(max_size=1, timeout=0.05)
+        busy = pool.acquire(self.connect)
+
+        with pytest.raises(PoolTimeout):
+            pool.acquire(self.connect)
+
+        stats = pool.stats()
+        assert (stats['size'], stats['in_use'], stats['waits'], stats['timeouts']) == (1, 1, 1, 1)
+        assert stats['wait_ms'] >= 50
+        pool.release(busy)
+
+    def test_waiting_thread_gets_released_connection(self):
+        pool = self.make_pool(max_size=1, timeout=5)
+        busy = pool.acquire(self.connect)
+        acquired = []
+
+        thread = threading.Thread(target=lambda: acquired.append(pool.acquire(self.connect)))
+        thread.start()
+        time.sleep(0.05)
+        pool.release(busy)
+        thread.join()
+
+        assert acquired == [busy]
+        assert pool.stats()['waits'] == 1 and pool.stats()['timeouts'] == 0
+        pool.release(busy)
+
+    def test_release_rolls_back(self):
+        pool = self.make_pool()
+        conn = pool.acquire(self.connect)
+        with conn.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        assert conn.info.transaction_status == extensions.TRANSACTION_STATUS_INTRANS
+
+        pool.release(conn)
+
+        assert conn.info.transaction_status == extensions.TRANSACTION_STATUS_IDLE
+        assert pool.stats()['idle'] == 1
+
+    def test_release_resets_session(self):
+        pool = self.make_pool(max_size=1)
+        conn = pool.acquire(self.connect)
+        conn.autocommit = True
+        with conn.cursor() as cursor:
+            cursor.execute("SET statement_timeout = '5s'")
+            cursor.execute('CREATE TEMPORARY TABLE pool_leftover (id int)')
+            cursor.execute('DECLARE pool_cursor CURSOR WITH HOLD FOR SELECT 1')
+        conn.autocommit = False
+
+        pool.release(conn)
+        reused = pool.acquire(self.connect)
+
+        assert reused is conn and not reused.autocommit
+        with reused.cursor() as cursor:
+            cursor.execute('SHOW statement_timeout')
+            assert cursor.fetchone() == ('0',)
+            cursor.execute("SELECT to_regclass('pool_leftover'), (SELECT count(*) FROM pg_cursors)")
+            assert cursor.fetchone() == (None, 0)
+        pool.release(reused)
+
+    def test_failed_reset_discards(self):
+        pool = self.make_pool()
+        conn = pool.acquire(self.connect)
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_terminate_backend(%s)', [conn.info.backend_pid])
+
+        pool.release(conn)
+
+        assert conn.closed
+        assert pool.stats()['size'] == 0 and pool.stats()['idle'] == 0 and pool.stats()['discarded'] == 1
+
+    def test_closed_connection_discarded(self):
+        pool = self.make_pool()
+        conn = pool.acquire(self.connect)
+        conn.close()
+
+        pool.release(conn)
+
+        assert pool.stats()['size'] == 0 and pool.stats()['discarded'] == 1
+        assert pool.acquire(self.connect) is not conn
+
+    def test_broken_connection_replaced(self):
+        pool = self.make_pool()
+        conn = pool.acquire(self.connect)
+        pool.release(conn)
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_terminate_backend(%s)', [conn.info.backend_pid])
+
+        fresh = pool.acquire(self.connect)
+
+        assert fresh is not conn and conn.closed
+        assert pool.stats()['created'] == 2 and pool.stats()['discarded'] == 1
+        pool.release(fresh)
+
+
+@pytest.mark.django_db()
+class TestPooledDatabaseWrapper:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.wrapper = DatabaseWrapper(
+            {**connection.settings_dict, 'ENGINE': 'todolist.db', 'POOL': {'MAX_SIZE': 2, 'TIMEOUT': 1}},
+            alias='pool_test',
+        )
+        connections['pool_test'] = self.wrapper
+        yield
+        del connections['pool_test']
+        self.wrapper.close()
+        self.wrapper.pool.close()
+
+    def test_close_returns_connection_to_pool(self):
+        self.wrapper.ensure_connection()
+        raw, reused = self.wrapper.connection, self.wrapper.pool.stats()['reused']
+        self.wrapper.close()
+
+        assert self.wrapper.connection is None and not raw.closed
+        with self.wrapper.cursor() as cursor:
+            cursor.execute('SELECT 1')
+            assert cursor.fetchone() == (1,)
+        assert self.wrapper.connection is raw
+        assert self.wrapper.pool.stats()['reused'] == reused + 1
+
+    def test_close_in_atomic_block_discards(self):
+        with transaction.atomic(using=self.wrapper.alias):
+            raw, discarded = self.wrapper.connection, self.wrapper.pool.stats()['discarded']
+            self.wrapper.close()
+
+        assert raw.closed
+        assert self.wrapper.pool.stats()['size'] == 0 and self.wrapper.pool.stats()['discarded'] == discarded + 1
+
+
+class TestDatabasePoolView:
+    @pytest.mark.django_db()
+    def test_not_staff(self, auth_client):
+        response = auth_client.get(reverse('db_pool'))
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    @pytest.mark.django_db()
+    def test_staff(self, client, user_factory):
+        get_pool('pool_view_test', {'database': 'todolist'}, max_size=3, timeout=1)
+        client.force_login(user_factory.create(is_staff=True))
+
+        response = client.get(reverse('db_pool'))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert {
+            'alias': 'pool_view_test', 'database': 'todolist', 'max_size': 3, 'size': 0, 'in_use': 0, 'idle': 0,
+            'created': 0, 'reused': 0, 'discarded': 0, 'waits': 0, 'timeouts': 0, 'wait_ms': 0.0,
+        } in response.json()
@@ -0,0 +1,69 @@
+import datetime
+import decimal
+import io
+import uuid
+
+import pytest
+from django.urls import reverse
+from django.utils.translation import gettext_lazy
+from rest_framework import status
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from goals.serializers import GoalWithUserSerializer
+from todolist.renderers import ORJSONParser, ORJSONRenderer
+
+
+class TestORJSONRenderer:
+    @pytest.mark.parametrize('data', [
+        {
+            'created': datetime.datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=datetime.timezone.utc),
+            'naive': datetime.datetime(2024, 5, 1, 12, 30),
+            'due_date': datetime.date(2024, 5, 1),
+            'time': datetime.time(9, 15, 30, 500),
+            'amount': decimal.Decimal('10.50'),
+            'uuid': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+            'lazy': gettext_lazy('Цель'),
+            'separators': 'строка\u2028абзац\u2029',
+            1: [None, True, 1.5, 'кириллица'],
+        },
+        [],
+        'строка',
+    ])
+    def test_same_bytes_as_json_renderer(self, data):
+        assert ORJSONRenderer().render(data) == JSONRenderer().render(data)
+
+    def test_indent_falls_back_to_json_renderer(self):
+        data = {'title': 'Цель'}
+
+        assert ORJSONRenderer().render(data, 'application/json; indent=2') == JSONRenderer().render(
+            data, 'application/json; indent=2',
+        )
+
+    def test_none(self):
+        assert ORJSONRenderer().render(None) == b''
+
+    @pytest.mark.django_db()
+    def test_goal_list_page(self, user, goal_factory):
+        data = GoalWithUserSerializer(goal_factory.create_batch(5, user=user), many=True).data
+
+        assert ORJSONRenderer().render(data) == JSONRenderer().render(data)
+
+
+class TestORJSONParser:
+    def test_same_result_as_json_parser(self):
+        body = '{"title": "Цель", "ids": [1, 2], "nested": {"ok": true, "value": null}}'.encode()
+
+        assert ORJSONParser().parse(io.BytesIO(body)) == JSONParser().parse(io.BytesIO(body))
+
+    def test_parse_error(self):
+        with pytest.raises(ParseError):
+            ORJSONParser().parse(io.BytesIO(b'{"title": '))
+
+    @pytest.mark.django_db()
+    def test_api_parse_error(self, auth_client):
+        response = auth_client.post(reverse('goals:create_goal'), data=b'{"title": ', content_type='application/json')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json()['detail'].startswith('JSON parse error')
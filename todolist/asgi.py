@@ -2,6 +2,8 @@
 ASGI config for todolist project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Requests are routed with settings.ASGI_URLCONF, which serves the hot goals read endpoints
+with async views (goals/asynchronous.py).
 
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
@@ -9,8 +11,21 @@ https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
 
 import os
 
-from django.core.asgi import get_asgi_application
+import django
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler, ASGIRequest
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'todolist.settings')
 
-application = get_asgi_application()
+django.setup(set_prefix=False)
+
+
+class URLConfASGIRequest(ASGIRequest):
+    urlconf = settings.ASGI_URLCONF
+
+
+class URLConfASGIHandler(ASGIHandler):
+    request_class = URLConfASGIRequest
+
+
+application = URLConfASGIHandler()
@@ -0,0 +1,66 @@
+""" Локальный кэш в памяти процесса с ограничением по объему
+
+BoundedLocMemCache - LocMemCache, который вытесняет давно не использованные записи (LRU) по одной,
+как только превышено число записей (OPTIONS['MAX_ENTRIES']) или суммарный размер значений (OPTIONS['MAX_BYTES']).
+Стандартный LocMemCache при переполнении удаляет сразу треть записей и не ограничивает занимаемую память.
+
+"""
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.cache.backends.locmem import LocMemCache
+
+# размеры значений и общий объем - общие для всех экземпляров кэша с одним именем, как и данные LocMemCache
+_sizes: dict[str, dict[str, int]] = {}
+_usage: dict[str, dict[str, int]] = {}
+
+
+class BoundedLocMemCache(LocMemCache):
+
+    def __init__(self, name, params):
+        super().__init__(name, params)
+        self._max_bytes = int(params.get('OPTIONS', {}).get('MAX_BYTES', 64 * 1024 * 1024))
+        self._sizes = _sizes.setdefault(name, {})
+        self._usage = _usage.setdefault(name, {'bytes': 0})
+
+    @property
+    def size(self) -> int:
+        """ Суммарный размер хранимых значений в байтах """
+
+        return self._usage['bytes']
+
+    def _set(self, key, value, timeout=DEFAULT_TIMEOUT):
+        self._delete(key)
+        if len(value) > self._max_bytes:
+            return
+
+        # самые давно использованные записи находятся в конце (LocMemCache переносит прочитанные в начало)
+        while self._cache and (
+            len(self._cache) >= self._max_entries or self._usage['bytes'] + len(value) > self._max_bytes
+        ):
+            self._delete(next(reversed(self._cache)))
+
+        super()._set(key, value, timeout)
+        self._sizes[key] = len(value)
+        self._usage['bytes'] += len(value)
+
+    def _delete(self, key):
+        if not super()._delete(key):
+            return False
+        self._usage['bytes'] -= self._sizes.pop(key, 0)
+        return True
+
+    def incr(self, key, delta=1, version=None):
+        value = super().incr(key, delta, version)
+        key = self.make_and_validate_key(key, version=version)
+        with self._lock:
+            if key in self._cache:
+                self._usage['bytes'] += len(self._cache[key]) - self._sizes.get(key, 0)
+                self._sizes[key] = len(self._cache[key])
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self._expire_info.clear()
+            self._sizes.clear()
+            self._usage['bytes'] = 0
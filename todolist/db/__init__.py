@@ -0,0 +1,8 @@
+""" Бэкенд PostgreSQL с пулом соединений (ENGINE = 'todolist.db')
+
+DatabaseWrapper (todolist/db/base.py) берет соединение из пула процесса (todolist/db/pool.py) вместо открытия
+нового и возвращает его в пул вместо закрытия: Django закрывает соединение в конце каждого запроса
+(CONN_MAX_AGE = 0), поэтому соединения переходят между потоками сервера, а их число ограничено
+DATABASES[...]['POOL']['MAX_SIZE'].
+
+"""
@@ -0,0 +1,50 @@
+""" DatabaseWrapper PostgreSQL, который берет соединения из пула процесса
+
+Параметры пула - DATABASES[...]['POOL']: MAX_SIZE - наибольшее число соединений, TIMEOUT - время ожидания
+свободного соединения, секунд; проверка соединения при выдаче - CONN_HEALTH_CHECKS.
+
+"""
+
+from functools import partial
+
+from django.db.backends.postgresql import base, creation
+from django.db.backends.postgresql.psycopg_any import IsolationLevel
+
+from todolist.db.pool import ConnectionPool, close_pools, get_pool
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+
+    def _destroy_test_db(self, test_database_name, verbosity):
+        # свободные соединения пула с тестовой базой не дают ее удалить
+        close_pools()
+        super()._destroy_test_db(test_database_name, verbosity)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    creation_class = DatabaseCreation
+
+    pool: ConnectionPool = None
+
+    def get_new_connection(self, conn_params):
+        options = self.settings_dict.get('POOL', {})
+        self.pool = get_pool(
+            self.alias, conn_params, int(options.get('MAX_SIZE', 10)), float(options.get('TIMEOUT', 10)),
+            self.settings_dict['CONN_HEALTH_CHECKS'],
+        )
+        connection = self.pool.acquire(partial(super().get_new_connection, conn_params))
+        # уровень изоляции задается при открытии соединения, для выданного повторно - тот же
+        self.isolation_level = IsolationLevel(
+            self.settings_dict['OPTIONS'].get('isolation_level', IsolationLevel.READ_COMMITTED)
+        )
+        return connection
+
+    def _close(self):
+        if self.connection is None:
+            return
+        with self.wrap_database_errors:
+            if self.in_atomic_block:
+                # закрытое внутри atomic соединение остается за подключением до выхода из блока
+                self.pool.discard(self.connection)
+            else:
+                self.pool.release(self.connection)
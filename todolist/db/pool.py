@@ -0,0 +1,200 @@
+""" Ограниченный пул соединений с PostgreSQL в памяти процесса
+
+ConnectionPool выдает соединения потокам процесса (потоки WSGI-сервера, потоки sync_to_async ASGI-сервера):
+свободное соединение выдается повторно (последнее возвращенное - первым), новое открывается, пока открыто
+меньше MAX_SIZE соединений, иначе поток ждет возврата соединения не дольше TIMEOUT секунд и получает
+PoolTimeout. При выдаче соединение проверяется запросом SELECT 1 (health_checks), при возврате -
+незавершенная транзакция откатывается, состояние сеанса сбрасывается командой DISCARD ALL (параметры SET,
+временные таблицы, курсоры WITH HOLD, рекомендательные блокировки), закрытые и сломанные соединения
+и соединения, состояние которых не удалось сбросить, удаляются из пула.
+
+stats() - состояние и счетчики пула: размер, занятые и свободные соединения, открытые, выданные повторно,
+удаленные соединения, ожидания, отказы по таймауту и суммарное время ожидания.
+
+get_pool() - общий для потоков процесса пул подключения к БД (alias и параметры соединения),
+pool_stats() - состояние всех пулов процесса, close_pools() - закрытие свободных соединений всех пулов.
+
+"""
+
+import threading
+import time
+from typing import Any, Callable, Optional
+
+import psycopg2
+from psycopg2 import extensions
+
+
+_pools: dict[tuple[str, str], 'ConnectionPool'] = {}
+_pools_lock = threading.Lock()
+
+
+class PoolTimeout(psycopg2.OperationalError):
+    """ Нет свободного соединения за время ожидания """
+
+
+class ConnectionPool:
+
+    def __init__(self, max_size: int, timeout: float, health_checks: bool = True, database: Optional[str] = None):
+        self.database = database
+        self.max_size = max_size
+        self.timeout = timeout
+        self.health_checks = health_checks
+        self._idle: list[Any] = []
+        self._size = 0
+        self._condition = threading.Condition()
+        self._counters = {'created': 0, 'reused': 0, 'discarded': 0, 'waits': 0, 'timeouts': 0}
+        self._wait_time = 0.0
+
+    def acquire(self, connect: Callable[[], Any]) -> Any:
+        """ Выдает свободное соединение пула или открывает новое функцией connect """
+
+        deadline = None
+        while True:
+            with self._condition:
+                while not self._idle and self._size >= self.max_size:
+                    if deadline is None:
+                        deadline = time.monotonic() + self.timeout
+                        self._counters['waits'] += 1
+                    start = time.monotonic()
+                    self._condition.wait(max(deadline - start, 0))
+                    self._wait_time += time.monotonic() - start
+                    if not self._idle and self._size >= self.max_size and time.monotonic() >= deadline:
+                        self._counters['timeouts'] += 1
+                        raise PoolTimeout(
+                            f'No free database connection in {self.timeout} s (pool size {self.max_size})'
+                        )
+                connection = self._idle.pop() if self._idle else None
+                if connection is None:
+                    self._size += 1
+
+            if connection is None:
+                try:
+                    connection = connect()
+                except BaseException:
+                    self._discard(counter=None)
+                    raise
+                self._count('created')
+                return connection
+
+            if self._is_usable(connection):
+                self._count('reused')
+                return connection
+            # соединение разорвано (перезапуск сервера БД, таймаут на стороне сервера) - берется следующее
+            self._close(connection)
+
+    def release(self, connection: Any) -> None:
+        """ Возвращает соединение в пул (закрытое или сломанное - закрывает и удаляет из пула) """
+
+        if connection.closed:
+            self._discard()
+            return
+        try:
+            if connection.info.transaction_status != extensions.TRANSACTION_STATUS_IDLE:
+                connection.rollback()
+            self._reset(connection)
+        except psycopg2.Error:
+            self._close(connection)
+            return
+        if connection.info.transaction_status != extensions.TRANSACTION_STATUS_IDLE:
+            self._close(connection)
+            return
+
+        with self._condition:
+            self._idle.append(connection)
+            self._condition.notify()
+
+    def discard(self, connection: Any) -> None:
+        """ Закрывает соединение и удаляет его из пула """
+
+        self._close(connection)
+
+    def close(self) -> None:
+        """ Закрывает свободные соединения пула """
+
+        with self._condition:
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            self._close(connection)
+
+    def stats(self) -> dict[str, Any]:
+        """ Возвращает состояние и счетчики пула """
+
+        with self._condition:
+            return {
+                'max_size': self.max_size,
+                'size': self._size,
+                'in_use': self._size - len(self._idle),
+                'idle': len(self._idle),
+                **self._counters,
+                'wait_ms': round(self._wait_time * 1000, 1),
+            }
+
+    def _is_usable(self, connection: Any) -> bool:
+        if connection.closed:
+            return False
+        if not self.health_checks:
+            return True
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            if connection.info.transaction_status != extensions.TRANSACTION_STATUS_IDLE:
+                connection.rollback()
+        except psycopg2.Error:
+            return False
+        return True
+
+    def _reset(self, connection: Any) -> None:
+        # DISCARD ALL нельзя выполнить внутри транзакции; режим autocommit соединения восстанавливается
+        autocommit = connection.autocommit
+        connection.autocommit = True
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('DISCARD ALL')
+        finally:
+            connection.autocommit = autocommit
+
+    def _close(self, connection: Any) -> None:
+        try:
+            connection.close()
+        except psycopg2.Error:
+            pass
+        self._discard()
+
+    def _count(self, counter: str) -> None:
+        with self._condition:
+            self._counters[counter] += 1
+
+    def _discard(self, counter: Optional[str] = 'discarded') -> None:
+        with self._condition:
+            self._size -= 1
+            if counter:
+                self._counters[counter] += 1
+            self._condition.notify()
+
+
+def get_pool(alias: str, conn_params: dict[str, Any], max_size: int, timeout: float,
+             health_checks: bool = True) -> ConnectionPool:
+    """ Возвращает пул подключения alias с параметрами conn_params (создает при первом обращении) """
+
+    key = (alias, repr(sorted(conn_params.items())))
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = ConnectionPool(max_size, timeout, health_checks, conn_params.get('database'))
+        return _pools[key]
+
+
+def pool_stats() -> list[dict[str, Any]]:
+    """ Возвращает состояние пулов процесса: подключение, база данных и счетчики """
+
+    with _pools_lock:
+        pools = list(_pools.items())
+    return [{'alias': alias, 'database': pool.database, **pool.stats()} for (alias, _), pool in pools]
+
+
+def close_pools() -> None:
+    """ Закрывает свободные соединения всех пулов процесса """
+
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.close()
@@ -25,6 +25,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'social_django',
     'django_filters',
@@ -65,21 +66,54 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'todolist.wsgi.application'
 
+# маршруты ASGI-приложения (todolist/asgi.py): частые запросы чтения целей - асинхронными представлениями;
+# ASGI_URLCONF=todolist.urls - те же синхронные представления, что и в WSGI
+ASGI_URLCONF = env('ASGI_URLCONF', default='todolist.urls_asgi')
+
 
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
+# соединения с БД: пул соединений процесса (todolist/db), общий для потоков сервера - не больше DB_POOL_MAX_SIZE
+# соединений, ожидание свободного - до DB_POOL_TIMEOUT секунд, перед повторным использованием соединение
+# проверяется (DB_CONN_HEALTH_CHECKS). DB_POOL_MAX_SIZE=0 - без пула: соединение потока на DB_CONN_MAX_AGE
+# секунд (под uvicorn каждый запрос выполняется в новом потоке, поэтому постоянные соединения потоков
+# копятся до max_connections PostgreSQL). За pgbouncer в режиме transaction нужен
+# DB_DISABLE_SERVER_SIDE_CURSORS (выгрузка goals/export.py)
+DB_POOL_MAX_SIZE = env.int('DB_POOL_MAX_SIZE', default=10)
+
 DATABASES = {
    'default': {
-       'ENGINE': 'django.db.backends.postgresql',
+       'ENGINE': 'todolist.db' if DB_POOL_MAX_SIZE else 'django.db.backends.postgresql',
        'NAME': env('POSTGRES_DB'),
        'USER': env('POSTGRES_USER'),
        'PASSWORD': env('POSTGRES_PASSWORD'),
        'HOST': env('POSTGRES_HOST', default='127.0.0.1'),
        'PORT': '5432',
+       'CONN_MAX_AGE': 0 if DB_POOL_MAX_SIZE else env.int('DB_CONN_MAX_AGE', default=0),
+       'CONN_HEALTH_CHECKS': env.bool('DB_CONN_HEALTH_CHECKS', default=True),
+       'DISABLE_SERVER_SIDE_CURSORS': env.bool('DB_DISABLE_SERVER_SIDE_CURSORS', default=False),
+       'POOL': {
+           'MAX_SIZE': DB_POOL_MAX_SIZE,
+           'TIMEOUT': env.float('DB_POOL_TIMEOUT', default=10.0),
+       },
    }
 }
 
+# кэш ролей участников досок (goals.access), ответов списков (goals.caching), например CACHE_URL=redis://127.0.0.1:6379/1
+CACHES = {
+    'default': env.cache('CACHE_URL', default='locmemcache://'),
+}
+if CACHES['default']['BACKEND'] == 'django.core.cache.backends.locmem.LocMemCache':
+    # локальный кэш с вытеснением LRU и ограничением объема (todolist/cache.py)
+    CACHES['default'].update(
+        BACKEND='todolist.cache.BoundedLocMemCache',
+        OPTIONS={'MAX_ENTRIES': 10_000, 'MAX_BYTES': env.int('CACHE_MAX_BYTES', default=64 * 1024 * 1024)},
+    )
+
+# время хранения статистики досок в кэше, секунд (goals.stats), 0 - считать при каждом запросе
+BOARD_STATS_CACHE_TIMEOUT = env.int('BOARD_STATS_CACHE_TIMEOUT', default=30)
+
 # Тестовая база для тестирования тестов и приложения
 # DATABASES = {
 #     'default': {
@@ -143,6 +177,18 @@ SOCIAL_AUTH_LOGIN_REDIRECT_URL = '/categories'
 SOCIAL_AUTH_LOGIN_ERROR_URL = '/login-error/'
 SOCIAL_AUTH_USER_MODEL = 'core.User'
 
-REST_FRAMEWORK = {'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination'}
+REST_FRAMEWORK = {
+    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
+    # JSON через orjson (todolist/renderers.py), без orjson - стандартные JSONRenderer / JSONParser
+    'DEFAULT_RENDERER_CLASSES': [
+        'todolist.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'todolist.renderers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+}
 
 BOT_TOKEN = env.str('BOT_TOKEN')
@@ -17,6 +17,8 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 
+from todolist.views import DatabasePoolView
+
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -24,4 +26,5 @@ urlpatterns = [
     path('goals/', include(('goals.urls', 'goals'))),
     path('bot/', include(('bot.urls', 'bot.urls'))),
     path('oauth/', include('social_django.urls', namespace='social')),
+    path('db/pool', DatabasePoolView.as_view(), name='db_pool'),
 ]
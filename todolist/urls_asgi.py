@@ -0,0 +1,14 @@
+"""
+URL configuration for the ASGI application (todolist/asgi.py).
+
+Same routes as todolist.urls; the hot goals read endpoints are served by async views (goals/asynchronous.py).
+"""
+from django.urls import path, include
+
+from goals.urls import asgi_urlpatterns
+from todolist import urls
+
+urlpatterns = [
+    path('goals/', include((asgi_urlpatterns, 'goals'))),
+    *(pattern for pattern in urls.urlpatterns if getattr(pattern, 'namespace', None) != 'goals'),
+]
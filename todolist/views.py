@@ -0,0 +1,20 @@
+""" Служебные представления проекта
+
+DatabasePoolView - состояние пулов соединений с БД процесса (todolist/db/pool.py): размер, занятые
+и свободные соединения, ожидания и отказы по таймауту (только администраторам)
+
+"""
+
+from rest_framework import permissions
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from todolist.db.pool import pool_stats
+
+
+class DatabasePoolView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request: Request) -> Response:
+        return Response(pool_stats())